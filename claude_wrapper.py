@@ -6,52 +6,121 @@ and read structured output from the JSONL session files that Claude Code writes
 to disk.
 
 Prompts are sent via tmux load-buffer + paste-buffer to avoid escaping issues.
+Tmux commands go through a persistent control-mode client (tmux -C) so each
+command is a pipe write instead of a fork/exec of the tmux binary.
 
 Architecture:
 - Background watcher thread continuously polls the JSONL file and fires callbacks
-- run() sends prompts via tmux, then waits for the watcher to signal turn completion
+- run()/submit() queue prompts; a dispatcher thread sends them via tmux one at a
+  time, then waits for the watcher to signal turn completion
 - Global callbacks (registered once) broadcast to all WebSocket clients
 - Per-request callbacks (passed to run()) handle request-specific logic
 """
 
+import contextlib
+import os
+import queue
 import subprocess
+import tempfile
 import threading
 import time
-from typing import Callable, Optional
+from concurrent.futures import Future
+from typing import Callable, ClassVar, Optional
 
+from inotify_watch import IN_CREATE, IN_MODIFY, IN_MOVED_TO, DirectoryWatcher
 from logger import logger
 from transcript_reader import (
+    TranscriptTail,
     find_latest_session,
     get_jsonl_line_count,
     get_projects_dir,
+    get_transcript_path,
+    list_sessions,
+    normalize_usage,
     read_context_usage,
-    read_new_entries,
     session_file_exists,
 )
 
 # Tmux session name for Claude's interactive TUI
 TMUX_SESSION = "claude-watch"
 
-# Temp file for prompt delivery via tmux load-buffer
-PROMPT_BUFFER_FILE = "/tmp/claude-watch-prompt.txt"
+# Single-line prompts shorter than this (bytes) are typed with send-keys -l instead of a paste buffer
+SEND_KEYS_MAX = 256
+
+
+def _env_seconds(name: str, default: float, minimum: float) -> float:
+    """Read a duration override (seconds) from the environment, clamped to minimum."""
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        logger.warning(f"[TMUX] Ignoring {name}={raw!r}: not a number")
+        return default
+    return max(value, minimum)
+
+
+# Timings below can be overridden with CLAUDE_WATCH_* environment variables
+# (see docs/features/transcript-watching.md)
 
 # How long to wait for Claude TUI to initialize before sending first prompt
-STARTUP_WAIT = 3.0
+STARTUP_WAIT = _env_seconds("CLAUDE_WATCH_STARTUP_WAIT", 3.0, 0.5)
 
-# JSONL polling interval (seconds)
+# JSONL polling interval (seconds), used when inotify is unavailable.
+# Adaptive: drops to MIN while Claude is writing, backs off by BACKOFF per idle poll up to MAX
 POLL_INTERVAL = 0.3
+POLL_INTERVAL_MIN = _env_seconds("CLAUDE_WATCH_POLL_INTERVAL_MIN", 0.05, 0.01)
+POLL_INTERVAL_MAX = _env_seconds("CLAUDE_WATCH_POLL_INTERVAL_MAX", 1.0, POLL_INTERVAL_MIN)
+POLL_BACKOFF = 1.5
+
+# Longest the watcher blocks on inotify (shutdown() and run() also wake it explicitly)
+WATCH_WAIT_MAX = 1.0
 
 # Idle timeout: adaptive — starts at BASE, doubles with each activity burst, caps at MAX
-IDLE_TIMEOUT_BASE = 0.5
-IDLE_TIMEOUT_MAX = 5.0
+IDLE_TIMEOUT_BASE = _env_seconds("CLAUDE_WATCH_IDLE_TIMEOUT_BASE", 0.5, 0.1)
+IDLE_TIMEOUT_MAX = _env_seconds("CLAUDE_WATCH_IDLE_TIMEOUT_MAX", 5.0, IDLE_TIMEOUT_BASE)
+
+# How long to wait for tmux to acknowledge a control-mode command (seconds)
+CONTROL_REPLY_TIMEOUT = 5.0
+
+# How long a `tmux has-session` result is reused when no control client is attached (seconds)
+ALIVE_CACHE_TTL = 1.0
 
 # Maximum time to wait for a turn to complete (seconds)
-TURN_TIMEOUT = 300
+TURN_TIMEOUT = _env_seconds("CLAUDE_WATCH_TURN_TIMEOUT", 300.0, 10.0)
 
 # How often to refresh the session ID in the background watcher (seconds)
 SESSION_REFRESH_INTERVAL = 5.0
 
 
+# Shared default for missing "message" keys, so poll() doesn't allocate a dict per entry
+_EMPTY: dict = {}
+
+
+@contextlib.contextmanager
+def _prompt_file(prompt: str):
+    """Yield a path tmux load-buffer can read the prompt from.
+
+    Uses an anonymous in-memory file (memfd) reached through /proc, so nothing
+    is written to disk and concurrent sends never share a path. Falls back to a
+    private temp file where memfd_create is unavailable.
+    """
+    if hasattr(os, "memfd_create"):
+        fd = os.memfd_create("claude-prompt", os.MFD_CLOEXEC)
+        path = None
+    else:
+        fd, path = tempfile.mkstemp(prefix="claude-watch-prompt-", suffix=".txt")
+    with os.fdopen(fd, "w") as f:
+        f.write(prompt)
+        f.flush()
+        try:
+            yield path or f"/proc/{os.getpid()}/fd/{fd}"
+        finally:
+            if path:
+                os.unlink(path)
+
+
 class JsonlWatcher:
     """Watch a JSONL file for new entries and fire callbacks."""
 
@@ -61,7 +130,17 @@ class JsonlWatcher:
     def __init__(self, workdir: str, session_id: str, from_line: int):
         self.workdir = workdir
         self.session_id = session_id
-        self._processed_up_to = from_line
+        self._tail = TranscriptTail(
+            get_transcript_path(workdir, session_id), from_line, self.SKIP_TYPES, skip_sidechain=True
+        )
+        # Raw usage dict of the last main-thread assistant message seen; only the
+        # final one of a turn is reported, so it is normalized on read
+        self._usage: Optional[dict] = None
+
+    @property
+    def last_usage(self) -> Optional[dict]:
+        """Usage of the last main-thread assistant message seen, same shape as read_context_usage()."""
+        return normalize_usage(self._usage) if self._usage else None
 
     def poll(
         self,
@@ -72,87 +151,237 @@ class JsonlWatcher:
     ) -> bool:
         """Poll for new entries and fire callbacks.
 
+        Consecutive text items in one poll are coalesced into a single on_text
+        call (with the latest timestamp); pending text is flushed before any
+        tool, user message or turn-done callback so ordering is preserved.
+
         Returns True if new entries were found, False otherwise.
         """
-        entries = read_new_entries(self.workdir, self.session_id, self._processed_up_to)
+        entries = self._tail.read_new()
         if not entries:
             return False
 
-        self._processed_up_to += len(entries)
         had_activity = False
+        texts: list[str] = []
+        text_timestamp = None
 
-        for entry in entries:
-            entry_type = entry.get("type")
-
-            # Skip noise entries
-            if entry_type in self.SKIP_TYPES:
-                continue
+        def flush_text():
+            if texts:
+                on_text("".join(texts), text_timestamp)
+                texts.clear()
 
+        # Noise entries (SKIP_TYPES) are mostly dropped by the tail before parsing;
+        # any that get through match none of the branches below
+        for entry in entries:
             # Skip sidechain (subagent) entries
             if entry.get("isSidechain"):
                 continue
 
-            # Detect turn completion: system entry with subtype "turn_duration"
-            if entry_type == "system" and entry.get("subtype") == "turn_duration":
-                if on_turn_done:
-                    on_turn_done()
-                continue
+            entry_type = entry.get("type")
 
             if entry_type == "assistant":
                 timestamp = entry.get("timestamp")
-                content = entry.get("message", {}).get("content", [])
+                message = entry.get("message", _EMPTY)
+                usage = message.get("usage")
+                if usage:
+                    self._usage = usage
+                content = message.get("content", ())
                 for item in content:
                     item_type = item.get("type")
 
                     if item_type == "text":
                         text = item.get("text", "")
                         if text and on_text:
-                            on_text(text, timestamp)
+                            texts.append(text)
+                            text_timestamp = timestamp
                             had_activity = True
 
                     elif item_type == "tool_use":
                         tool_name = item.get("name", "unknown")
                         tool_input = item.get("input", {})
                         if on_tool:
+                            flush_text()
                             on_tool(tool_name, tool_input, timestamp)
                         had_activity = True
 
+                # The final assistant message of a turn ends with end_turn; that is
+                # enough to finish without waiting for turn_duration or idleness
+                if message.get("stop_reason") == "end_turn" and on_turn_done:
+                    flush_text()
+                    on_turn_done()
+
             elif entry_type == "user":
-                content = entry.get("message", {}).get("content", [])
+                content = entry.get("message", _EMPTY).get("content", ())
                 # Check if this is a user prompt (string content or text item)
                 if isinstance(content, str) and content.strip():
                     if on_user_message:
+                        flush_text()
                         on_user_message(content)
                     had_activity = True
                 elif isinstance(content, list):
                     for item in content:
-                        if isinstance(item, dict):
-                            if item.get("type") == "text":
-                                text = item.get("text", "")
-                                if text and on_user_message:
-                                    on_user_message(text)
-                                    had_activity = True
-                            elif item.get("type") == "tool_result":
-                                logger.debug("[WATCHER] Tool result received")
+                        if not isinstance(item, dict):
+                            continue
+                        item_type = item.get("type")
+
+                        if item_type == "text":
+                            text = item.get("text", "")
+                            if text and on_user_message:
+                                flush_text()
+                                on_user_message(text)
+                                had_activity = True
+
+                        elif item_type == "tool_result":
+                            logger.debug("[WATCHER] Tool result received")
+
+            # Detect turn completion: system entry with subtype "turn_duration"
+            # (assistant messages with stop_reason end_turn are handled above)
+            elif entry_type == "system" and entry.get("subtype") == "turn_duration":
+                if on_turn_done:
+                    flush_text()
+                    on_turn_done()
 
+        flush_text()
         return had_activity
 
+    def skip(self):
+        """Advance past new entries without parsing them or firing callbacks."""
+        self._tail.skip_new()
+
     @property
     def current_line(self) -> int:
-        return self._processed_up_to
+        return self._tail.line
+
+    def close(self):
+        """Release the transcript file handle."""
+        self._tail.close()
+
+
+class TmuxControlClient:
+    """Persistent tmux control-mode client attached to a session.
+
+    Commands are written as lines to the client's stdin and acknowledged by
+    %begin/%end (or %error) guard blocks on stdout, so issuing a command costs
+    a pipe write instead of spawning a new tmux process.
+    """
+
+    def __init__(self, session: str):
+        self.session = session
+        self._proc: Optional[subprocess.Popen] = None
+        self._replies: queue.Queue[bool] = queue.Queue()
+        self._attached = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self) -> bool:
+        """Attach to the session in control mode. Returns True if the client is usable."""
+        try:
+            self._proc = subprocess.Popen(
+                ["tmux", "-C", "attach-session", "-t", self.session],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as e:
+            logger.warning(f"[TMUX] Cannot start control client: {e}")
+            return False
+
+        threading.Thread(target=self._read_loop, daemon=True).start()
+
+        # Commands sent before the attach completes fail with "no current client"
+        if not self._attached.wait(timeout=CONTROL_REPLY_TIMEOUT) or not self.is_alive():
+            return False
+
+        # Pane output would arrive as %output notifications — we only need command replies
+        return self.command("refresh-client -f no-output")
+
+    def _read_loop(self):
+        """Turn guard lines into replies; everything else (notifications, command output) is ignored.
+
+        The pipe is binary: only the guard lines are inspected, so nothing else is decoded.
+        """
+        for line in self._proc.stdout:
+            if line.startswith((b"%end ", b"%error ")):
+                # Flags field is 1 for commands sent by this client, 0 for the initial attach
+                if line.split()[-1] == b"1":
+                    self._replies.put(line.startswith(b"%end "))
+                else:
+                    self._attached.set()
+            elif line.startswith(b"%exit"):
+                break
+        # Wake start()/command() if they are still waiting on a reply that will never come
+        self._attached.set()
+        self._replies.put(False)
+        logger.info("[TMUX] Control client exited")
+
+    def is_alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def command(self, *cmds: str) -> bool:
+        """Send tmux commands on one line and wait for all their acknowledgements.
+
+        Multiple commands are chained with tmux's ";" separator, so they cost a
+        single write. Returns True only if every command succeeded.
+        """
+        with self._lock:
+            if not self.is_alive():
+                return False
+
+            # Drop late replies from a previous command that timed out
+            while not self._replies.empty():
+                self._replies.get_nowait()
+
+            line = " ; ".join(cmds)
+            try:
+                self._proc.stdin.write(f"{line}\n".encode())
+                self._proc.stdin.flush()
+            except (OSError, ValueError) as e:
+                logger.warning(f"[TMUX] Control client write failed: {e}")
+                return False
+
+            # tmux answers each command in the list with its own guard block
+            for _ in cmds:
+                try:
+                    if not self._replies.get(timeout=CONTROL_REPLY_TIMEOUT):
+                        return False
+                except queue.Empty:
+                    logger.warning(f"[TMUX] No reply from control client for: {line}")
+                    return False
+            return True
+
+    def close(self):
+        """Detach the control client (closing stdin makes tmux detach it)."""
+        if self._proc is None:
+            return
+        try:
+            self._proc.stdin.close()
+            self._proc.wait(timeout=1.0)
+        except (OSError, subprocess.TimeoutExpired):
+            self._proc.kill()
 
 
 class ClaudeTmuxSession:
     """Run Claude Code interactively in a tmux session, read output from JSONL files."""
 
-    _instance: Optional["ClaudeTmuxSession"] = None
-    _lock = threading.Lock()
+    # Replaced only under _lock; get_instance() reads it without the lock
+    _instance: ClassVar[Optional["ClaudeTmuxSession"]] = None
+    _lock: ClassVar[threading.Lock] = threading.Lock()
 
     def __init__(self, workdir: str, model: str = None):
         self.workdir = workdir
         self.model = model
         self.session_id: Optional[str] = None
-        self._output_lock = threading.Lock()
+
+        # Prompts are run one at a time, in order, by a dispatcher thread
+        self._prompt_queue: queue.Queue = queue.Queue()
+        self._dispatcher_thread: Optional[threading.Thread] = None
+        self._dispatcher_lock = threading.Lock()
+        # Set by shutdown(); a closed instance is never handed out again
+        self._closed = False
+
+        # Control-mode client, attached lazily once the tmux session exists
+        self._ctl: Optional[TmuxControlClient] = None
+        # (monotonic timestamp, result) of the last has-session check
+        self._alive_cache: tuple[float, bool] = (0.0, False)
 
         # Context/usage tracking
         self.last_usage: Optional[dict] = None
@@ -161,8 +390,15 @@ class ClaudeTmuxSession:
 
         # Background watcher state
         self._callbacks: dict = {}
+        # Per-request callbacks installed by run() for the duration of one prompt
+        self._request_callbacks: dict = {}
         self._watcher_thread: Optional[threading.Thread] = None
         self._watcher_running = False
+        self._poll_interval = POLL_INTERVAL
+        # inotify watch on the projects dir (None means fall back to polling)
+        # and the event that interrupts polling sleeps; both wake on shutdown
+        self._dir_watch: Optional[DirectoryWatcher] = None
+        self._wakeup = threading.Event()
 
         # Per-turn state (managed by background watcher, consumed by run())
         self._pending_text: list[str] = []
@@ -181,20 +417,60 @@ class ClaudeTmuxSession:
         """Get or create the singleton instance.
 
         Never recreates while instance exists — run() handles restarting tmux.
-        Only shutdown() clears the instance.
+        Only shutdown() clears the instance, holding the lock throughout, so a
+        caller never gets a session that is being torn down and a replacement
+        can't start tmux before the old one is killed.
         """
+        # Fast path without the lock; the instance is only ever replaced by None
+        instance = cls._instance
+        if instance is not None and not instance._closed:
+            return instance
         with cls._lock:
             if cls._instance is None:
                 cls._instance = cls(workdir, model)
             return cls._instance
 
     def is_alive(self) -> bool:
-        """Check if the tmux session is running."""
+        """Check if the tmux session is running.
+
+        An attached control client exits when its session dies, so while it is
+        running no tmux process needs to be spawned. Otherwise the has-session
+        result is cached for ALIVE_CACHE_TTL.
+        """
+        if self._ctl is not None and self._ctl.is_alive():
+            return True
+        checked_at, alive = self._alive_cache
+        now = time.monotonic()
+        if checked_at and now - checked_at < ALIVE_CACHE_TTL:
+            return alive
         result = subprocess.run(
             ["tmux", "has-session", "-t", TMUX_SESSION],
             capture_output=True,
         )
-        return result.returncode == 0
+        alive = result.returncode == 0
+        self._alive_cache = (now, alive)
+        return alive
+
+    def _control(self) -> Optional[TmuxControlClient]:
+        """Return a live control client, attaching one if needed. None if tmux is not running."""
+        if self._ctl is not None and self._ctl.is_alive():
+            return self._ctl
+        if not self.is_alive():
+            return None
+        ctl = TmuxControlClient(TMUX_SESSION)
+        if not ctl.start():
+            ctl.close()
+            return None
+        logger.info("[TMUX] Control client attached")
+        self._ctl = ctl
+        return ctl
+
+    def _tmux(self, *args: str):
+        """Run a tmux command, via the control client when attached, else a one-shot process."""
+        ctl = self._control()
+        if ctl is not None and ctl.command(" ".join(args)):
+            return
+        subprocess.run(["tmux", *args], check=False)
 
     def register_callbacks(
         self,
@@ -239,9 +515,10 @@ class ClaudeTmuxSession:
     def _background_watcher_loop(self):
         """Main loop for the background watcher thread.
 
-        Continuously polls the JSONL file for new entries and dispatches
-        to registered callbacks. Detects turn completion via turn_duration
-        signal (primary) or idle timeout (fallback).
+        Reads new JSONL entries whenever the projects directory changes
+        (inotify, or polling where unavailable) and dispatches to registered
+        callbacks. Detects turn completion via end_turn / turn_duration entries
+        (primary) or idle timeout (fallback).
         """
         try:
             self._background_watcher_loop_inner()
@@ -253,20 +530,27 @@ class ClaudeTmuxSession:
 
     def _background_watcher_loop_inner(self):
         watcher: Optional[JsonlWatcher] = None
-        last_session_refresh = 0.0
+        # All loop timing uses one monotonic reading per iteration
+        last_session_refresh = float("-inf")
         last_activity = 0.0
         turn_done_signal = False
         accumulated_text: list[str] = []
-
         while self._watcher_running:
             # Refresh session ID periodically or when signaled by run()
-            now = time.time()
+            now = time.monotonic()
             force_refresh = self._session_refresh_needed.is_set()
             if force_refresh:
                 logger.info(f"[WATCHER] Force refresh signaled, session={self.session_id}")
             if force_refresh:
                 self._session_refresh_needed.clear()
             if force_refresh or now - last_session_refresh > SESSION_REFRESH_INTERVAL:
+                if self._dir_watch is not None and not self._dir_watch.valid:
+                    self._dir_watch.close()
+                    self._dir_watch = None
+                if self._dir_watch is None:
+                    self._dir_watch = DirectoryWatcher.create(
+                        get_projects_dir(self.workdir), IN_MODIFY | IN_CREATE | IN_MOVED_TO
+                    )
                 if force_refresh:
                     # run() already updated self.session_id — just use it
                     latest = self.session_id
@@ -278,11 +562,14 @@ class ClaudeTmuxSession:
                 if latest and latest != self.session_id:
                     logger.info(f"[WATCHER] Session ID updated: {self.session_id} -> {latest}")
                     self.session_id = latest
+                    if watcher is not None:
+                        watcher.close()
                     watcher = None
                 last_session_refresh = now
 
             if not self.session_id:
-                time.sleep(POLL_INTERVAL)
+                if self._wait_for_changes(self._dir_watch, WATCH_WAIT_MAX):
+                    last_session_refresh = float("-inf")  # New transcript file — look for a session now
                 continue
 
             # Create watcher if needed (new session or first run)
@@ -302,6 +589,8 @@ class ClaudeTmuxSession:
                 logger.info(
                     f"[WATCHER] Creating new JsonlWatcher: {old_sid} -> {self.session_id} (from line {start_line})"
                 )
+                if watcher is not None:
+                    watcher.close()
                 watcher = JsonlWatcher(self.workdir, self.session_id, start_line)
                 accumulated_text.clear()
                 last_activity = 0.0
@@ -309,62 +598,98 @@ class ClaudeTmuxSession:
                 activity_bursts = 0
                 was_idle = True
 
-            # Build callbacks that fire both global and accumulate for turn detection
-            def on_text(text, claude_timestamp=None):
-                accumulated_text.append(text)
-                self._pending_text.append(text)
-
-                cb = self._callbacks.get("on_text")
-                if cb:
-                    cb(text, claude_timestamp)
-                logger.debug(f"[WATCHER] Text: {text[:100]}...")
-
-            def on_tool(name, tool_input, claude_timestamp=None):
-                cb = self._callbacks.get("on_tool")
-                if cb:
-                    cb(name, tool_input, claude_timestamp)
-                logger.debug(f"[WATCHER] Tool: {name}")
-
-            def on_user_message(text):
-                if not self._server_prompt_active:
-                    cb = self._callbacks.get("on_user_message")
-                    if cb:
-                        cb(text)
+            # Build callbacks that fire global + per-request callbacks and accumulate
+            # for turn detection. Callbacks are looked up once per poll (run() may
+            # install per-request ones between polls) and bound as defaults.
+            callbacks = self._callbacks
+            request_callbacks = self._request_callbacks
+            # Only keep text for run() while a server prompt is waiting on it;
+            # turns typed into the terminal would otherwise pile up until the next one
+            pending_text = self._pending_text if self._server_prompt_active else None
+
+            def on_text(
+                text,
+                claude_timestamp=None,
+                _cb=callbacks.get("on_text"),
+                _req_cb=request_callbacks.get("on_text"),
+                _pending=pending_text,
+                _acc=accumulated_text,
+            ):
+                _acc.append(text)
+                if _pending is not None:
+                    _pending.append(text)
+                if _cb:
+                    _cb(text, claude_timestamp)
+                if _req_cb:
+                    _req_cb(text)
+                # %-style so the message is only built when DEBUG is enabled
+                logger.debug("[WATCHER] Text: %.100s...", text)
+
+            def on_tool(
+                name,
+                tool_input,
+                claude_timestamp=None,
+                _cb=callbacks.get("on_tool"),
+                _req_cb=request_callbacks.get("on_tool"),
+            ):
+                if _cb:
+                    _cb(name, tool_input, claude_timestamp)
+                if _req_cb:
+                    _req_cb(name, tool_input)
+                logger.debug("[WATCHER] Tool: %s", name)
+
+            def on_user_message(text, _cb=callbacks.get("on_user_message")):
+                if _cb and not self._server_prompt_active:
+                    _cb(text)
                 logger.info(f"[WATCHER] User message: {text[:50]}...")
 
             def on_turn_done():
                 nonlocal turn_done_signal
                 turn_done_signal = True
 
-            had_activity = watcher.poll(
-                on_text=on_text,
-                on_tool=on_tool,
-                on_user_message=on_user_message,
-                on_turn_done=on_turn_done,
-            )
+            if self._server_prompt_active or any(callbacks.values()):
+                had_activity = watcher.poll(
+                    on_text=on_text,
+                    on_tool=on_tool,
+                    on_user_message=on_user_message,
+                    on_turn_done=on_turn_done,
+                )
+            else:
+                # Nobody is listening and run() isn't waiting: step over new lines unparsed
+                watcher.skip()
+                had_activity = False
 
             if had_activity:
-                last_activity = time.time()
+                last_activity = now
                 # Track idle→active transitions to scale the timeout
                 if was_idle:
                     activity_bursts += 1
                 was_idle = False
-            elif last_activity > 0:
-                was_idle = True
+                self._poll_interval = POLL_INTERVAL_MIN
+            else:
+                if last_activity > 0:
+                    was_idle = True
+                self._poll_interval = min(self._poll_interval * POLL_BACKOFF, POLL_INTERVAL_MAX)
+
+            # Adaptive timeout: starts at BASE, doubles per activity burst, caps at MAX
+            # Simple response (1 burst) → 0.5s, multi-tool (3 bursts) → 2.0s, etc.
+            idle_threshold = min(
+                IDLE_TIMEOUT_BASE * (2 ** (activity_bursts - 1)),
+                IDLE_TIMEOUT_MAX,
+            )
 
-            # Finalize turn: turn_duration signal (primary) or adaptive idle timeout (fallback)
+            # Finalize turn: turn-done signal (primary) or adaptive idle timeout (fallback)
             finalize = False
             if turn_done_signal and accumulated_text:
-                logger.info("[WATCHER] Turn complete (turn_duration signal)")
+                logger.info("[WATCHER] Turn complete (turn-done signal)")
                 finalize = True
+            elif turn_done_signal:
+                # end_turn and turn_duration both arrive for one turn; whichever
+                # comes second finds nothing left to finalize. Drop it so it
+                # cannot cut the next turn short.
+                turn_done_signal = False
             elif last_activity > 0 and accumulated_text:
-                idle_elapsed = time.time() - last_activity
-                # Adaptive timeout: starts at BASE, doubles per activity burst, caps at MAX
-                # Simple response (1 burst) → 0.5s, multi-tool (3 bursts) → 2.0s, etc.
-                idle_threshold = min(
-                    IDLE_TIMEOUT_BASE * (2 ** (activity_bursts - 1)),
-                    IDLE_TIMEOUT_MAX,
-                )
+                idle_elapsed = now - last_activity
                 if idle_elapsed >= idle_threshold:
                     logger.info(
                         f"[WATCHER] Turn complete (idle timeout {idle_elapsed:.1f}s, "
@@ -376,7 +701,11 @@ class ClaudeTmuxSession:
                 result = "".join(accumulated_text)
 
                 # Fire usage callback
-                self._update_usage(self._callbacks.get("on_usage"))
+                self._update_usage(
+                    self._callbacks.get("on_usage"),
+                    self._request_callbacks.get("on_usage"),
+                    transcript_usage=watcher.last_usage,
+                )
 
                 # Fire turn_complete callback
                 cb = self._callbacks.get("on_turn_complete")
@@ -394,21 +723,52 @@ class ClaudeTmuxSession:
                 activity_bursts = 0
                 was_idle = True
 
-            time.sleep(POLL_INTERVAL)
-
+            # Sleep until the transcript changes, waking in time to apply the idle timeout
+            wait_timeout = WATCH_WAIT_MAX
+            if last_activity > 0 and accumulated_text:
+                wait_timeout = min(max(idle_threshold - (now - last_activity), 0.0), WATCH_WAIT_MAX)
+            if self._wait_for_changes(self._dir_watch, wait_timeout):
+                last_session_refresh = float("-inf")
+
+        if watcher is not None:
+            watcher.close()
+        if self._dir_watch is not None:
+            self._dir_watch.close()
+            self._dir_watch = None
         logger.info("[WATCHER] Background watcher stopped")
 
+    def _wait_for_changes(self, dir_watch: Optional[DirectoryWatcher], timeout: float) -> bool:
+        """Block until the projects dir changes or timeout passes.
+
+        Without inotify this sleeps for the adaptive poll interval instead.
+        Either wait ends early when _wake_watcher() is called.
+        Returns True if a new .jsonl file appeared, so the caller can re-check the session.
+        """
+        if dir_watch is None:
+            self._wakeup.wait(min(self._poll_interval, timeout))
+            self._wakeup.clear()
+            return False
+        return any(
+            mask & (IN_CREATE | IN_MOVED_TO) and name.endswith(".jsonl") for mask, name in dir_watch.read(timeout)
+        )
+
+    def _wake_watcher(self):
+        """Interrupt the background watcher's wait so it re-checks state immediately."""
+        self._wakeup.set()
+        dir_watch = self._dir_watch
+        if dir_watch is not None:
+            dir_watch.wake()
+
     def _start_session(self):
         """Start Claude interactively in a tmux session."""
         if self.is_alive():
             return
 
-        # Snapshot existing JSONL files BEFORE starting tmux
-        # so we can detect the new file Claude creates
-        projects_dir = get_projects_dir(self.workdir)
-        existing_files = set()
-        if projects_dir.is_dir():
-            existing_files = {f.name for f in projects_dir.glob("*.jsonl")}
+        # Start watching for new sessions BEFORE starting tmux so we can detect
+        # the new file Claude creates. Anything inotify reports is new; only the
+        # polling fallback needs a snapshot of the sessions that already exist
+        dir_watch = DirectoryWatcher.create(get_projects_dir(self.workdir), IN_CREATE | IN_MOVED_TO)
+        existing_sessions = set(list_sessions(self.workdir)) if dir_watch is None else set()
 
         cmd = ["tmux", "new-session", "-d", "-s", TMUX_SESSION]
 
@@ -427,32 +787,46 @@ class ClaudeTmuxSession:
         cmd.extend(claude_cmd)
 
         logger.info(f"[TMUX] Starting session: {' '.join(cmd)}")
-        subprocess.run(cmd, check=False)
+        started = subprocess.run(cmd, check=False).returncode == 0
+        # new-session's exit status already says whether the session exists;
+        # only a failure leaves it to the next is_alive() to find out
+        self._alive_cache = (time.monotonic(), True) if started else (0.0, False)
+
+        # Attach the control client now rather than on the first send, so
+        # is_alive() checks during startup and the first turn don't spawn has-session
+        if started:
+            self._control()
 
         # Wait for Claude TUI to initialize and create its JSONL file
-        self._discover_session_id(existing_files)
+        try:
+            self._discover_session_id(existing_sessions, dir_watch)
+        finally:
+            if dir_watch is not None:
+                dir_watch.close()
 
-    def _discover_session_id(self, existing_files: set[str]):
+    def _discover_session_id(self, existing_sessions: set[str], dir_watch: Optional[DirectoryWatcher] = None):
         """Wait for Claude to create a JSONL file and extract the session ID.
 
         Args:
-            existing_files: Set of JSONL filenames that existed before tmux started
+            existing_sessions: Set of session IDs that existed before tmux started
+            dir_watch: inotify watch on the projects dir; polls every 0.1s when None
         """
-        projects_dir = get_projects_dir(self.workdir)
-
-        # Poll for new file
-        deadline = time.time() + STARTUP_WAIT + 10
-        while time.time() < deadline:
-            time.sleep(0.1)
-            if not projects_dir.is_dir():
+        deadline = time.monotonic() + STARTUP_WAIT + 10
+        while time.monotonic() < deadline:
+            if dir_watch is not None:
+                # Block until something is created in the projects dir
+                for _, name in dir_watch.read(deadline - time.monotonic()):
+                    sid = name.removesuffix(".jsonl")
+                    if sid != name and sid not in existing_sessions:
+                        self.session_id = sid
+                        logger.info(f"[TMUX] Discovered session: {self.session_id}")
+                        return
                 continue
 
-            current_files = {f.name for f in projects_dir.glob("*.jsonl")}
-            new_files = current_files - existing_files
-            if new_files:
-                # Use the newest new file
-                newest = max(new_files, key=lambda f: (projects_dir / f).stat().st_mtime)
-                self.session_id = newest.replace(".jsonl", "")
+            time.sleep(0.1)
+            newest = self._newest_new_session(existing_sessions)
+            if newest:
+                self.session_id = newest
                 logger.info(f"[TMUX] Discovered session: {self.session_id}")
                 return
 
@@ -464,18 +838,49 @@ class ClaudeTmuxSession:
         else:
             logger.warning("[TMUX] Could not discover session ID")
 
+    def _newest_new_session(self, existing_sessions: set[str]) -> Optional[str]:
+        """Return the most recently modified session not in existing_sessions, if any."""
+        sessions = list_sessions(self.workdir)
+        new_sessions = sessions.keys() - existing_sessions
+        if not new_sessions:
+            return None
+        return max(new_sessions, key=sessions.get)
+
     def _send_prompt_via_tmux(self, prompt: str):
-        """Send a prompt to the Claude TUI using tmux load-buffer + paste-buffer."""
-        # Write prompt to temp file (avoids all escaping issues with send-keys)
-        with open(PROMPT_BUFFER_FILE, "w") as f:
-            f.write(prompt)
+        """Send a prompt to the Claude TUI using tmux load-buffer + paste-buffer.
 
-        # Load into tmux buffer and paste it
-        subprocess.run(["tmux", "load-buffer", PROMPT_BUFFER_FILE], check=False)
-        subprocess.run(["tmux", "paste-buffer", "-t", TMUX_SESSION], check=False)
+        load-buffer, paste-buffer and the submitting Enter are chained with ";"
+        so they go out as one control-mode line, or one tmux process as fallback.
+        Short single-line prompts skip the buffer on the control client and are
+        typed literally with send-keys -l.
+        """
+        ctl = self._control()
+        if ctl is not None and len(prompt.encode()) < SEND_KEYS_MAX and prompt.isprintable():
+            # Single-quoted for tmux's command parser: nothing inside is special except '
+            quoted = "'" + prompt.replace("'", "'\\''") + "'"
+            if ctl.command(
+                f"send-keys -t {TMUX_SESSION} -l -- {quoted}",
+                f"send-keys -t {TMUX_SESSION} Enter",
+            ):
+                logger.info(f"[TMUX] Sent prompt: '{prompt[:50]}...'")
+                return
 
-        # Send Enter to submit
-        subprocess.run(["tmux", "send-keys", "-t", TMUX_SESSION, "Enter"], check=False)
+        if ctl is not None:
+            # Load the prompt from a file (avoids all escaping issues with send-keys)
+            with _prompt_file(prompt) as path:
+                sent = ctl.command(
+                    f"load-buffer {path}",
+                    f"paste-buffer -t {TMUX_SESSION}",
+                    f"send-keys -t {TMUX_SESSION} Enter",
+                )
+            if sent:
+                logger.info(f"[TMUX] Sent prompt: '{prompt[:50]}...'")
+                return
+
+        # One-shot tmux process: pipe the prompt through stdin, no temp file needed
+        cmd = ["tmux", "load-buffer", "-", ";", "paste-buffer", "-t", TMUX_SESSION]
+        cmd.extend([";", "send-keys", "-t", TMUX_SESSION, "Enter"])
+        subprocess.run(cmd, input=prompt, text=True, check=False)
 
         logger.info(f"[TMUX] Sent prompt: '{prompt[:50]}...'")
 
@@ -504,130 +909,197 @@ class ClaudeTmuxSession:
         Returns:
             The accumulated result text from Claude
         """
-        with self._output_lock:
-            # Set server flag FIRST so the watcher knows to suppress on_turn_complete
-            # during the potentially slow startup below
-            self._server_prompt_active = True
-            logger.info("[TMUX] Server prompt active = True (before startup)")
-            self._pending_text.clear()
-            self._turn_complete.clear()
+        result = self.submit(prompt, on_text=on_text, on_tool=on_tool, on_usage=on_usage).result()
 
-            self._start_session()
+        if on_result:
+            on_result(result)
 
-            if not self.is_alive():
-                self._server_prompt_active = False
-                raise RuntimeError("Failed to start Claude tmux session")
-
-            # Only refresh if current session file is missing (pinned session)
-            if not self.session_id or not session_file_exists(self.workdir, self.session_id):
-                latest = find_latest_session(self.workdir)
-                if latest:
-                    logger.info(f"[TMUX] Session file missing, falling back: {self.session_id} -> {latest}")
-                    self.session_id = latest
+        return result
 
-            if not self.session_id:
-                self._server_prompt_active = False
-                raise RuntimeError("No session ID discovered")
-
-            # Wait for TUI to be ready on first prompt (poll until JSONL has entries)
-            start_line = get_jsonl_line_count(self.workdir, self.session_id)
-            if start_line == 0:
-                deadline = time.time() + STARTUP_WAIT
-                while time.time() < deadline:
-                    if get_jsonl_line_count(self.workdir, self.session_id) > 0:
-                        break
-                    time.sleep(0.1)
-            # Tell the watcher where to start reading for the new session
-            self._watcher_start_line = start_line
-
-            # Wrap global callbacks with per-request callbacks
-            orig_on_text = self._callbacks.get("on_text")
-            orig_on_tool = self._callbacks.get("on_tool")
-            orig_on_usage = self._callbacks.get("on_usage")
-
-            def combined_on_text(text, claude_timestamp=None):
-                if orig_on_text:
-                    orig_on_text(text, claude_timestamp)
-                if on_text:
-                    on_text(text)
-
-            def combined_on_tool(name, tool_input, claude_timestamp=None):
-                if orig_on_tool:
-                    orig_on_tool(name, tool_input, claude_timestamp)
-                if on_tool:
-                    on_tool(name, tool_input)
-
-            def combined_on_usage(usage):
-                if orig_on_usage:
-                    orig_on_usage(usage)
-                if on_usage:
-                    on_usage(usage)
-
-            # Temporarily replace global callbacks to include per-request ones
-            self._callbacks["on_text"] = combined_on_text
-            self._callbacks["on_tool"] = combined_on_tool
-            self._callbacks["on_usage"] = combined_on_usage
-
-            # Snapshot existing JSONL files BEFORE sending prompt so we can
-            # detect truly new files (avoids switching to a manual session)
-            projects_dir = get_projects_dir(self.workdir)
-            existing_files = set()
-            if projects_dir.is_dir():
-                existing_files = {f.name for f in projects_dir.glob("*.jsonl")}
-
-            # Send prompt
-            self._send_prompt_via_tmux(prompt)
+    def submit(
+        self,
+        prompt: str,
+        on_text: Optional[Callable[[str], None]] = None,
+        on_tool: Optional[Callable[[str, dict], None]] = None,
+        on_usage: Optional[Callable[[dict], None]] = None,
+    ) -> Future:
+        """Queue a prompt and return a Future for its result text.
 
-            # After sending, Claude may create a new JSONL file — poll for it
-            # Only look for NEW files not in the pre-prompt snapshot to avoid
-            # switching to a user's manual Claude session
-            post_prompt_deadline = time.time() + 1.0
-            pre_prompt_line_count = get_jsonl_line_count(self.workdir, self.session_id)
-            refreshed = None
-            while time.time() < post_prompt_deadline:
-                if projects_dir.is_dir():
-                    current_files = {f.name for f in projects_dir.glob("*.jsonl")}
-                    new_files = current_files - existing_files
-                    if new_files:
-                        newest = max(new_files, key=lambda f: (projects_dir / f).stat().st_mtime)
-                        refreshed = newest.replace(".jsonl", "")
-                        break
-                # Also break if new entries appeared (Claude is processing)
-                if get_jsonl_line_count(self.workdir, self.session_id) > pre_prompt_line_count:
-                    refreshed = self.session_id
-                    break
-                time.sleep(0.1)
-            if refreshed and refreshed != self.session_id:
-                logger.info(f"[TMUX] Session ID changed after prompt: {self.session_id} -> {refreshed}")
-                self.session_id = refreshed
-                # Signal background watcher to pick up the new session immediately
-                self._session_refresh_needed.set()
-
-            # Wait for the background watcher to signal turn completion
-            completed = self._turn_complete.wait(timeout=TURN_TIMEOUT)
-
-            # Restore original global callbacks
-            self._callbacks["on_text"] = orig_on_text
-            self._callbacks["on_tool"] = orig_on_tool
-            self._callbacks["on_usage"] = orig_on_usage
+        Prompts are sent in submission order, each once the previous turn has
+        completed. Errors (e.g. the session failing to start) are raised from
+        Future.result().
+        """
+        future: Future = Future()
+        with self._dispatcher_lock:
+            if self._closed:
+                future.set_exception(RuntimeError("Claude session shut down"))
+                return future
+            if self._dispatcher_thread is None or not self._dispatcher_thread.is_alive():
+                self._dispatcher_thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+                self._dispatcher_thread.start()
+            self._prompt_queue.put((prompt, on_text, on_tool, on_usage, future))
+        return future
+
+    def _dispatch_loop(self):
+        """Run queued prompts one at a time; a None item stops the loop."""
+        while True:
+            job = self._prompt_queue.get()
+            if job is None:
+                break
+            prompt, on_text, on_tool, on_usage, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._run_turn(prompt, on_text, on_tool, on_usage))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _run_turn(self, prompt: str, on_text, on_tool, on_usage) -> str:
+        """Start the session if needed, send one prompt and collect the turn's text."""
+        # Set server flag FIRST so the watcher knows to suppress on_turn_complete
+        # during the potentially slow startup below
+        self._server_prompt_active = True
+        logger.info("[TMUX] Server prompt active = True (before startup)")
+        self._pending_text.clear()
+        self._turn_complete.clear()
+
+        self._start_session()
+
+        if not self.is_alive():
             self._server_prompt_active = False
+            raise RuntimeError("Failed to start Claude tmux session")
+
+        # Only refresh if current session file is missing (pinned session)
+        if not self.session_id or not session_file_exists(self.workdir, self.session_id):
+            latest = find_latest_session(self.workdir)
+            if latest:
+                logger.info(f"[TMUX] Session file missing, falling back: {self.session_id} -> {latest}")
+                self.session_id = latest
+
+        if not self.session_id:
+            self._server_prompt_active = False
+            raise RuntimeError("No session ID discovered")
+
+        # Wait for TUI to be ready on first prompt (until JSONL has entries)
+        start_line = get_jsonl_line_count(self.workdir, self.session_id)
+        if start_line == 0:
+            self._wait_for_first_entry()
+        # Tell the watcher where to start reading for the new session
+        self._watcher_start_line = start_line
+
+        # The watcher fires these alongside the global callbacks until the turn ends
+        self._request_callbacks = {"on_text": on_text, "on_tool": on_tool, "on_usage": on_usage}
+        try:
+            completed = self._send_and_wait(prompt)
+        finally:
+            self._request_callbacks = {}
+            self._server_prompt_active = False
+
+        if not completed:
+            logger.error("[TMUX] Timeout waiting for turn completion")
+
+        return "".join(self._pending_text).strip()
+
+    def _wait_for_first_entry(self):
+        """Block until the session transcript has a line, for at most STARTUP_WAIT.
 
-            if not completed:
-                logger.error("[TMUX] Timeout waiting for turn completion")
+        Wakes on inotify writes to the projects dir; polls every 0.1s without it.
+        """
+        deadline = time.monotonic() + STARTUP_WAIT
+        dir_watch = DirectoryWatcher.create(get_projects_dir(self.workdir), IN_MODIFY)
+        try:
+            # Counted after the watch is armed so a write in between isn't missed
+            while get_jsonl_line_count(self.workdir, self.session_id) == 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                if dir_watch is not None:
+                    dir_watch.read(remaining)
+                else:
+                    time.sleep(min(0.1, remaining))
+        finally:
+            if dir_watch is not None:
+                dir_watch.close()
 
-            result = "".join(self._pending_text).strip()
+    def _send_and_wait(self, prompt: str) -> bool:
+        """Send the prompt, follow a session switch, and wait for turn completion.
 
-            if on_result:
-                on_result(result)
+        Returns False if the turn did not complete within TURN_TIMEOUT.
+        """
+        # Start watching BEFORE sending the prompt so a transcript Claude creates
+        # in response can't be missed. Without inotify, snapshot existing sessions
+        # instead so only truly new files count (avoids switching to a manual session)
+        dir_watch = DirectoryWatcher.create(get_projects_dir(self.workdir), IN_CREATE | IN_MOVED_TO | IN_MODIFY)
+        existing_sessions = set(list_sessions(self.workdir)) if dir_watch is None else set()
+        try:
+            # Send prompt, then put a backed-off polling watcher back on its fastest cadence
+            self._send_prompt_via_tmux(prompt)
+            self._poll_interval = POLL_INTERVAL_MIN
+            self._wake_watcher()
+
+            # After sending, Claude may create a new JSONL file
+            refreshed = self._wait_for_prompt_session(existing_sessions, dir_watch)
+        finally:
+            if dir_watch is not None:
+                dir_watch.close()
+        if refreshed and refreshed != self.session_id:
+            logger.info(f"[TMUX] Session ID changed after prompt: {self.session_id} -> {refreshed}")
+            self.session_id = refreshed
+            # Signal background watcher to pick up the new session immediately
+            self._session_refresh_needed.set()
+            self._wake_watcher()
+
+        # Wait for the background watcher to signal turn completion
+        return self._turn_complete.wait(timeout=TURN_TIMEOUT)
+
+    def _wait_for_prompt_session(
+        self, existing_sessions: set[str], dir_watch: Optional[DirectoryWatcher], timeout: float = 1.0
+    ) -> Optional[str]:
+        """Wait briefly for Claude to react to a prompt and return the session it writes to.
+
+        Returns a newly created session, the current one once it grows, or None
+        if neither happens within timeout. With dir_watch this waits on inotify
+        (any .jsonl created after the watch was armed is new); otherwise it polls
+        every 0.1s against existing_sessions.
+        """
+        current = f"{self.session_id}.jsonl"
+        deadline = time.monotonic() + timeout
+        if dir_watch is not None:
+            while (remaining := deadline - time.monotonic()) > 0:
+                for mask, name in dir_watch.read(remaining):
+                    if mask & (IN_CREATE | IN_MOVED_TO) and name.endswith(".jsonl") and name != current:
+                        return name.removesuffix(".jsonl")
+                    if mask & IN_MODIFY and name == current:
+                        return self.session_id
+            return None
+
+        pre_prompt_line_count = get_jsonl_line_count(self.workdir, self.session_id)
+        while time.monotonic() < deadline:
+            refreshed = self._newest_new_session(existing_sessions)
+            if refreshed:
+                return refreshed
+            # Also stop if new entries appeared (Claude is processing)
+            if get_jsonl_line_count(self.workdir, self.session_id) > pre_prompt_line_count:
+                return self.session_id
+            time.sleep(0.1)
+        return None
 
-            return result
+    def _update_usage(
+        self,
+        on_usage: Optional[Callable[[dict], None]] = None,
+        on_request_usage: Optional[Callable[[dict], None]] = None,
+        transcript_usage: Optional[dict] = None,
+    ):
+        """Update last_usage and pass it to the given callbacks.
 
-    def _update_usage(self, on_usage: Optional[Callable[[dict], None]] = None):
-        """Read latest usage info from the transcript."""
+        transcript_usage is what the watcher already parsed this session; the
+        transcript is only re-read when it has not seen any usage yet.
+        """
         if not self.session_id:
             return
 
-        transcript_usage = read_context_usage(self.workdir, self.session_id)
+        if transcript_usage is None:
+            transcript_usage = read_context_usage(self.workdir, self.session_id)
         if not transcript_usage:
             return
 
@@ -653,20 +1125,46 @@ class ClaudeTmuxSession:
 
         if on_usage:
             on_usage(self.last_usage)
+        if on_request_usage:
+            on_request_usage(self.last_usage)
 
     def cancel(self):
         """Cancel the running Claude operation by sending Ctrl+C."""
         if self.is_alive():
-            subprocess.run(["tmux", "send-keys", "-t", TMUX_SESSION, "C-c"], check=False)
+            self._tmux("send-keys", "-t", TMUX_SESSION, "C-c")
             logger.info("[TMUX] Sent Ctrl+C to cancel")
 
+    def _stop_dispatcher(self):
+        """Stop the dispatcher and fail prompts that were still waiting in the queue."""
+        with self._dispatcher_lock:
+            while True:
+                try:
+                    job = self._prompt_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is not None and job[-1].set_running_or_notify_cancel():
+                    job[-1].set_exception(RuntimeError("Claude session shut down"))
+            if self._dispatcher_thread is not None:
+                self._prompt_queue.put(None)
+                self._dispatcher_thread = None
+
     def shutdown(self):
         """Kill the tmux session entirely."""
-        self._watcher_running = False
-        if self.is_alive():
-            subprocess.run(["tmux", "kill-session", "-t", TMUX_SESSION], check=False)
-            logger.info("[TMUX] Session killed")
-        ClaudeTmuxSession._instance = None
+        with ClaudeTmuxSession._lock:
+            with self._dispatcher_lock:
+                self._closed = True
+            self._watcher_running = False
+            self._wake_watcher()
+            if self.is_alive():
+                self._tmux("kill-session", "-t", TMUX_SESSION)
+                logger.info("[TMUX] Session killed")
+            if self._ctl is not None:
+                self._ctl.close()
+                self._ctl = None
+            self._alive_cache = (0.0, False)
+            self._stop_dispatcher()
+            if ClaudeTmuxSession._instance is self:
+                ClaudeTmuxSession._instance = None
 
 
 # Backward compatibility alias for server.py
@@ -0,0 +1,162 @@
+"""
+Minimal inotify binding for waking up when Claude Code writes its JSONL transcripts.
+
+Talks to libc through ctypes so no extra dependency is needed. Where inotify is not
+available (non-Linux, missing directory, exhausted watches) or unreliable (network
+filesystems) DirectoryWatcher.create() returns None and callers fall back to polling.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import re
+import select
+import struct
+import threading
+from typing import Optional
+
+from logger import logger
+
+# Event masks from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_IGNORED = 0x00008000
+
+# Network filesystems: inotify only sees changes made through this client, so a
+# transcript written elsewhere (e.g. Claude running on the NFS server) never fires
+REMOTE_FS_TYPES = frozenset({"nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "ceph", "afs", "fuse.sshfs"})
+
+# struct inotify_event { int wd; uint32_t mask; uint32_t cookie; uint32_t len; char name[]; }
+_EVENT_HEADER = struct.Struct("iIII")
+
+_libc = None
+
+
+def _load_libc():
+    global _libc
+    if _libc is None:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        except OSError:
+            libc = None
+        # Symbols only exist on Linux libcs
+        _libc = libc if libc is not None and hasattr(libc, "inotify_init1") else False
+    return _libc or None
+
+
+def filesystem_type(path) -> Optional[str]:
+    """Return the type of the filesystem holding path (from /proc/self/mountinfo), or None."""
+    path = os.path.realpath(path)
+    best_mount, best_type = "", None
+    try:
+        with open("/proc/self/mountinfo") as f:
+            for line in f:
+                fields, _, rest = line.partition(" - ")
+                fields = fields.split()
+                if len(fields) < 5 or not rest:
+                    continue
+                # Mount points escape spaces etc. as octal (\040)
+                mount = re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), fields[4])
+                inside = path == mount or path.startswith(mount.rstrip("/") + "/")
+                if inside and len(mount) >= len(best_mount):
+                    best_mount, best_type = mount, rest.split()[0]
+    except OSError:
+        return None
+    return best_type
+
+
+class DirectoryWatcher:
+    """Watch a single directory for inotify events.
+
+    read() can be interrupted from another thread with wake().
+    """
+
+    def __init__(self, fd: int, path: str):
+        self._fd = fd
+        self.path = path
+        # Cleared when the kernel drops the watch (directory deleted or unmounted)
+        self.valid = True
+        # Self-pipe so wake() can interrupt a blocking read(); the lock keeps
+        # wake() from writing to a descriptor number that close() released
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, path, mask: int) -> Optional["DirectoryWatcher"]:
+        """Start watching path. Returns None if inotify is unavailable or unreliable for it."""
+        libc = _load_libc()
+        if libc is None:
+            return None
+
+        fs_type = filesystem_type(path)
+        if fs_type in REMOTE_FS_TYPES:
+            logger.info(f"[INOTIFY] {path} is on {fs_type}, falling back to polling")
+            return None
+
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            logger.debug(f"[INOTIFY] inotify_init1 failed: {os.strerror(ctypes.get_errno())}")
+            return None
+
+        path = os.fsdecode(path)
+        if libc.inotify_add_watch(fd, os.fsencode(path), mask) < 0:
+            logger.debug(f"[INOTIFY] Cannot watch {path}: {os.strerror(ctypes.get_errno())}")
+            os.close(fd)
+            return None
+
+        return cls(fd, path)
+
+    def read(self, timeout: float) -> list[tuple[int, str]]:
+        """Wait up to timeout seconds for events. Returns a list of (mask, name).
+
+        Returns early (possibly with no events) if wake() is called.
+        """
+        if self._fd < 0:
+            return []
+
+        ready, _, _ = select.select([self._fd, self._wake_r], [], [], max(timeout, 0))
+        if self._wake_r in ready:
+            try:
+                os.read(self._wake_r, 4096)
+            except BlockingIOError:
+                pass
+        if self._fd not in ready:
+            return []
+
+        try:
+            data = os.read(self._fd, 65536)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, mask, _, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset : offset + name_len].rstrip(b"\0").decode(errors="replace")
+            offset += name_len
+            if mask & IN_IGNORED:
+                self.valid = False
+            events.append((mask, name))
+        return events
+
+    def wake(self):
+        """Interrupt a read() blocked in another thread."""
+        with self._lock:
+            if self._fd < 0:
+                return
+            try:
+                os.write(self._wake_w, b"\0")
+            except BlockingIOError:
+                pass  # Pipe full — a wakeup is already pending
+
+    def close(self):
+        with self._lock:
+            if self._fd >= 0:
+                os.close(self._fd)
+                os.close(self._wake_r)
+                os.close(self._wake_w)
+                self._fd = -1
@@ -1,12 +1,17 @@
 """Logging configuration for claude-watch server"""
 
 import logging
+import os
 
 LOG_FILE = "/tmp/claude-watch.log"
 
+# Main log level; CLAUDE_WATCH_LOG_LEVEL=INFO drops the per-chunk debug records
+# written while Claude streams. Unknown names fall back to DEBUG
+LOG_LEVEL = logging.getLevelNamesMapping().get(os.environ.get("CLAUDE_WATCH_LOG_LEVEL", "").upper(), logging.DEBUG)
+
 # Create logger
 logger = logging.getLogger("claude-watch")
-logger.setLevel(logging.DEBUG)
+logger.setLevel(LOG_LEVEL)
 
 # Prevent duplicate handlers if module is imported multiple times
 if not logger.handlers:
@@ -22,3 +27,15 @@ if not logger.handlers:
 
     logger.addHandler(fh)
     logger.addHandler(ch)
+
+# TTS debug log - separate file, kept open instead of reopened for every line
+TTS_LOG_FILE = "/tmp/claude-watch-tts.log"
+
+tts_logger = logging.getLogger("claude-watch.tts")
+tts_logger.setLevel(logging.DEBUG)
+tts_logger.propagate = False
+
+if not tts_logger.handlers:
+    th = logging.FileHandler(TTS_LOG_FILE, delay=True)
+    th.setFormatter(logging.Formatter("%(message)s"))
+    tts_logger.addHandler(th)
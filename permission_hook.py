@@ -8,15 +8,15 @@ which broadcasts to connected mobile/watch apps for user approval.
 
 import json
 import os
+import socket
 import sys
 import time
-import urllib.error
-import urllib.request
 
 # Server configuration
 SERVER_HOST = "localhost"
 SERVER_PORT = 5566
-POLL_INTERVAL = 0.5  # seconds
+POLL_INTERVAL = 0.5  # seconds to back off after a failed wait request
+WAIT_SLICE = 30  # seconds the server holds each long-poll before answering "pending"
 TIMEOUT = 120  # seconds to wait for approval
 
 # Tools that always need approval
@@ -24,7 +24,8 @@ SENSITIVE_TOOLS = {"Bash", "Write", "Edit", "NotebookEdit"}
 
 # Patterns that are auto-approved (safe operations)
 AUTO_APPROVE_PATTERNS = {
-    "Bash": [
+    # A tuple so str.startswith can check every prefix in one call
+    "Bash": (
         "ls ",
         "cat ",
         "head ",
@@ -38,7 +39,7 @@ AUTO_APPROVE_PATTERNS = {
         "which ",
         "type ",
         "file ",
-    ],
+    ),
     "Read": True,  # Always auto-approve reads
     "Glob": True,
     "Grep": True,
@@ -53,49 +54,72 @@ def is_safe_operation(tool_name: str, tool_input: dict) -> bool:
             return True
         if tool_name == "Bash":
             command = tool_input.get("command", "")
-            return any(command.startswith(p) for p in patterns)
+            return command.startswith(patterns)
     return False
 
 
+def _request_json(method: str, path: str, data: dict | None = None, timeout: float = 5) -> dict:
+    """Make one HTTP/1.0 request to the server and return the decoded JSON body.
+
+    Uses a plain socket: urllib.request and http.client import the email package,
+    which costs about 40 ms of every hook start.
+    """
+    body = b"" if data is None else json.dumps(data).encode()
+    head = f"{method} {path} HTTP/1.0\r\nHost: {SERVER_HOST}:{SERVER_PORT}\r\n"
+    if data is not None:
+        head += f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+
+    with socket.create_connection((SERVER_HOST, SERVER_PORT), timeout=timeout) as sock:
+        sock.sendall(head.encode() + b"\r\n" + body)
+        # HTTP/1.0: the server closes the connection after the response
+        chunks = []
+        while chunk := sock.recv(65536):
+            chunks.append(chunk)
+
+    header, _, payload = b"".join(chunks).partition(b"\r\n\r\n")
+    status = int(header.split(None, 2)[1])
+    if status != 200:
+        raise OSError(f"HTTP {status}")
+    return json.loads(payload)
+
+
 def request_permission(tool_name: str, tool_input: dict, tool_use_id: str) -> dict:
     """Send permission request to server and wait for response."""
-    url = f"http://{SERVER_HOST}:{SERVER_PORT}/api/permission/request"
-
     request_data = {
         "tool_name": tool_name,
         "tool_input": tool_input,
         "tool_use_id": tool_use_id,
+        # Part of the server's decision-cache key: the same command in another project is a new question
+        "cwd": os.getcwd(),
         "timestamp": time.time(),
     }
 
     # Send request
     try:
-        req = urllib.request.Request(
-            url, data=json.dumps(request_data).encode(), headers={"Content-Type": "application/json"}, method="POST"
-        )
-        with urllib.request.urlopen(req, timeout=5) as resp:
-            result = json.loads(resp.read().decode())
-            request_id = result.get("request_id")
+        result = _request_json("POST", "/api/permission/request", request_data)
+        request_id = result.get("request_id")
+        # The server remembered a decision for this exact call
+        if result.get("status") == "resolved":
+            return {"decision": result.get("decision", "deny"), "reason": result.get("reason", "")}
     except Exception as e:
         # If server unavailable, deny by default
         sys.stderr.write(f"Failed to contact server: {e}\n")
         return {"decision": "deny", "reason": "Permission server unavailable"}
 
-    # Poll for response
-    poll_url = f"http://{SERVER_HOST}:{SERVER_PORT}/api/permission/status/{request_id}"
+    # Long-poll for response: the server answers as soon as the decision is made
+    wait_path = f"/api/permission/wait/{request_id}"
     start_time = time.time()
 
-    while time.time() - start_time < TIMEOUT:
+    while (remaining := TIMEOUT - (time.time() - start_time)) > 0:
+        wait = min(remaining, WAIT_SLICE)
         try:
-            with urllib.request.urlopen(poll_url, timeout=5) as resp:
-                status = json.loads(resp.read().decode())
-                if status.get("status") == "pending":
-                    time.sleep(POLL_INTERVAL)
-                    continue
-                return {
-                    "decision": status.get("decision", "deny"),
-                    "reason": status.get("reason", ""),
-                }
+            status = _request_json("GET", f"{wait_path}?timeout={wait:.1f}", timeout=wait + 5)
+            if status.get("status") == "pending":
+                continue
+            return {
+                "decision": status.get("decision", "deny"),
+                "reason": status.get("reason", ""),
+            }
         except Exception as e:
             sys.stderr.write(f"Poll error: {e}\n")
             time.sleep(POLL_INTERVAL)
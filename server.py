@@ -16,20 +16,23 @@ Endpoints:
 
 import argparse
 import asyncio
+import itertools
 import json
 import os
-import socket
+import queue
 import sys
 import threading
 import time
 import uuid
-from datetime import datetime, timezone
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
 
-from aiohttp import web
+import aiohttp
+from aiohttp import WSMsgType, web
 
 from claude_wrapper import ClaudeWrapper
-from logger import logger
+from logger import logger, tts_logger
 from tailscale_auth import verify_peer
 
 # Load Deepgram API key from environment (set via EnvironmentFile in systemd)
@@ -37,15 +40,42 @@ if not os.environ.get("DEEPGRAM_API_KEY"):
     print("Error: DEEPGRAM_API_KEY environment variable not set", file=sys.stderr)
     sys.exit(1)
 
-from deepgram import DeepgramClient
+# _dumpb gives the UTF-8 bytes that go on the wire; _loads parses request bodies as bytes
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumpb(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+except ImportError:  # optional speedup for broadcasts and history responses
+    _loads = json.loads
+
+    def _dumpb(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
 
 PORT = 5566
-client = DeepgramClient()
+
+# Largest JSON body accepted by the /api POST endpoints; audio uploads are streamed and not limited
+MAX_JSON_BODY = 1 << 20
+
+
+# Last timestamp handed out as (epoch milliseconds, string); streamed events arriving
+# within the same millisecond reuse the string instead of formatting it again
+_utc_iso_cache = (0, "")
 
 
 def utc_now_iso() -> str:
     """Return current UTC time as ISO 8601 string with Z suffix (matches Claude JSONL format)."""
-    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+    global _utc_iso_cache
+    ms = time.time_ns() // 1_000_000
+    cached_ms, text = _utc_iso_cache
+    if ms != cached_ms:
+        seconds, millis = divmod(ms, 1000)
+        text = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds)) + f".{millis:03d}Z"
+        _utc_iso_cache = (ms, text)
+    return text
 
 
 # Guard against duplicate Claude launches
@@ -59,9 +89,11 @@ claude_workdir = None
 # Note: tmux session name kept for backwards compatibility reference
 CLAUDE_TMUX_SESSION = "claude-watch"
 
-# Request history for dashboard
-request_history = []
+# Request history for dashboard, newest first; the deque drops the oldest past MAX_HISTORY
 MAX_HISTORY = 100
+request_history: deque[dict] = deque(maxlen=MAX_HISTORY)
+# The same entries keyed by request_id, so steps are added without scanning the history
+request_index: dict[str, dict] = {}
 
 # Store responses from Claude (keyed by request ID)
 claude_responses = {}
@@ -82,6 +114,16 @@ CONFIG_OPTIONS = {
     "response_modes": ["text", "audio", "disabled"],
 }
 
+# POST /api/config fields checked against CONFIG_OPTIONS: (field, allowed values, target dict, target key).
+# CONFIG_OPTIONS keeps its lists so GET /api/config returns the options in display order
+CONFIG_CHOICES = (
+    ("model", frozenset(CONFIG_OPTIONS["models"]), transcription_config, "model"),
+    ("language", frozenset(CONFIG_OPTIONS["languages"]), transcription_config, "language"),
+    ("response_mode", frozenset(CONFIG_OPTIONS["response_modes"]), response_config, "mode"),
+)
+# POST /api/config fields stored as booleans in transcription_config
+CONFIG_FLAGS = ("smart_format", "punctuate")
+
 # Directory for temporary audio files
 AUDIO_CACHE_DIR = "/tmp/claude-watch-audio"
 os.makedirs(AUDIO_CACHE_DIR, exist_ok=True)
@@ -94,8 +136,31 @@ claude_state = {
 }
 
 # Chat history (in-memory, last 50 messages)
-chat_history = []
 MAX_CHAT_HISTORY = 50
+chat_history: deque[dict] = deque(maxlen=MAX_CHAT_HISTORY)
+
+# Bumped after every change to the history (or an entry in it) and to what /api/chat
+# returns. They are the ETags of those responses, so an unchanged poll gets a 304;
+# the server ID keeps versions from a previous run from matching
+SERVER_ID = uuid.uuid4().hex[:8]
+_versions = itertools.count(1)
+history_version = 0
+chat_version = 0
+
+
+# Last body sent per versioned endpoint: path -> (version, JSON bytes)
+versioned_json_cache: dict[str, tuple[int, bytes]] = {}
+
+
+def history_changed():
+    global history_version
+    history_version = next(_versions)
+
+
+def chat_changed():
+    global chat_version
+    chat_version = next(_versions)
+
 
 # Connected WebSocket clients: ws -> {device_type, device_id, connected_at, ip}
 websocket_clients = {}
@@ -103,6 +168,11 @@ websocket_clients = {}
 # Active Claude wrapper (for cancellation)
 active_claude_wrapper: ClaudeWrapper = None
 
+# Claude session for server prompts and the model it was fetched with;
+# get_instance() is only called again when the configured model changes
+claude_session: ClaudeWrapper = None
+claude_session_model: str | None = None
+
 # Terminal request tracking (for tmux-typed prompts)
 terminal_request_id: str | None = None
 
@@ -113,32 +183,110 @@ current_prompt = None  # {question, options: [{num, label, description, selected
 pending_permissions = {}  # {request_id: {tool_name, tool_input, tool_use_id, status, decision, reason, timestamp}}
 PERMISSION_TIMEOUT = 120  # seconds
 
+# Set when a pending permission is resolved, waking hooks long-polling /api/permission/wait
+permission_events: dict[str, threading.Event] = {}
+# Longest a single /api/permission/wait request is held open (seconds)
+PERMISSION_WAIT_MAX = 60
+
+# Recent decisions for identical tool calls, so a repeated `npm test` or edit of the
+# same file is answered without asking the phone again. Allows expire after
+# PERMISSION_ALLOW_TTL; denies stick until the server restarts or the cache is cleared.
+permission_decisions: dict[tuple[str, str, str], tuple[str, str, float]] = {}  # {key: (decision, reason, expires)}
+PERMISSION_ALLOW_TTL = 600  # seconds
+
 # Event loop for WebSocket (set when server starts)
 ws_loop = None
 
+# Longest one client may take to accept a broadcast before it is dropped (seconds)
+WS_SEND_TIMEOUT = 5.0
+# Messages waiting for one client before it counts as too slow and is dropped
+WS_QUEUE_SIZE = 256
+
+# Outgoing queue and sender task per WebSocket client, touched only on ws_loop
+client_senders: dict[web.WebSocketResponse, tuple[asyncio.Queue, asyncio.Task]] = {}
+
+# Serialized broadcasts waiting to be handed to ws_loop. A streaming turn
+# broadcasts many small messages from other threads; they cross over in one
+# call_soon_threadsafe per batch instead of one per message
+pending_broadcasts: deque[bytes] = deque()
+pending_broadcasts_lock = threading.Lock()
+
+# How long the "speaking" state is shown before returning to idle (seconds)
+SPEAKING_IDLE_DELAY = 5
+# Pending return-to-idle timer on ws_loop; each new response replaces it
+idle_timer: asyncio.TimerHandle | None = None
+
+
+def _drop_client(ws):
+    """Forget a client that disconnected, failed or fell behind. Must run on ws_loop."""
+    websocket_clients.pop(ws, None)
+    sender = client_senders.pop(ws, None)
+    if sender is not None:
+        sender[1].cancel()
+        asyncio.ensure_future(ws.close())
+
+
+async def _client_sender(ws, outbox: asyncio.Queue):
+    """Send queued messages to one client in order; drop it if a send errors or stalls."""
+    while True:
+        msg_json = await outbox.get()
+        try:
+            await asyncio.wait_for(ws.send_frame(msg_json, WSMsgType.TEXT), WS_SEND_TIMEOUT)
+        except Exception as e:
+            logger.debug(f"WebSocket send error: {e!r}")
+            _drop_client(ws)
+            return
+
+
+def _attach_sender(ws, *initial: bytes):
+    """Give ws an outgoing queue, primed with initial messages, and start its sender. Must run on ws_loop."""
+    outbox = asyncio.Queue(maxsize=WS_QUEUE_SIZE)
+    for msg_json in initial:
+        outbox.put_nowait(msg_json)
+    client_senders[ws] = (outbox, asyncio.create_task(_client_sender(ws, outbox)))
+
+
+def _enqueue(msg_json: bytes):
+    """Queue a serialized message for every client. Must run on ws_loop.
+
+    The JSON is encoded once and the same bytes are queued for each client, so
+    a slow client never holds up the others or the caller. A client that falls
+    WS_QUEUE_SIZE messages behind is dropped; it gets the history on reconnect.
+    """
+    for ws, (outbox, _) in list(client_senders.items()):
+        try:
+            outbox.put_nowait(msg_json)
+        except asyncio.QueueFull:
+            logger.warning(
+                f"[WS] Dropping client {websocket_clients.get(ws, {}).get('ip')}: {outbox.qsize()} messages behind"
+            )
+            _drop_client(ws)
+
+
+def _flush_broadcasts():
+    """Queue every message broadcast since the last flush. Runs on ws_loop."""
+    with pending_broadcasts_lock:
+        batch = list(pending_broadcasts)
+        pending_broadcasts.clear()
+    for msg_json in batch:
+        _enqueue(msg_json)
+
 
 def broadcast_message(message: dict):
     """Broadcast a message to all connected WebSocket clients"""
     if not websocket_clients or ws_loop is None:
         return
 
-    async def _broadcast():
-        dead_clients = []
-        msg_json = json.dumps(message)
-        for ws in websocket_clients:
-            try:
-                await ws.send_str(msg_json)
-            except Exception as e:
-                logger.debug(f"WebSocket send error: {e}")
-                dead_clients.append(ws)
-        # Remove dead clients
-        for ws in dead_clients:
-            websocket_clients.pop(ws, None)
-
-    try:
-        asyncio.run_coroutine_threadsafe(_broadcast(), ws_loop)
-    except Exception as e:
-        logger.debug(f"Broadcast error: {e}")
+    msg_json = _dumpb(message)
+    with pending_broadcasts_lock:
+        # Only the first message of a batch has to wake the loop
+        wake = not pending_broadcasts
+        pending_broadcasts.append(msg_json)
+    if wake:
+        try:
+            ws_loop.call_soon_threadsafe(_flush_broadcasts)
+        except Exception as e:
+            logger.debug(f"Broadcast error: {e}")
 
 
 def set_claude_state(status: str, request_id: str = None):
@@ -146,19 +294,36 @@ def set_claude_state(status: str, request_id: str = None):
     claude_state["status"] = status
     claude_state["current_request_id"] = request_id
     claude_state["last_update"] = utc_now_iso()
+    chat_changed()
 
     broadcast_message({"type": "state", "status": status, "request_id": request_id})
     logger.info(f"[STATE] Claude state: {status}")
 
 
+def _return_to_idle():
+    if claude_state.get("status") == "speaking":
+        set_claude_state("idle")
+
+
+def _restart_idle_timer():
+    """Must run on ws_loop."""
+    global idle_timer
+    if idle_timer is not None:
+        idle_timer.cancel()
+    idle_timer = ws_loop.call_later(SPEAKING_IDLE_DELAY, _return_to_idle)
+
+
+def schedule_return_to_idle():
+    """Go back to idle after SPEAKING_IDLE_DELAY, unless another response is spoken first"""
+    if ws_loop is not None:
+        ws_loop.call_soon_threadsafe(_restart_idle_timer)
+
+
 def add_chat_message(role: str, content: str):
     """Add a message to chat history and broadcast"""
     message = {"role": role, "content": content, "timestamp": utc_now_iso()}
     chat_history.append(message)
-
-    # Trim to max size
-    while len(chat_history) > MAX_CHAT_HISTORY:
-        chat_history.pop(0)
+    chat_changed()
 
     broadcast_message({"type": "chat", **message})
     logger.info(f"[CHAT] {role}: {content[:50]}...")
@@ -168,6 +333,7 @@ def set_current_prompt(prompt: dict):
     """Update current prompt and broadcast to clients"""
     global current_prompt
     current_prompt = prompt
+    chat_changed()
 
     broadcast_message({"type": "prompt", "prompt": prompt})
     if prompt:
@@ -176,45 +342,65 @@ def set_current_prompt(prompt: dict):
         logger.info("[PROMPT] Cleared")
 
 
+# Deepgram REST API, called directly rather than through the SDK
+DEEPGRAM_API_URL = "https://api.deepgram.com/v1"
+TTS_PARAMS = {"model": "aura-asteria-en", "mip_opt_out": "true"}
+TTS_MAX_CHARS = 1500  # Deepgram TTS rejects longer input
+TTS_TIMEOUT = aiohttp.ClientTimeout(total=30)
+STT_TIMEOUT = aiohttp.ClientTimeout(total=60)
+# Uploads are forwarded to Deepgram in chunks of this size as they arrive
+STT_CHUNK_SIZE = 64 * 1024
+
+# HTTPS session for Deepgram calls, opened on ws_loop the first time it is needed so
+# later requests reuse the kept-alive TLS connection instead of handshaking again
+deepgram_session: aiohttp.ClientSession | None = None
+
+
+def _deepgram_session() -> aiohttp.ClientSession:
+    """Return the shared Deepgram session; must be called on ws_loop."""
+    global deepgram_session
+    if deepgram_session is None or deepgram_session.closed:
+        deepgram_session = aiohttp.ClientSession(
+            headers={"Authorization": f"Token {os.environ['DEEPGRAM_API_KEY']}"},
+            connector=aiohttp.TCPConnector(limit=10, keepalive_timeout=60),
+        )
+    return deepgram_session
+
+
+async def _speak(text: str) -> bytes:
+    """POST text to Deepgram TTS and return the MP3 bytes."""
+    async with _deepgram_session().post(
+        f"{DEEPGRAM_API_URL}/speak",
+        params=TTS_PARAMS,
+        json={"text": text},
+        timeout=TTS_TIMEOUT,
+    ) as response:
+        response.raise_for_status()
+        return await response.read()
+
+
 def text_to_speech(text: str, request_id: str) -> str:
     """Convert text to speech using Deepgram TTS, returns file path"""
-    log_file = "/tmp/claude-watch-tts.log"
     try:
-        with open(log_file, "a") as f:
-            f.write(f"\n=== TTS Request {request_id} ===\n")
-            f.write(f"Text: {text[:100]}...\n")
-            # Debug: log available methods
-            f.write(f"client.speak attrs: {[a for a in dir(client.speak) if not a.startswith('_')]}\n")
+        tts_logger.info(f"\n=== TTS Request {request_id} ===")
+        tts_logger.info(f"Text: {text[:100]}...")
 
         audio_path = os.path.join(AUDIO_CACHE_DIR, f"{request_id}.mp3")
 
         # Truncate text if too long (Deepgram TTS has limits)
-        MAX_TTS_CHARS = 1500
-        if len(text) > MAX_TTS_CHARS:
-            text = text[:MAX_TTS_CHARS] + "..."
-            with open(log_file, "a") as f:
-                f.write(f"Truncated to {MAX_TTS_CHARS} chars\n")
-
-        # Use direct HTTP request to Deepgram TTS API
-        import urllib.error
-        import urllib.request
-
-        url = "https://api.deepgram.com/v1/speak?model=aura-asteria-en&mip_opt_out=true"
-        headers = {
-            "Authorization": f"Token {os.environ['DEEPGRAM_API_KEY']}",
-            "Content-Type": "application/json",
-        }
-        data = json.dumps({"text": text}).encode("utf-8")
+        if len(text) > TTS_MAX_CHARS:
+            text = text[:TTS_MAX_CHARS] + "..."
+            tts_logger.info(f"Truncated to {TTS_MAX_CHARS} chars")
 
-        req = urllib.request.Request(url, data=data, headers=headers, method="POST")
-        with urllib.request.urlopen(req, timeout=30) as response:
-            audio_data = response.read()
+        # Direct HTTP request to Deepgram TTS, run on the WebSocket loop's shared session
+        if ws_loop is None:
+            raise RuntimeError("Event loop not running")
+        audio_data = asyncio.run_coroutine_threadsafe(_speak(text), ws_loop).result(timeout=35)
 
         with open(audio_path, "wb") as f:
             f.write(audio_data)
 
-        with open(log_file, "a") as f:
-            f.write(f"Success: {audio_path} ({len(audio_data)} bytes)\n")
+        tts_logger.info(f"Success: {audio_path} ({len(audio_data)} bytes)")
 
         print(f"[TTS] Generated audio: {audio_path}")
         return audio_path
@@ -222,111 +408,219 @@ def text_to_speech(text: str, request_id: str) -> str:
         import traceback
 
         error_msg = traceback.format_exc()
-        with open(log_file, "a") as f:
-            f.write(f"Error: {e}\n")
-            f.write(f"Traceback:\n{error_msg}\n")
+        tts_logger.error(f"Error: {e}\nTraceback:\n{error_msg}")
         print(f"[TTS] Error generating speech: {e}")
         traceback.print_exc()
         return None
 
 
-def transcribe_audio(audio_data: bytes) -> str:
-    """Transcribe m4a audio data using Deepgram (auto-detects format)"""
-    response = client.listen.v1.media.transcribe_file(
-        request=audio_data,
-        model=transcription_config["model"],
-        language=transcription_config["language"],
-        smart_format=transcription_config["smart_format"],
-        punctuate=transcription_config["punctuate"],
-        mip_opt_out=True,
-    )
+async def _read_chunks(stream, size: int):
+    """Yield up to size bytes from a blocking file object without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    while size > 0:
+        chunk = await loop.run_in_executor(None, stream.read, min(STT_CHUNK_SIZE, size))
+        if not chunk:
+            break
+        size -= len(chunk)
+        yield chunk
+
+
+async def _listen(audio, content_type: str, size: int | None = None) -> dict:
+    """POST audio to Deepgram pre-recorded STT and return the JSON response.
+
+    audio is either bytes or a file object to stream size bytes from.
+    """
+    params = {
+        "model": transcription_config["model"],
+        "language": transcription_config["language"],
+        "smart_format": str(transcription_config["smart_format"]).lower(),
+        "punctuate": str(transcription_config["punctuate"]).lower(),
+        "mip_opt_out": "true",
+    }
+    headers = {"Content-Type": content_type}
+    if not isinstance(audio, bytes):
+        headers["Content-Length"] = str(size)
+        audio = _read_chunks(audio, size)
+    async with _deepgram_session().post(
+        f"{DEEPGRAM_API_URL}/listen",
+        params=params,
+        data=audio,
+        headers=headers,
+        timeout=STT_TIMEOUT,
+    ) as response:
+        response.raise_for_status()
+        return await response.json()
+
+
+def transcribe_audio(audio, content_type: str = "application/octet-stream", size: int | None = None) -> str:
+    """Transcribe audio using Deepgram (auto-detects format).
+
+    Pass a file object and its size to stream the upload instead of buffering it.
+    """
+    if ws_loop is None:
+        raise RuntimeError("Event loop not running")
+    response = asyncio.run_coroutine_threadsafe(_listen(audio, content_type, size), ws_loop).result(timeout=65)
+
+    channels = (response.get("results") or {}).get("channels") or [{}]
+    alternatives = channels[0].get("alternatives") or [{}]
+    return alternatives[0].get("transcript", "")
 
-    transcript = ""
-    if hasattr(response, "results"):
-        channels = response.results.channels
-        if channels and len(channels) > 0:
-            alternatives = channels[0].alternatives
-            if alternatives and len(alternatives) > 0:
-                transcript = alternatives[0].transcript
 
-    return transcript
+def add_history_entry(entry: dict):
+    """Insert a request at the top of the history, dropping the oldest past MAX_HISTORY"""
+    if len(request_history) == request_history.maxlen:
+        dropped = request_history[-1]
+        if request_index.get(dropped["request_id"]) is dropped:
+            del request_index[dropped["request_id"]]
+    request_history.appendleft(entry)
+    request_index[entry["request_id"]] = entry
+    history_changed()
 
 
 def add_response_step(request_id: str, step: dict):
     """Add a step to the request history for response tracking"""
-    for entry in request_history:
-        if entry.get("request_id") == request_id:
-            if "steps" not in entry:
-                entry["steps"] = []
-            entry["steps"].append(step)
-            break
+    entry = request_index.get(request_id)
+    if entry is not None:
+        entry.setdefault("steps", []).append(step)
+        history_changed()
 
 
 def update_response_step(request_id: str, step_name: str, updates: dict):
     """Update an existing step in the request history"""
-    for entry in request_history:
-        if entry.get("request_id") == request_id:
-            for step in entry.get("steps", []):
-                if step.get("name") == step_name:
-                    step.update(updates)
-                    break
-            break
+    entry = request_index.get(request_id)
+    if entry is not None:
+        for step in entry.get("steps", []):
+            if step.get("name") == step_name:
+                step.update(updates)
+                history_changed()
+                break
 
 
 def update_permission_step(claude_request_id: str, permission_request_id: str, updates: dict):
     """Update a permission step in request history by permission_request_id"""
-    for entry in request_history:
-        if entry.get("request_id") == claude_request_id:
-            for step in entry.get("steps", []):
-                if step.get("permission_request_id") == permission_request_id:
-                    step.update(updates)
-                    break
-            break
+    entry = request_index.get(claude_request_id)
+    if entry is not None:
+        for step in entry.get("steps", []):
+            if step.get("permission_request_id") == permission_request_id:
+                step.update(updates)
+                history_changed()
+                break
+
+
+def _permission_cache_key(tool_name: str, tool_input, cwd: str) -> tuple[str, str, str]:
+    """Key a tool call by name, canonical input and working directory."""
+    return tool_name, json.dumps(tool_input, sort_keys=True, separators=(",", ":")), cwd
+
+
+def _cached_permission(key) -> tuple[str, str] | None:
+    """Return (decision, reason) remembered for key, or None if absent or expired."""
+    cached = permission_decisions.get(key)
+    if cached is None:
+        return None
+    decision, reason, expires = cached
+    if time.monotonic() >= expires:
+        permission_decisions.pop(key, None)
+        return None
+    return decision, reason
+
+
+def _truncate(text: str, limit: int) -> str:
+    """Cut text to limit characters, marking the cut with "..."; short text is returned as is."""
+    if len(text) <= limit:
+        return text
+    return text[:limit] + "..."
+
+
+def _utf8_len(text: str) -> int:
+    """Byte length of text as UTF-8, without encoding it when it is plain ASCII."""
+    return len(text) if text.isascii() else len(text.encode())
+
+
+# Input field shown for each known tool, and the length it is cut to (None keeps it whole)
+TOOL_SUMMARY_FIELDS = {
+    "Bash": ("command", 80),
+    "Read": ("file_path", None),
+    "Write": ("file_path", None),
+    "Edit": ("file_path", None),
+    "Glob": ("pattern", None),
+    "Grep": ("pattern", None),
+    "Task": ("description", None),
+    "WebFetch": ("url", None),
+}
 
 
 def _summarize_tool_input(name, input_data):
     """Return a short summary string for a tool invocation."""
     if not isinstance(input_data, dict):
         return ""
-    if name == "Bash":
-        cmd = input_data.get("command", "")
-        return cmd[:80] + ("..." if len(cmd) > 80 else "")
-    if name in ("Read", "Write"):
-        return input_data.get("file_path", "")
-    if name == "Edit":
-        return input_data.get("file_path", "")
-    if name in ("Glob", "Grep"):
-        return input_data.get("pattern", "")
-    if name == "Task":
-        return input_data.get("description", "")
-    if name == "WebFetch":
-        return input_data.get("url", "")
+    if name in TOOL_SUMMARY_FIELDS:
+        field, limit = TOOL_SUMMARY_FIELDS[name]
+        value = input_data.get(field, "")
+        return _truncate(value, limit) if limit else value
     # Fallback: first string value up to 80 chars
     for v in input_data.values():
         if isinstance(v, str) and v:
-            return v[:80] + ("..." if len(v) > 80 else "")
+            return _truncate(v, 80)
     return ""
 
 
+def _bash_permission_prompt(tool_name, tool_input):
+    return f"Run command: {tool_input.get('command', '')}", tool_input.get("description", "")
+
+
+def _file_permission_prompt(tool_name, tool_input):
+    context = tool_input.get("content", tool_input.get("new_string", ""))[:200]
+    return f"{tool_name} file: {tool_input.get('file_path', '')}", context
+
+
+def _generic_permission_prompt(tool_name, tool_input):
+    return f"Execute {tool_name}", json.dumps(tool_input)[:200]
+
+
+# Builds the (question, context) shown on the phone for a permission request
+PERMISSION_PROMPTS = {
+    "Bash": _bash_permission_prompt,
+    "Write": _file_permission_prompt,
+    "Edit": _file_permission_prompt,
+}
+
+# Choices offered for every permission request; shared, never modified
+PERMISSION_OPTIONS = (
+    {"num": 1, "label": "Allow", "description": "Permit this operation"},
+    {"num": 2, "label": "Deny", "description": "Block this operation"},
+)
+
+
+def get_claude_session() -> ClaudeWrapper:
+    """Return the cached Claude session, refetching it only if the configured model changed"""
+    global claude_session, claude_session_model
+    model = transcription_config.get("claude_model")
+    if claude_session is None or model != claude_session_model:
+        claude_session = ClaudeWrapper.get_instance(claude_workdir, model=model)
+        claude_session_model = model
+    return claude_session
+
+
 def init_claude_wrapper():
     """Initialize the Claude wrapper with global callbacks and start the background watcher.
 
     Global callbacks broadcast all activity to WebSocket clients, regardless of
     whether the prompt came from the server or was typed directly in tmux.
     """
-    model = transcription_config.get("claude_model")
-    wrapper = ClaudeWrapper.get_instance(claude_workdir, model=model)
+    global claude_session
+    # Drop any session cached before a restart
+    claude_session = None
+    wrapper = get_claude_session()
 
     def _store_claude_timestamp(req_id, claude_timestamp):
         """Store the first and last claude timestamp on the history entry."""
         if not req_id or not claude_timestamp:
             return
-        for entry in request_history:
-            if entry.get("request_id") == req_id:
-                if "first_claude_timestamp" not in entry:
-                    entry["first_claude_timestamp"] = claude_timestamp
-                entry["last_claude_timestamp"] = claude_timestamp
-                break
+        entry = request_index.get(req_id)
+        if entry is not None:
+            entry.setdefault("first_claude_timestamp", claude_timestamp)
+            entry["last_claude_timestamp"] = claude_timestamp
+            history_changed()
 
     def on_text(text_chunk, claude_timestamp=None):
         req_id = claude_state.get("current_request_id")
@@ -370,7 +664,7 @@ def init_claude_wrapper():
             "timestamp": utc_now_iso(),
             "input_type": "terminal",
             "content_type": "text/plain",
-            "size_bytes": len(text.encode()),
+            "size_bytes": _utf8_len(text),
             "transcript": text,
             "claude_launched": True,
             "status": "processing",
@@ -392,9 +686,7 @@ def init_claude_wrapper():
                 },
             ],
         }
-        request_history.insert(0, entry)
-        if len(request_history) > MAX_HISTORY:
-            request_history.pop()
+        add_history_entry(entry)
 
         set_claude_state("thinking", request_id)
 
@@ -424,11 +716,8 @@ def init_claude_wrapper():
             req_id = terminal_request_id
             if req_id:
                 # Add Response Ready step with Claude's JSONL timestamp
-                claude_ts = None
-                for entry in request_history:
-                    if entry.get("request_id") == req_id:
-                        claude_ts = entry.get("last_claude_timestamp")
-                        break
+                entry = request_index.get(req_id)
+                claude_ts = entry.get("last_claude_timestamp") if entry else None
                 if claude_ts:
                     add_response_step(
                         req_id,
@@ -463,10 +752,9 @@ def init_claude_wrapper():
                     },
                 )
                 # Mark the history entry as completed or error
-                for entry in request_history:
-                    if entry.get("request_id") == req_id:
-                        entry["status"] = "completed" if result else "error"
-                        break
+                if entry is not None:
+                    entry["status"] = "completed" if result else "error"
+                    history_changed()
                 terminal_request_id = None
 
             set_claude_state("idle")
@@ -483,6 +771,35 @@ def init_claude_wrapper():
     return wrapper
 
 
+# Server prompts run on a few reusable worker threads instead of a new thread each.
+# Plain daemon threads rather than a ThreadPoolExecutor, whose workers are joined at
+# exit and would hold up Ctrl+C for as long as a turn in progress takes
+CLAUDE_WORKERS = 4
+claude_jobs: queue.SimpleQueue = queue.SimpleQueue()
+claude_worker_threads: list[threading.Thread] = []
+claude_workers_lock = threading.Lock()
+
+
+def _claude_worker():
+    while True:
+        job = claude_jobs.get()
+        try:
+            job()
+        except Exception as e:
+            logger.error(f"[CLAUDE] Worker job failed: {e}")
+
+
+def submit_claude_job(job):
+    """Queue job for the Claude workers, starting them on first use"""
+    with claude_workers_lock:
+        if not claude_worker_threads:
+            for i in range(CLAUDE_WORKERS):
+                thread = threading.Thread(target=_claude_worker, name=f"claude-{i}", daemon=True)
+                thread.start()
+                claude_worker_threads.append(thread)
+    claude_jobs.put(job)
+
+
 def run_claude(text: str, request_id: str = None, response_mode: str = "text"):
     """Run Claude with a prompt using the JSON streaming wrapper."""
     global last_claude_launch, active_claude_wrapper
@@ -518,11 +835,8 @@ def run_claude(text: str, request_id: str = None, response_mode: str = "text"):
     def run_in_thread():
         global active_claude_wrapper
         try:
-            # Get model from config if set
-            model = transcription_config.get("claude_model")
-
             # Use singleton wrapper for persistent process
-            wrapper = ClaudeWrapper.get_instance(claude_workdir, model=model)
+            wrapper = get_claude_session()
             active_claude_wrapper = wrapper
 
             accumulated_text = []
@@ -530,7 +844,7 @@ def run_claude(text: str, request_id: str = None, response_mode: str = "text"):
             def on_text(text_chunk):
                 """Per-request callback: accumulate text for result tracking."""
                 accumulated_text.append(text_chunk)
-                logger.debug(f"[CLAUDE] Text: {text_chunk[:50]}...")
+                logger.debug("[CLAUDE] Text: %.50s...", text_chunk)
 
             def on_result(result):
                 logger.info(f"[CLAUDE] Result: {result[:100]}...")
@@ -556,12 +870,8 @@ def run_claude(text: str, request_id: str = None, response_mode: str = "text"):
                 return
 
             # Look up claude timestamps stored by global on_text/on_tool callbacks
-            claude_ts = None
-            if request_id:
-                for entry in request_history:
-                    if entry.get("request_id") == request_id:
-                        claude_ts = entry.get("last_claude_timestamp")
-                        break
+            entry = request_index.get(request_id) if request_id else None
+            claude_ts = entry.get("last_claude_timestamp") if entry else None
 
             # Add "Response Ready" step with Claude's JSONL timestamp
             if claude_ts:
@@ -582,7 +892,7 @@ def run_claude(text: str, request_id: str = None, response_mode: str = "text"):
                 "label": "Response Captured",
                 "status": "completed",
                 "timestamp": utc_now_iso(),
-                "details": result[:200] + ("..." if len(result) > 200 else ""),
+                "details": _truncate(result, 200),
             }
             if claude_ts:
                 captured_step["claude_timestamp"] = claude_ts
@@ -654,14 +964,7 @@ def run_claude(text: str, request_id: str = None, response_mode: str = "text"):
 
             # Update state
             set_claude_state("speaking", request_id)
-
-            def return_to_idle():
-                time.sleep(5)
-                if claude_state.get("status") == "speaking":
-                    set_claude_state("idle")
-
-            idle_thread = threading.Thread(target=return_to_idle, daemon=True)
-            idle_thread.start()
+            schedule_return_to_idle()
 
         except Exception as e:
             logger.error(f"[CLAUDE] Error: {e}")
@@ -689,40 +992,45 @@ def run_claude(text: str, request_id: str = None, response_mode: str = "text"):
             set_claude_state("idle")
             active_claude_wrapper = None
 
-    # Run in background thread
-    thread = threading.Thread(target=run_in_thread, daemon=True)
-    thread.start()
+    # Run on a background worker
+    submit_claude_job(run_in_thread)
 
     return True
 
 
+DASHBOARD_PATH = os.path.join(os.path.dirname(__file__), "dashboard.html")
+VIEWER_PATH = os.path.join(os.path.dirname(__file__), "viewer.html")
+
+# Static pages held in memory: path -> (mtime_ns, content). A stat per request
+# still picks up edits to the HTML without restarting the server
+static_cache: dict[str, tuple[int, bytes]] = {}
+
+
+def read_static(path: str) -> bytes | None:
+    """Return the file's content, rereading it only when it changed; None if it is missing."""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached = static_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path, "rb") as f:
+            cached = (mtime, f.read())
+        static_cache[path] = cached
+    return cached[1]
+
+
 class DictationHandler(BaseHTTPRequestHandler):
     def handle(self):
-        # Peek at raw data before any parsing
-        print(f"\n{'=' * 50}")
-        print(f"[CONN] New connection from {self.client_address}")
-        try:
-            # Read first 500 bytes to debug
-            self.connection.setblocking(0)
-            import select
-
-            ready = select.select([self.connection], [], [], 1.0)
-            if ready[0]:
-                peek_data = self.connection.recv(500, socket.MSG_PEEK)
-                print("[RAW] First 500 bytes preview:")
-                print(f"[RAW] Hex: {peek_data[:100].hex()}")
-                print(f"[RAW] Text: {peek_data[:200]}")
-            self.connection.setblocking(1)
-        except Exception as e:
-            print(f"[DEBUG] Peek failed: {e}")
-        print(f"{'=' * 50}")
+        logger.debug("[CONN] New connection from %s", self.client_address)
         super().handle()
 
     def parse_request(self):
-        print(f"[PARSE] Raw request line: {self.raw_requestline}")
         result = super().parse_request()
         if result:
-            print(f"[PARSE] Method: {self.command}, Path: {self.path}")
+            logger.debug("[PARSE] %s %s", self.command, self.path)
+        else:
+            logger.debug("[PARSE] Bad request line: %r", self.raw_requestline)
         return result
 
     def send_json(self, status_code, data, cors=True):
@@ -732,7 +1040,35 @@ class DictationHandler(BaseHTTPRequestHandler):
         if cors:
             self.send_header("Access-Control-Allow-Origin", "*")
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode())
+        self.wfile.write(_dumpb(data))
+
+    def send_versioned_json(self, version: int, build):
+        """Send build() as JSON tagged with version, or 304 if the client already has it.
+
+        Browsers revalidate with If-None-Match on their own, so the dashboard's
+        polls skip serializing and transferring unchanged data. Other clients
+        get the body serialized once per version.
+        """
+        etag = f'W/"{SERVER_ID}-{version}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        cached = versioned_json_cache.get(self.path)
+        if cached is not None and cached[0] == version:
+            body = cached[1]
+        else:
+            body = _dumpb(build())
+            versioned_json_cache[self.path] = (version, body)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
 
     def do_POST(self):
         peer_ip = getattr(self, "client_address", ("127.0.0.1",))[0]
@@ -741,53 +1077,33 @@ class DictationHandler(BaseHTTPRequestHandler):
             return
 
         content_length = int(self.headers.get("Content-Length", 0))
-        content_type = self.headers.get("Content-Type", "unknown")
-
-        # Handle config update
-        if self.path == "/api/config":
-            self.handle_config_update(content_length)
-            return
-
-        # Handle response acknowledgment from watch
-        if self.path.startswith("/api/response/") and self.path.endswith("/ack"):
-            self.handle_response_ack()
-            return
-
-        # Handle text message from phone app
-        if self.path == "/api/message":
-            self.handle_text_message(content_length)
-            return
-
-        # Handle prompt response (selecting an option)
-        if self.path == "/api/prompt/respond":
-            self.handle_prompt_respond(content_length)
-            return
-
-        # Handle Claude restart
-        if self.path == "/api/claude/restart":
-            self.handle_claude_restart()
+        handler = self.POST_ROUTES.get(self.path)
+        if handler is not None:
+            # JSON bodies are read whole, so refuse oversized ones before reading anything
+            if content_length > MAX_JSON_BODY:
+                self.send_json(413, {"status": "error", "message": f"Body over {MAX_JSON_BODY} bytes"})
+            elif content_length < 0:
+                self.send_json(400, {"status": "error", "message": "Invalid Content-Length"})
+            else:
+                handler(self, content_length)
             return
 
-        # Handle permission request from hook
-        if self.path == "/api/permission/request":
-            self.handle_permission_request(content_length)
-            return
+        # Watch acknowledgments (/api/response/<id>/ack); anything else is audio to transcribe
+        parent, _, request_id = self.path.removesuffix("/ack").rpartition("/")
+        if parent == "/api/response" and self.path.endswith("/ack"):
+            self.handle_response_ack(request_id)
+        else:
+            self.handle_transcribe(content_length)
 
-        # Handle permission response from mobile app
-        if self.path == "/api/permission/respond":
-            self.handle_permission_respond(content_length)
-            return
+    def handle_transcribe(self, content_length):
+        """Handle POST of watch audio: transcribe it and send the transcript to Claude"""
+        content_type = self.headers.get("Content-Type", "unknown")
 
         print("=== Incoming Request ===")
         print(f"Path: {self.path}")
         print(f"Content-Type: {content_type}")
         print(f"Content-Length: {content_length} bytes")
         print(f"Headers: {dict(self.headers)}")
-
-        audio_data = self.rfile.read(content_length)
-        print(f"Received {len(audio_data)} bytes of audio data")
-        if len(audio_data) > 0:
-            print(f"First 20 bytes (hex): {audio_data[:20].hex()}")
         print("========================")
 
         request_id = str(uuid.uuid4())[:8]  # Short unique ID
@@ -818,7 +1134,7 @@ class DictationHandler(BaseHTTPRequestHandler):
 
         try:
             # Step 2: Sending to Deepgram
-            sending_at = datetime.now()
+            sending_at = time.monotonic()
             entry["steps"].append(
                 {
                     "name": "sending",
@@ -829,13 +1145,16 @@ class DictationHandler(BaseHTTPRequestHandler):
                 }
             )
 
-            transcript = transcribe_audio(audio_data)
-            transcribed_at = datetime.now()
+            # Stream the body straight through to Deepgram rather than buffering it
+            transcript = transcribe_audio(
+                self.rfile, self.headers.get("Content-Type") or "application/octet-stream", content_length
+            )
+            transcribed_at = time.monotonic()
             print(f"Transcript: {transcript}")
             entry["transcript"] = transcript or ""
 
             # Step 3: Transcribed
-            duration_ms = int((transcribed_at - sending_at).total_seconds() * 1000)
+            duration_ms = int((transcribed_at - sending_at) * 1000)
             entry["steps"].append(
                 {
                     "name": "transcribed",
@@ -849,9 +1168,7 @@ class DictationHandler(BaseHTTPRequestHandler):
 
             # Insert into history BEFORE launching Claude so run_claude()
             # can add steps (claude_started, permissions, etc.) to this entry
-            request_history.insert(0, entry)
-            if len(request_history) > MAX_HISTORY:
-                request_history.pop()
+            add_history_entry(entry)
 
             # Step 4: Claude
             response_mode = self.headers.get("X-Response-Mode", "text")
@@ -879,6 +1196,7 @@ class DictationHandler(BaseHTTPRequestHandler):
                         "details": "Skipped (no speech)",
                     }
                 )
+            history_changed()
 
             self.send_json(
                 200,
@@ -919,10 +1237,9 @@ class DictationHandler(BaseHTTPRequestHandler):
             # Entry already in request_history (inserted before Claude launch)
             # If error happened before that insert (early in try block),
             # add it now as a fallback
-            if entry not in request_history:
-                request_history.insert(0, entry)
-                if len(request_history) > MAX_HISTORY:
-                    request_history.pop()
+            if request_index.get(request_id) is not entry:
+                add_history_entry(entry)
+            history_changed()
 
             self.send_json(500, {"status": "error", "message": str(e)}, cors=False)
 
@@ -932,31 +1249,42 @@ class DictationHandler(BaseHTTPRequestHandler):
             self.send_error(403, "Unauthorized Tailscale node")
             return
 
-        if self.path == "/health":
-            self.send_json(200, {"status": "ok"}, cors=False)
-        elif self.path.startswith("/api/response/"):
-            self.handle_response_check()
-        elif self.path.startswith("/api/permission/status/"):
-            self.handle_permission_status()
-        elif self.path.startswith("/api/audio/"):
-            self.handle_audio_file()
-        elif self.path == "/api/history":
-            self.send_json(200, {"history": request_history, "workdir": claude_workdir})
-        elif self.path == "/api/config":
-            self.send_json(
-                200, {"config": transcription_config, "response_config": response_config, "options": CONFIG_OPTIONS}
-            )
-        elif self.path == "/api/chat":
-            self.send_json(200, {"messages": chat_history, "state": claude_state, "prompt": current_prompt})
-        elif self.path == "/" or self.path == "/dashboard":
-            self.serve_dashboard()
-        elif self.path == "/viewer":
-            self.serve_viewer()
+        handler = self.GET_ROUTES.get(self.path)
+        if handler is not None:
+            handler(self)
+            return
+
+        # /api/<resource>/<id>[?query]: the parent path picks the handler, the last segment is the ID
+        parent, _, request_id = self.path.partition("?")[0].rpartition("/")
+        handler = self.GET_ID_ROUTES.get(parent)
+        if handler is not None:
+            handler(self, request_id)
         else:
             self.send_response(404)
             self.end_headers()
 
-    def handle_claude_restart(self):
+    def handle_health(self):
+        """Handle GET /health"""
+        self.send_json(200, {"status": "ok"}, cors=False)
+
+    def handle_history(self):
+        """Handle GET /api/history - recent requests with their steps"""
+        # Read the version first: a change while serializing only costs the client a refetch
+        self.send_versioned_json(history_version, lambda: {"history": list(request_history), "workdir": claude_workdir})
+
+    def handle_config(self):
+        """Handle GET /api/config - current settings and the allowed options"""
+        self.send_json(
+            200, {"config": transcription_config, "response_config": response_config, "options": CONFIG_OPTIONS}
+        )
+
+    def handle_chat(self):
+        """Handle GET /api/chat - chat history, Claude state and any pending prompt"""
+        self.send_versioned_json(
+            chat_version, lambda: {"messages": list(chat_history), "state": claude_state, "prompt": current_prompt}
+        )
+
+    def handle_claude_restart(self, content_length=0):
         """Handle POST /api/claude/restart to restart the Claude process"""
         global active_claude_wrapper
         try:
@@ -966,6 +1294,7 @@ class DictationHandler(BaseHTTPRequestHandler):
                 active_claude_wrapper = None
             # Clear chat history
             chat_history.clear()
+            chat_changed()
             set_claude_state("idle")
             broadcast_message({"type": "history", "messages": []})
             # Re-initialize wrapper with background watcher
@@ -981,34 +1310,23 @@ class DictationHandler(BaseHTTPRequestHandler):
         global transcription_config
         try:
             body = self.rfile.read(content_length)
-            new_config = json.loads(body.decode())
+            new_config = _loads(body)
 
             # Validate and update config
             errors = []
 
-            if "model" in new_config:
-                if new_config["model"] in CONFIG_OPTIONS["models"]:
-                    transcription_config["model"] = new_config["model"]
-                else:
-                    errors.append(f"Invalid model: {new_config['model']}")
-
-            if "language" in new_config:
-                if new_config["language"] in CONFIG_OPTIONS["languages"]:
-                    transcription_config["language"] = new_config["language"]
+            for field, allowed, target, key in CONFIG_CHOICES:
+                if field not in new_config:
+                    continue
+                value = new_config[field]
+                if isinstance(value, str) and value in allowed:
+                    target[key] = value
                 else:
-                    errors.append(f"Invalid language: {new_config['language']}")
-
-            if "smart_format" in new_config:
-                transcription_config["smart_format"] = bool(new_config["smart_format"])
+                    errors.append(f"Invalid {field}: {value}")
 
-            if "punctuate" in new_config:
-                transcription_config["punctuate"] = bool(new_config["punctuate"])
-
-            if "response_mode" in new_config:
-                if new_config["response_mode"] in CONFIG_OPTIONS["response_modes"]:
-                    response_config["mode"] = new_config["response_mode"]
-                else:
-                    errors.append(f"Invalid response_mode: {new_config['response_mode']}")
+            for field in CONFIG_FLAGS:
+                if field in new_config:
+                    transcription_config[field] = bool(new_config[field])
 
             if errors:
                 self.send_json(400, {"status": "error", "errors": errors})
@@ -1021,10 +1339,8 @@ class DictationHandler(BaseHTTPRequestHandler):
         except json.JSONDecodeError as e:
             self.send_json(400, {"status": "error", "message": f"Invalid JSON: {e}"})
 
-    def handle_response_check(self):
+    def handle_response_check(self, request_id):
         """Handle GET /api/response/<id> to check Claude's response"""
-        request_id = self.path.split("/")[-1]
-
         if request_id not in claude_responses:
             self.send_json(404, {"status": "not_found", "message": "Request ID not found"})
             return
@@ -1056,12 +1372,8 @@ class DictationHandler(BaseHTTPRequestHandler):
             else:
                 self.send_json(200, {"status": "completed", "type": "text", "response": response_text})
 
-    def handle_response_ack(self):
+    def handle_response_ack(self, request_id):
         """Handle POST /api/response/<id>/ack - watch confirms receipt"""
-        # Extract request_id from path like /api/response/abc123/ack
-        parts = self.path.split("/")
-        request_id = parts[3] if len(parts) >= 4 else ""
-
         if request_id not in claude_responses:
             self.send_json(404, {"status": "not_found"})
             return
@@ -1089,7 +1401,7 @@ class DictationHandler(BaseHTTPRequestHandler):
         """Handle POST /api/message for text messages from phone app"""
         try:
             body = self.rfile.read(content_length)
-            data = json.loads(body.decode())
+            data = _loads(body)
             text = data.get("text", "").strip()
 
             if not text:
@@ -1106,7 +1418,7 @@ class DictationHandler(BaseHTTPRequestHandler):
                 "timestamp": utc_now_iso(),
                 "input_type": "text",
                 "content_type": "text/plain",
-                "size_bytes": len(text.encode()),
+                "size_bytes": _utf8_len(text),
                 "transcript": text,
                 "claude_launched": False,
                 "status": "processing",
@@ -1124,9 +1436,7 @@ class DictationHandler(BaseHTTPRequestHandler):
 
             # Insert into history BEFORE launching Claude so run_claude()
             # can add steps (claude_started, permissions, etc.) to this entry
-            request_history.insert(0, entry)
-            if len(request_history) > MAX_HISTORY:
-                request_history.pop()
+            add_history_entry(entry)
 
             # Launch Claude with the text
             response_mode = data.get("response_mode", "text")
@@ -1147,6 +1457,7 @@ class DictationHandler(BaseHTTPRequestHandler):
             else:
                 entry["status"] = "error"
                 entry["error"] = "Failed to launch Claude"
+            history_changed()
 
             self.send_json(200, {"status": "ok", "request_id": request_id, "launched": launched})
 
@@ -1163,7 +1474,7 @@ class DictationHandler(BaseHTTPRequestHandler):
         global current_prompt
         try:
             body = self.rfile.read(content_length)
-            json.loads(body.decode())  # validate JSON
+            _loads(body)  # validate JSON
             # Phase 1: Permission prompts are auto-accepted via --permission-mode acceptEdits
             # This endpoint is kept for future Phase 2 implementation
             self.send_json(
@@ -1177,11 +1488,12 @@ class DictationHandler(BaseHTTPRequestHandler):
         """Handle POST /api/permission/request from the permission hook."""
         try:
             body = self.rfile.read(content_length)
-            data = json.loads(body.decode())
+            data = _loads(body)
 
             tool_name = data.get("tool_name", "")
             tool_input = data.get("tool_input", {})
             tool_use_id = data.get("tool_use_id", "")
+            cache_key = _permission_cache_key(tool_name, tool_input, data.get("cwd", ""))
 
             # Generate request ID
             request_id = str(uuid.uuid4())[:8]
@@ -1189,7 +1501,30 @@ class DictationHandler(BaseHTTPRequestHandler):
             # Link to the current active Claude request
             claude_request_id = claude_state.get("current_request_id")
 
+            # Same call already decided recently: answer without asking the phone
+            cached = _cached_permission(cache_key)
+            if cached is not None:
+                decision, reason = cached
+                logger.info(f"[PERMISSION] Request {request_id}: {tool_name} - cached {decision}")
+                if claude_request_id:
+                    add_response_step(
+                        claude_request_id,
+                        {
+                            "name": "permission",
+                            "label": f"Permission: {tool_name}",
+                            "status": "completed" if decision == "allow" else "error",
+                            "timestamp": utc_now_iso(),
+                            "details": f"{decision} (remembered): {tool_name}",
+                            "permission_request_id": request_id,
+                        },
+                    )
+                self.send_json(
+                    200, {"status": "resolved", "request_id": request_id, "decision": decision, "reason": reason}
+                )
+                return
+
             # Store pending permission
+            permission_events[request_id] = threading.Event()
             pending_permissions[request_id] = {
                 "tool_name": tool_name,
                 "tool_input": tool_input,
@@ -1198,30 +1533,18 @@ class DictationHandler(BaseHTTPRequestHandler):
                 "decision": None,
                 "reason": None,
                 "timestamp": utc_now_iso(),
+                "requested_monotonic": time.monotonic(),
                 "claude_request_id": claude_request_id,
+                "cache_key": cache_key,
             }
 
             # Format prompt for mobile app
-            if tool_name == "Bash":
-                command = tool_input.get("command", "")
-                description = tool_input.get("description", "")
-                question = f"Run command: {command}"
-                context = description
-            elif tool_name in ("Write", "Edit"):
-                file_path = tool_input.get("file_path", "")
-                question = f"{tool_name} file: {file_path}"
-                context = tool_input.get("content", tool_input.get("new_string", ""))[:200]
-            else:
-                question = f"Execute {tool_name}"
-                context = json.dumps(tool_input)[:200]
+            question, context = PERMISSION_PROMPTS.get(tool_name, _generic_permission_prompt)(tool_name, tool_input)
 
             # Build prompt data
             prompt_data = {
                 "question": question,
-                "options": [
-                    {"num": 1, "label": "Allow", "description": "Permit this operation"},
-                    {"num": 2, "label": "Deny", "description": "Block this operation"},
-                ],
+                "options": PERMISSION_OPTIONS,
                 "timestamp": utc_now_iso(),
                 "title": tool_name,
                 "context": context,
@@ -1241,10 +1564,7 @@ class DictationHandler(BaseHTTPRequestHandler):
                     "tool_name": tool_name,
                     "question": question,
                     "context": context,
-                    "options": [
-                        {"num": 1, "label": "Allow", "description": "Permit this operation"},
-                        {"num": 2, "label": "Deny", "description": "Block this operation"},
-                    ],
+                    "options": PERMISSION_OPTIONS,
                 }
             )
 
@@ -1270,14 +1590,33 @@ class DictationHandler(BaseHTTPRequestHandler):
             logger.error(f"[PERMISSION] Request error: {e}")
             self.send_json(500, {"status": "error", "message": str(e)})
 
-    def handle_permission_status(self):
+    def handle_permission_status(self, request_id):
         """Handle GET /api/permission/status/<id> - hook polls for decision."""
-        request_id = self.path.split("/")[-1]
+        if request_id not in pending_permissions:
+            self.send_json(404, {"status": "not_found"})
+            return
 
+        perm = pending_permissions[request_id]
+        self.send_json(200, {"status": perm["status"], "decision": perm["decision"], "reason": perm["reason"]})
+
+    def handle_permission_wait(self, request_id):
+        """Handle GET /api/permission/wait/<id>?timeout=<s> - hook long-polls for decision.
+
+        Held open until the app responds or timeout passes; the status is still
+        "pending" in the latter case and the hook asks again.
+        """
         if request_id not in pending_permissions:
             self.send_json(404, {"status": "not_found"})
             return
 
+        try:
+            timeout = float(parse_qs(urlsplit(self.path).query).get("timeout", [PERMISSION_WAIT_MAX])[0])
+        except ValueError:
+            timeout = PERMISSION_WAIT_MAX
+        event = permission_events.get(request_id)
+        if event is not None:
+            event.wait(min(max(timeout, 0), PERMISSION_WAIT_MAX))
+
         perm = pending_permissions[request_id]
         self.send_json(200, {"status": perm["status"], "decision": perm["decision"], "reason": perm["reason"]})
 
@@ -1285,7 +1624,7 @@ class DictationHandler(BaseHTTPRequestHandler):
         """Handle POST /api/permission/respond - mobile app approves/denies."""
         try:
             body = self.rfile.read(content_length)
-            data = json.loads(body.decode())
+            data = _loads(body)
 
             request_id = data.get("request_id", "")
             decision = data.get("decision", "deny")  # 'allow' or 'deny'
@@ -1301,15 +1640,21 @@ class DictationHandler(BaseHTTPRequestHandler):
             perm["decision"] = decision
             perm["reason"] = reason
             perm["resolved_at"] = utc_now_iso()
+            event = permission_events.pop(request_id, None)
+            if event is not None:
+                event.set()
+
+            cache_key = perm.get("cache_key")
+            if cache_key is not None and decision in ("allow", "deny"):
+                ttl = PERMISSION_ALLOW_TTL if decision == "allow" else float("inf")
+                permission_decisions[cache_key] = (decision, reason, time.monotonic() + ttl)
 
             logger.info(f"[PERMISSION] Response {request_id}: {decision}")
 
             # Update the permission step in request history
             claude_request_id = perm.get("claude_request_id")
             if claude_request_id:
-                requested_at = datetime.fromisoformat(perm["timestamp"])
-                resolved_at = datetime.now()
-                duration_ms = int((resolved_at - requested_at).total_seconds() * 1000)
+                duration_ms = int((time.monotonic() - perm["requested_monotonic"]) * 1000)
                 tool_name = perm.get("tool_name", "unknown")
                 update_permission_step(
                     claude_request_id,
@@ -1334,66 +1679,92 @@ class DictationHandler(BaseHTTPRequestHandler):
             logger.error(f"[PERMISSION] Response error: {e}")
             self.send_json(500, {"status": "error", "message": str(e)})
 
-    def handle_audio_file(self):
-        """Serve audio file for a request"""
-        request_id = self.path.split("/")[-1]
+    def handle_permission_clear(self, content_length=0):
+        """Handle POST /api/permission/clear - forget remembered allow/deny decisions."""
+        cleared = len(permission_decisions)
+        permission_decisions.clear()
+        logger.info(f"[PERMISSION] Cleared {cleared} remembered decisions")
+        self.send_json(200, {"status": "ok", "cleared": cleared})
 
+    def handle_audio_file(self, request_id):
+        """Serve audio file for a request"""
         if request_id not in claude_responses:
             self.send_response(404)
             self.end_headers()
             return
 
         audio_path = claude_responses[request_id].get("audio_path")
-        if not audio_path or not os.path.exists(audio_path):
+        try:
+            f = open(audio_path, "rb") if audio_path else None
+        except FileNotFoundError:
+            f = None
+        if f is None:
             self.send_response(404)
             self.end_headers()
             return
 
-        # Serve the audio file
-        self.send_response(200)
-        self.send_header("Content-Type", "audio/mpeg")
-        self.send_header("Access-Control-Allow-Origin", "*")
-        with open(audio_path, "rb") as f:
-            audio_data = f.read()
-        self.send_header("Content-Length", str(len(audio_data)))
-        self.end_headers()
-        self.wfile.write(audio_data)
-
-    def serve_viewer(self):
-        """Serve the public demo viewer"""
-        viewer_path = os.path.join(os.path.dirname(__file__), "viewer.html")
-        try:
-            with open(viewer_path, "rb") as f:
-                content = f.read()
+        # Serve the audio file; sendfile copies it to the socket in the kernel
+        with f:
             self.send_response(200)
-            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Type", "audio/mpeg")
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.send_header("Content-Length", str(os.fstat(f.fileno()).st_size))
             self.end_headers()
-            self.wfile.write(content)
-        except FileNotFoundError:
+            self.connection.sendfile(f)
+
+    def serve_static(self, path: str, not_found: bytes):
+        """Serve an HTML page from the in-memory static cache"""
+        content = read_static(path)
+        if content is None:
             self.send_response(404)
             self.send_header("Content-Type", "text/plain")
             self.end_headers()
-            self.wfile.write(b"Viewer not found")
+            self.wfile.write(not_found)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def serve_viewer(self):
+        """Serve the public demo viewer"""
+        self.serve_static(VIEWER_PATH, b"Viewer not found")
 
     def serve_dashboard(self):
         """Serve the Vue.js dashboard"""
-        dashboard_path = os.path.join(os.path.dirname(__file__), "dashboard.html")
-        try:
-            with open(dashboard_path, "rb") as f:
-                content = f.read()
-            self.send_response(200)
-            self.send_header("Content-Type", "text/html")
-            self.end_headers()
-            self.wfile.write(content)
-        except FileNotFoundError:
-            self.send_response(404)
-            self.send_header("Content-Type", "text/plain")
-            self.end_headers()
-            self.wfile.write(b"Dashboard not found")
+        self.serve_static(DASHBOARD_PATH, b"Dashboard not found")
 
     def log_message(self, format, *args):
         print(f"[HTTP] {args[0]}")
 
+    # Routes are looked up once per request: exact paths first, then the parent path of
+    # /api/<resource>/<id>. POST handlers take the body length; unmatched POSTs are audio
+    GET_ROUTES = {
+        "/health": handle_health,
+        "/api/history": handle_history,
+        "/api/config": handle_config,
+        "/api/chat": handle_chat,
+        "/": serve_dashboard,
+        "/dashboard": serve_dashboard,
+        "/viewer": serve_viewer,
+    }
+    GET_ID_ROUTES = {
+        "/api/response": handle_response_check,
+        "/api/permission/status": handle_permission_status,
+        "/api/permission/wait": handle_permission_wait,
+        "/api/audio": handle_audio_file,
+    }
+    POST_ROUTES = {
+        "/api/config": handle_config_update,
+        "/api/message": handle_text_message,
+        "/api/prompt/respond": handle_prompt_respond,
+        "/api/claude/restart": handle_claude_restart,
+        "/api/permission/request": handle_permission_request,
+        "/api/permission/respond": handle_permission_respond,
+        "/api/permission/clear": handle_permission_clear,
+    }
+
 
 # WebSocket port
 WS_PORT = 5567
@@ -1414,17 +1785,9 @@ def get_clients_list():
     return clients
 
 
-async def broadcast_clients():
-    """Broadcast updated client list to all connected clients"""
-    msg = json.dumps({"type": "clients", "clients": get_clients_list()})
-    dead_clients = []
-    for ws in websocket_clients:
-        try:
-            await ws.send_str(msg)
-        except Exception:
-            dead_clients.append(ws)
-    for ws in dead_clients:
-        websocket_clients.pop(ws, None)
+def broadcast_clients():
+    """Broadcast updated client list to all connected clients. Must run on ws_loop."""
+    _enqueue(_dumpb({"type": "clients", "clients": get_clients_list()}))
 
 
 async def websocket_handler(request):
@@ -1448,17 +1811,17 @@ async def websocket_handler(request):
     }
     logger.info(f"[WS] Client connected: {device_type} ({device_id or client_ip}). Total: {len(websocket_clients)}")
 
-    # Send current state and chat history on connect
-    try:
-        await ws.send_json(
+    # Current state and chat history go ahead of any broadcast in the client's queue
+    _attach_sender(
+        ws,
+        _dumpb(
             {"type": "state", "status": claude_state["status"], "request_id": claude_state.get("current_request_id")}
-        )
-        await ws.send_json({"type": "history", "messages": chat_history})
-    except Exception as e:
-        logger.error(f"[WS] Error sending initial state: {e}")
+        ),
+        _dumpb({"type": "history", "messages": list(chat_history)}),
+    )
 
     # Broadcast updated client list
-    await broadcast_clients()
+    broadcast_clients()
 
     try:
         async for msg in ws:
@@ -1468,9 +1831,9 @@ async def websocket_handler(request):
             elif msg.type == web.WSMsgType.ERROR:
                 logger.error(f"[WS] Error: {ws.exception()}")
     finally:
-        websocket_clients.pop(ws, None)
+        _drop_client(ws)
         logger.info(f"[WS] Client disconnected. Total: {len(websocket_clients)}")
-        await broadcast_clients()
+        broadcast_clients()
 
     return ws
 
@@ -1604,7 +1967,8 @@ def main():
     time.sleep(0.5)
     init_claude_wrapper()
 
-    server = HTTPServer(("0.0.0.0", PORT), DictationHandler)
+    # Threaded so a hook long-polling /api/permission/wait doesn't block other requests
+    server = ThreadingHTTPServer(("0.0.0.0", PORT), DictationHandler)
     print(f"Dictation receiver listening on port {PORT}")
     print(f"Claude working directory: {claude_workdir}")
     print(f"Dashboard: http://localhost:{PORT}/")
@@ -6,7 +6,16 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from claude_wrapper import STARTUP_WAIT, ClaudeTmuxSession, ClaudeWrapper, JsonlWatcher
+from claude_wrapper import (
+    POLL_INTERVAL_MIN,
+    STARTUP_WAIT,
+    ClaudeTmuxSession,
+    ClaudeWrapper,
+    JsonlWatcher,
+    TmuxControlClient,
+    _env_seconds,
+)
+from inotify_watch import IN_CREATE, IN_MODIFY, IN_MOVED_TO, DirectoryWatcher
 
 
 class TestBackwardCompatAlias:
@@ -16,6 +25,26 @@ class TestBackwardCompatAlias:
         assert ClaudeWrapper is ClaudeTmuxSession
 
 
+class TestEnvSeconds:
+    """Tests for _env_seconds"""
+
+    def test_default_when_unset(self, monkeypatch):
+        monkeypatch.delenv("CLAUDE_WATCH_TEST", raising=False)
+        assert _env_seconds("CLAUDE_WATCH_TEST", 3.0, 0.5) == 3.0
+
+    def test_reads_override(self, monkeypatch):
+        monkeypatch.setenv("CLAUDE_WATCH_TEST", "1.5")
+        assert _env_seconds("CLAUDE_WATCH_TEST", 3.0, 0.5) == 1.5
+
+    def test_clamps_to_minimum(self, monkeypatch):
+        monkeypatch.setenv("CLAUDE_WATCH_TEST", "0.001")
+        assert _env_seconds("CLAUDE_WATCH_TEST", 3.0, 0.5) == 0.5
+
+    def test_ignores_invalid_value(self, monkeypatch):
+        monkeypatch.setenv("CLAUDE_WATCH_TEST", "fast")
+        assert _env_seconds("CLAUDE_WATCH_TEST", 3.0, 0.5) == 3.0
+
+
 class TestClaudeTmuxSessionInit:
     """Tests for ClaudeTmuxSession initialization"""
 
@@ -67,6 +96,44 @@ class TestClaudeTmuxSessionSingleton:
         wrapper3 = ClaudeTmuxSession.get_instance("/tmp")
         assert wrapper3 is not wrapper1
 
+    @patch.object(ClaudeTmuxSession, "is_alive", return_value=False)
+    def test_get_instance_waits_for_shutdown_to_finish(self, mock_alive):
+        wrapper1 = ClaudeTmuxSession.get_instance("/tmp")
+        in_teardown = threading.Event()
+        release = threading.Event()
+
+        def slow_stop():
+            in_teardown.set()
+            release.wait(2.0)
+
+        with patch.object(wrapper1, "_stop_dispatcher", side_effect=slow_stop):
+            stopper = threading.Thread(target=wrapper1.shutdown)
+            stopper.start()
+            assert in_teardown.wait(2.0)
+
+            got = []
+            getter = threading.Thread(target=lambda: got.append(ClaudeTmuxSession.get_instance("/tmp")))
+            getter.start()
+            getter.join(0.1)
+            # Blocked behind shutdown rather than handed the dying instance
+            assert got == []
+
+            release.set()
+            stopper.join(2.0)
+            getter.join(2.0)
+
+        assert got[0] is not wrapper1
+
+    def test_submit_after_shutdown_fails(self):
+        session = ClaudeTmuxSession("/tmp")
+        with patch("claude_wrapper.subprocess.run") as mock_run:
+            mock_run.return_value.returncode = 1
+            session.shutdown()
+
+        with pytest.raises(RuntimeError, match="shut down"):
+            session.submit("hi").result(timeout=1.0)
+        assert session._dispatcher_thread is None
+
 
 class TestClaudeTmuxSessionIsAlive:
     """Tests for is_alive method"""
@@ -87,6 +154,115 @@ class TestClaudeTmuxSessionIsAlive:
         session = ClaudeTmuxSession("/tmp")
         assert session.is_alive() is False
 
+    @patch("claude_wrapper.subprocess.run")
+    def test_is_alive_uses_control_client_without_spawning(self, mock_run):
+        session = ClaudeTmuxSession("/tmp")
+        session._ctl = MagicMock()
+        session._ctl.is_alive.return_value = True
+        assert session.is_alive() is True
+        mock_run.assert_not_called()
+
+    @patch("claude_wrapper.subprocess.run")
+    def test_is_alive_caches_has_session_result(self, mock_run):
+        mock_run.return_value.returncode = 0
+        session = ClaudeTmuxSession("/tmp")
+        assert session.is_alive() is True
+        mock_run.return_value.returncode = 1
+        assert session.is_alive() is True
+        assert mock_run.call_count == 1
+
+    @patch("claude_wrapper.subprocess.run")
+    def test_is_alive_cache_expires(self, mock_run):
+        mock_run.return_value.returncode = 0
+        session = ClaudeTmuxSession("/tmp")
+        session.is_alive()
+        session._alive_cache = (time.monotonic() - 2.0, True)
+        mock_run.return_value.returncode = 1
+        assert session.is_alive() is False
+        assert mock_run.call_count == 2
+
+
+class TestTmuxControlClient:
+    """Tests for the persistent tmux control-mode client"""
+
+    def _client(self, alive=True):
+        ctl = TmuxControlClient("claude-watch")
+        ctl._proc = MagicMock()
+        ctl._proc.poll.return_value = None if alive else 0
+        return ctl
+
+    def test_command_writes_line_and_returns_reply(self):
+        ctl = self._client()
+        ctl._proc.stdin.write.side_effect = lambda _: ctl._replies.put(True)
+
+        assert ctl.command("send-keys -t claude-watch Enter") is True
+        ctl._proc.stdin.write.assert_called_once_with(b"send-keys -t claude-watch Enter\n")
+
+    def test_command_returns_false_on_error_reply(self):
+        ctl = self._client()
+        ctl._proc.stdin.write.side_effect = lambda _: ctl._replies.put(False)
+
+        assert ctl.command("bogus") is False
+
+    def test_command_chains_multiple_commands(self):
+        ctl = self._client()
+
+        def reply(_):
+            ctl._replies.put(True)
+            ctl._replies.put(True)
+
+        ctl._proc.stdin.write.side_effect = reply
+
+        assert ctl.command("load-buffer /tmp/x", "paste-buffer -t claude-watch") is True
+        ctl._proc.stdin.write.assert_called_once_with(b"load-buffer /tmp/x ; paste-buffer -t claude-watch\n")
+
+    def test_command_chain_fails_if_any_command_fails(self):
+        ctl = self._client()
+
+        def reply(_):
+            ctl._replies.put(True)
+            ctl._replies.put(False)
+
+        ctl._proc.stdin.write.side_effect = reply
+
+        assert ctl.command("has-session", "bogus") is False
+
+    def test_command_discards_stale_replies(self):
+        ctl = self._client()
+        ctl._replies.put(False)  # late reply from an earlier command
+        ctl._proc.stdin.write.side_effect = lambda _: ctl._replies.put(True)
+
+        assert ctl.command("has-session") is True
+
+    def test_command_fails_when_dead(self):
+        ctl = self._client(alive=False)
+        assert ctl.command("has-session") is False
+        ctl._proc.stdin.write.assert_not_called()
+
+    def test_read_loop_only_queues_own_replies(self):
+        ctl = self._client()
+        ctl._proc.stdout = iter(
+            [
+                b"%begin 1 10 0\n",
+                b"%end 1 10 0\n",  # initial attach, not ours
+                b"%session-changed $0 claude-watch\n",
+                b"%begin 1 11 1\n",
+                b"%end 1 11 1\n",
+                b"%begin 1 12 1\n",
+                b"parse error: unknown command: bogus\n",
+                b"%error 1 12 1\n",
+                b"%exit\n",
+            ]
+        )
+        ctl._read_loop()
+
+        replies = []
+        while not ctl._replies.empty():
+            replies.append(ctl._replies.get_nowait())
+        # Own %end, own %error, then the wake-up sentinel on exit
+        assert replies == [True, False, False]
+        assert ctl._attached.is_set()
+
 
 class TestClaudeTmuxSessionStartSession:
     """Tests for _start_session method"""
@@ -151,6 +327,69 @@ class TestClaudeTmuxSessionStartSession:
         assert "--model" in cmd
         assert "opus" in cmd
 
+    @patch.object(ClaudeTmuxSession, "_control")
+    @patch.object(ClaudeTmuxSession, "_discover_session_id")
+    @patch("claude_wrapper.get_projects_dir")
+    @patch("claude_wrapper.subprocess.run")
+    def test_start_session_attaches_control_client(self, mock_run, mock_projects_dir, mock_discover, mock_control):
+        # has-session: not running; new-session: started
+        mock_run.side_effect = [MagicMock(returncode=1), MagicMock(returncode=0)]
+
+        session = ClaudeTmuxSession("/tmp")
+        session._start_session()
+
+        mock_control.assert_called_once_with()
+        # A successful new-session is trusted; no has-session probe follows it
+        assert session._alive_cache[1] is True
+        assert mock_run.call_count == 2
+
+    @patch.object(ClaudeTmuxSession, "_control")
+    @patch.object(ClaudeTmuxSession, "_discover_session_id")
+    @patch("claude_wrapper.get_projects_dir")
+    @patch("claude_wrapper.subprocess.run")
+    def test_start_session_failure_skips_control_client(self, mock_run, mock_projects_dir, mock_discover, mock_control):
+        mock_run.return_value.returncode = 1
+
+        session = ClaudeTmuxSession("/tmp")
+        session._start_session()
+
+        mock_control.assert_not_called()
+        assert session._alive_cache == (0.0, False)
+
+    @patch.object(ClaudeTmuxSession, "_control")
+    @patch.object(ClaudeTmuxSession, "_discover_session_id")
+    @patch("claude_wrapper.list_sessions")
+    @patch("claude_wrapper.subprocess.run")
+    def test_start_session_skips_snapshot_with_inotify(
+        self, mock_run, mock_sessions, mock_discover, mock_control, tmp_path
+    ):
+        mock_run.return_value.returncode = 1
+
+        with patch("claude_wrapper.get_projects_dir", return_value=tmp_path):
+            ClaudeTmuxSession("/tmp")._start_session()
+
+        mock_sessions.assert_not_called()
+        assert mock_discover.call_args[0][0] == set()
+
+    def test_discover_session_waits_on_inotify(self, tmp_path):
+        (tmp_path / "old.jsonl").write_text("{}\n")
+        dir_watch = DirectoryWatcher.create(tmp_path, IN_CREATE | IN_MOVED_TO)
+        session = ClaudeTmuxSession("/tmp")
+
+        def claude_starts():
+            (tmp_path / "notes.txt").write_text("")
+            (tmp_path / "new-session.jsonl").write_text("")
+
+        threading.Timer(0.05, claude_starts).start()
+        try:
+            t0 = time.monotonic()
+            session._discover_session_id({"old"}, dir_watch)
+        finally:
+            dir_watch.close()
+
+        assert session.session_id == "new-session"
+        assert time.monotonic() - t0 < 1.0
+
     @patch.object(ClaudeTmuxSession, "is_alive", return_value=True)
     @patch("claude_wrapper.subprocess.run")
     def test_start_session_noop_when_alive(self, mock_run, mock_alive):
@@ -165,27 +404,77 @@ class TestClaudeTmuxSessionSendPrompt:
 
     @patch("claude_wrapper.subprocess.run")
     def test_send_prompt_uses_load_buffer(self, mock_run):
+        mock_run.return_value.returncode = 1  # no session -> no control client, one-shot tmux call
         session = ClaudeTmuxSession("/tmp")
 
-        with patch("builtins.open", create=True) as mock_open:
-            mock_file = MagicMock()
-            mock_open.return_value.__enter__ = MagicMock(return_value=mock_file)
-            mock_open.return_value.__exit__ = MagicMock(return_value=False)
+        session._send_prompt_via_tmux("test prompt")
+
+        tmux_calls = [c for c in mock_run.call_args_list if "has-session" not in c[0][0]]
+
+        # A single tmux process chains load-buffer, paste-buffer and send-keys Enter
+        assert len(tmux_calls) == 1
+        cmd = tmux_calls[0][0][0]
+        assert cmd == [
+            "tmux",
+            "load-buffer",
+            "-",
+            ";",
+            "paste-buffer",
+            "-t",
+            "claude-watch",
+            ";",
+            "send-keys",
+            "-t",
+            "claude-watch",
+            "Enter",
+        ]
+        # Prompt is piped through stdin rather than a temp file
+        assert tmux_calls[0][1]["input"] == "test prompt"
 
-            session._send_prompt_via_tmux("test prompt")
+    @patch("claude_wrapper.subprocess.run")
+    def test_send_prompt_uses_control_client(self, mock_run):
+        session = ClaudeTmuxSession("/tmp")
+        ctl = MagicMock()
+        ctl.is_alive.return_value = True
+        buffered = []
 
-        # Should make 3 subprocess calls: load-buffer, paste-buffer, send-keys Enter
-        assert mock_run.call_count == 3
+        def command(*cmds):
+            # tmux reads the buffer file while the command runs
+            with open(cmds[0].removeprefix("load-buffer ")) as f:
+                buffered.append(f.read())
+            return True
 
-        load_call = mock_run.call_args_list[0][0][0]
-        assert "load-buffer" in load_call
+        ctl.command.side_effect = command
+        session._ctl = ctl
 
-        paste_call = mock_run.call_args_list[1][0][0]
-        assert "paste-buffer" in paste_call
+        session._send_prompt_via_tmux("first line\nsecond line")
 
-        enter_call = mock_run.call_args_list[2][0][0]
-        assert "send-keys" in enter_call
-        assert "Enter" in enter_call
+        # No tmux process spawned — one chained line went through the control pipe
+        mock_run.assert_not_called()
+        ctl.command.assert_called_once()
+        assert buffered == ["first line\nsecond line"]
+        sent = ctl.command.call_args[0]
+        assert sent[0].startswith("load-buffer")
+        assert sent[1] == "paste-buffer -t claude-watch"
+        assert sent[2] == "send-keys -t claude-watch Enter"
+
+    @patch("claude_wrapper.subprocess.run")
+    def test_send_short_prompt_types_literally(self, mock_run):
+        session = ClaudeTmuxSession("/tmp")
+        ctl = MagicMock()
+        ctl.is_alive.return_value = True
+        ctl.command.return_value = True
+        session._ctl = ctl
+
+        with patch("builtins.open", create=True) as mock_open:
+            session._send_prompt_via_tmux("it's done; ok")
+
+        mock_run.assert_not_called()
+        mock_open.assert_not_called()
+        ctl.command.assert_called_once_with(
+            "send-keys -t claude-watch -l -- 'it'\\''s done; ok'",
+            "send-keys -t claude-watch Enter",
+        )
 
 
 class TestClaudeTmuxSessionRun:
@@ -219,6 +508,92 @@ class TestClaudeTmuxSessionRun:
         with pytest.raises(RuntimeError, match="Failed to start"):
             session.run("test")
 
+    @patch("claude_wrapper.session_file_exists", return_value=True)
+    @patch("claude_wrapper.get_jsonl_line_count", return_value=5)
+    @patch.object(ClaudeTmuxSession, "is_alive", return_value=True)
+    @patch.object(ClaudeTmuxSession, "_start_session")
+    def test_run_installs_request_callbacks_for_the_turn(self, mock_start, mock_alive, mock_count, mock_exists):
+        session = ClaudeTmuxSession("/tmp")
+        session.session_id = "sess-1"
+        on_text = MagicMock()
+        seen = {}
+
+        def send_and_wait(prompt):
+            seen.update(session._request_callbacks)
+            return True
+
+        with patch.object(session, "_send_and_wait", side_effect=send_and_wait):
+            session.run("test", on_text=on_text)
+
+        assert seen["on_text"] is on_text
+        assert session._request_callbacks == {}
+
+    @patch("claude_wrapper.session_file_exists", return_value=True)
+    @patch("claude_wrapper.get_jsonl_line_count", return_value=5)
+    @patch.object(ClaudeTmuxSession, "is_alive", return_value=True)
+    @patch.object(ClaudeTmuxSession, "_start_session")
+    def test_run_clears_request_callbacks_on_error(self, mock_start, mock_alive, mock_count, mock_exists):
+        session = ClaudeTmuxSession("/tmp")
+        session.session_id = "sess-1"
+
+        with patch.object(session, "_send_and_wait", side_effect=OSError("tmux gone")):
+            with pytest.raises(OSError):
+                session.run("test", on_text=MagicMock())
+
+        assert session._request_callbacks == {}
+        assert session._server_prompt_active is False
+
+
+class TestClaudeTmuxSessionPromptQueue:
+    """Tests for submit() and the prompt dispatcher"""
+
+    def test_prompts_run_in_submission_order(self):
+        session = ClaudeTmuxSession("/tmp")
+        order = []
+
+        def run_turn(prompt, on_text, on_tool, on_usage):
+            order.append(prompt)
+            return f"reply to {prompt}"
+
+        with patch.object(session, "_run_turn", side_effect=run_turn):
+            futures = [session.submit(p) for p in ("one", "two", "three")]
+            results = [f.result(timeout=5) for f in futures]
+
+        assert order == ["one", "two", "three"]
+        assert results == ["reply to one", "reply to two", "reply to three"]
+        session._stop_dispatcher()
+
+    def test_run_calls_on_result(self):
+        session = ClaudeTmuxSession("/tmp")
+        on_result = MagicMock()
+
+        with patch.object(session, "_run_turn", return_value="done"):
+            assert session.run("hi", on_result=on_result) == "done"
+
+        on_result.assert_called_once_with("done")
+        session._stop_dispatcher()
+
+    def test_stop_dispatcher_fails_queued_prompts(self):
+        session = ClaudeTmuxSession("/tmp")
+        started = threading.Event()
+        release = threading.Event()
+
+        def run_turn(prompt, on_text, on_tool, on_usage):
+            started.set()
+            release.wait(timeout=5)
+            return prompt
+
+        with patch.object(session, "_run_turn", side_effect=run_turn):
+            first = session.submit("first")
+            started.wait(timeout=5)
+            queued = session.submit("queued")
+            session._stop_dispatcher()
+            release.set()
+
+            assert first.result(timeout=5) == "first"
+            with pytest.raises(RuntimeError, match="shut down"):
+                queued.result(timeout=5)
+
 
 class TestClaudeTmuxSessionUsageTracking:
     """Tests for usage/context tracking"""
@@ -260,23 +635,55 @@ class TestClaudeTmuxSessionUsageTracking:
 
         callback.assert_not_called()
 
+    @patch("claude_wrapper.read_context_usage")
+    def test_update_usage_prefers_watcher_usage(self, mock_read):
+        session = ClaudeTmuxSession("/tmp")
+        session.session_id = "test-session"
+        callback = MagicMock()
+
+        session._update_usage(
+            on_usage=callback,
+            transcript_usage={
+                "input_tokens": 10,
+                "cache_read_input_tokens": 20,
+                "cache_creation_input_tokens": 30,
+                "output_tokens": 5,
+            },
+        )
+
+        mock_read.assert_not_called()
+        assert callback.call_args[0][0]["total_context"] == 60
+
 
 class TestClaudeTmuxSessionCancel:
     """Tests for cancel method"""
 
+    @patch("claude_wrapper.TmuxControlClient")
     @patch("claude_wrapper.subprocess.run")
-    def test_cancel_sends_ctrl_c(self, mock_run):
-        # First call (is_alive check) returns success
+    def test_cancel_sends_ctrl_c(self, mock_run, mock_ctl_class):
+        # is_alive check returns success, control client cannot attach
         mock_run.return_value.returncode = 0
+        mock_ctl_class.return_value.start.return_value = False
 
         session = ClaudeTmuxSession("/tmp")
         session.cancel()
 
-        # Should have called has-session and then send-keys C-c
-        assert mock_run.call_count == 2
-        cancel_call = mock_run.call_args_list[1][0][0]
-        assert "send-keys" in cancel_call
-        assert "C-c" in cancel_call
+        cancel_calls = [c[0][0] for c in mock_run.call_args_list if "send-keys" in c[0][0]]
+        assert len(cancel_calls) == 1
+        assert "C-c" in cancel_calls[0]
+
+    @patch("claude_wrapper.subprocess.run")
+    def test_cancel_via_control_client(self, mock_run):
+        session = ClaudeTmuxSession("/tmp")
+        ctl = MagicMock()
+        ctl.is_alive.return_value = True
+        ctl.command.return_value = True
+        session._ctl = ctl
+
+        session.cancel()
+
+        mock_run.assert_not_called()
+        ctl.command.assert_called_once_with("send-keys -t claude-watch C-c")
 
     @patch("claude_wrapper.subprocess.run")
     def test_cancel_noop_when_not_alive(self, mock_run):
@@ -294,9 +701,11 @@ class TestClaudeTmuxSessionShutdown:
     def teardown_method(self):
         ClaudeTmuxSession._instance = None
 
+    @patch("claude_wrapper.TmuxControlClient")
     @patch("claude_wrapper.subprocess.run")
-    def test_shutdown_kills_session(self, mock_run):
+    def test_shutdown_kills_session(self, mock_run, mock_ctl_class):
         mock_run.return_value.returncode = 0  # session exists
+        mock_ctl_class.return_value.start.return_value = False
 
         wrapper = ClaudeTmuxSession.get_instance("/tmp")
         wrapper.shutdown()
@@ -306,6 +715,20 @@ class TestClaudeTmuxSessionShutdown:
         assert len(kill_calls) == 1
         assert ClaudeTmuxSession._instance is None
 
+    @patch("claude_wrapper.subprocess.run")
+    def test_shutdown_closes_control_client(self, mock_run):
+        wrapper = ClaudeTmuxSession.get_instance("/tmp")
+        ctl = MagicMock()
+        ctl.is_alive.return_value = True
+        ctl.command.return_value = True
+        wrapper._ctl = ctl
+
+        wrapper.shutdown()
+
+        ctl.command.assert_called_once_with("kill-session -t claude-watch")
+        ctl.close.assert_called_once()
+        assert wrapper._ctl is None
+
     @patch("claude_wrapper.subprocess.run")
     def test_shutdown_clears_singleton_even_when_dead(self, mock_run):
         mock_run.return_value.returncode = 1  # session doesn't exist
@@ -325,13 +748,13 @@ class TestJsonlWatcher:
         assert watcher.session_id == "session-1"
         assert watcher.current_line == 0
 
-    @patch("claude_wrapper.read_new_entries")
+    @patch("claude_wrapper.TranscriptTail.read_new")
     def test_poll_returns_false_no_entries(self, mock_read):
         mock_read.return_value = []
         watcher = JsonlWatcher("/tmp", "sess", 0)
         assert watcher.poll() is False
 
-    @patch("claude_wrapper.read_new_entries")
+    @patch("claude_wrapper.TranscriptTail.read_new")
     def test_poll_fires_on_text(self, mock_read):
         mock_read.return_value = [
             {
@@ -347,9 +770,63 @@ class TestJsonlWatcher:
 
         assert result is True
         text_cb.assert_called_once_with("Hello world", "2026-02-15T10:00:00Z")
-        assert watcher.current_line == 1
 
-    @patch("claude_wrapper.read_new_entries")
+    @patch("claude_wrapper.TranscriptTail.read_new")
+    def test_poll_coalesces_consecutive_text(self, mock_read):
+        mock_read.return_value = [
+            {"type": "assistant", "timestamp": "t1", "message": {"content": [{"type": "text", "text": "Hello "}]}},
+            {"type": "assistant", "timestamp": "t2", "message": {"content": [{"type": "text", "text": "world"}]}},
+        ]
+
+        watcher = JsonlWatcher("/tmp", "sess", 0)
+        text_cb = MagicMock()
+        watcher.poll(on_text=text_cb)
+
+        text_cb.assert_called_once_with("Hello world", "t2")
+
+    @patch("claude_wrapper.TranscriptTail.read_new")
+    def test_poll_flushes_text_before_tool(self, mock_read):
+        mock_read.return_value = [
+            {
+                "type": "assistant",
+                "timestamp": "t1",
+                "message": {
+                    "content": [
+                        {"type": "text", "text": "Checking"},
+                        {"type": "tool_use", "name": "Bash", "input": {}},
+                        {"type": "text", "text": "Done"},
+                    ]
+                },
+            }
+        ]
+
+        calls = []
+        watcher = JsonlWatcher("/tmp", "sess", 0)
+        watcher.poll(
+            on_text=lambda text, ts: calls.append(("text", text)),
+            on_tool=lambda name, tool_input, ts: calls.append(("tool", name)),
+        )
+
+        assert calls == [("text", "Checking"), ("tool", "Bash"), ("text", "Done")]
+
+    @patch("claude_wrapper.TranscriptTail.read_new")
+    def test_poll_records_last_usage(self, mock_read):
+        mock_read.return_value = [
+            {"type": "assistant", "message": {"content": [], "usage": {"input_tokens": 1, "output_tokens": 2}}},
+            {"type": "assistant", "isSidechain": True, "message": {"content": [], "usage": {"input_tokens": 99}}},
+        ]
+
+        watcher = JsonlWatcher("/tmp", "sess", 0)
+        watcher.poll()
+
+        assert watcher.last_usage == {
+            "input_tokens": 1,
+            "cache_read_input_tokens": 0,
+            "cache_creation_input_tokens": 0,
+            "output_tokens": 2,
+        }
+
+    @patch("claude_wrapper.TranscriptTail.read_new")
     def test_poll_fires_on_tool(self, mock_read):
         mock_read.return_value = [
             {
@@ -370,7 +847,7 @@ class TestJsonlWatcher:
         assert result is True
         tool_cb.assert_called_once_with("Bash", {"command": "ls"}, "2026-02-15T10:00:00Z")
 
-    @patch("claude_wrapper.read_new_entries")
+    @patch("claude_wrapper.TranscriptTail.read_new")
     def test_poll_passes_none_timestamp_when_missing(self, mock_read):
         mock_read.return_value = [
             {
@@ -385,15 +862,16 @@ class TestJsonlWatcher:
 
         text_cb.assert_called_once_with("no ts", None)
 
-    @patch("claude_wrapper.read_new_entries")
-    def test_poll_skips_noise_types(self, mock_read):
-        mock_read.return_value = [
-            {"type": "file-history-snapshot", "data": {}},
-            {"type": "change", "data": {}},
-            {"type": "queue-operation", "data": {}},
-        ]
+    def test_poll_skips_noise_types(self, tmp_path):
+        transcript = tmp_path / "sess.jsonl"
+        transcript.write_text(
+            '{"type": "file-history-snapshot", "data": {}}\n'
+            '{"type": "change", "data": {}}\n'
+            '{"type": "queue-operation", "data": {}}\n'
+        )
 
-        watcher = JsonlWatcher("/tmp", "sess", 0)
+        with patch("claude_wrapper.get_transcript_path", return_value=transcript):
+            watcher = JsonlWatcher("/tmp", "sess", 0)
         text_cb = MagicMock()
         result = watcher.poll(on_text=text_cb)
 
@@ -402,7 +880,7 @@ class TestJsonlWatcher:
         # But line count still advances
         assert watcher.current_line == 3
 
-    @patch("claude_wrapper.read_new_entries")
+    @patch("claude_wrapper.TranscriptTail.read_new")
     def test_poll_skips_sidechain(self, mock_read):
         mock_read.return_value = [
             {
@@ -419,19 +897,23 @@ class TestJsonlWatcher:
         assert result is False
         text_cb.assert_not_called()
 
-    @patch("claude_wrapper.read_new_entries")
-    def test_poll_advances_line_count(self, mock_read):
-        mock_read.return_value = [
-            {"type": "assistant", "message": {"content": [{"type": "text", "text": "a"}]}},
-            {"type": "user", "message": {"content": [{"type": "tool_result", "content": "ok"}]}},
-        ]
+    def test_poll_advances_line_count(self, tmp_path):
+        transcript = tmp_path / "sess.jsonl"
+        transcript.write_text(
+            '{"type": "user", "message": {"content": "old"}}\n' * 5
+            + '{"type": "assistant", "message": {"content": [{"type": "text", "text": "a"}]}}\n'
+            + '{"type": "user", "message": {"content": [{"type": "tool_result", "content": "ok"}]}}\n'
+        )
 
-        watcher = JsonlWatcher("/tmp", "sess", 5)
-        watcher.poll(on_text=MagicMock())
+        with patch("claude_wrapper.get_transcript_path", return_value=transcript):
+            watcher = JsonlWatcher("/tmp", "sess", 5)
+        text_cb = MagicMock()
+        watcher.poll(on_text=text_cb)
 
+        text_cb.assert_called_once_with("a", None)
         assert watcher.current_line == 7
 
-    @patch("claude_wrapper.read_new_entries")
+    @patch("claude_wrapper.TranscriptTail.read_new")
     def test_poll_skips_empty_text(self, mock_read):
         mock_read.return_value = [
             {"type": "assistant", "message": {"content": [{"type": "text", "text": ""}]}},
@@ -444,7 +926,7 @@ class TestJsonlWatcher:
         assert result is False
         text_cb.assert_not_called()
 
-    @patch("claude_wrapper.read_new_entries")
+    @patch("claude_wrapper.TranscriptTail.read_new")
     def test_poll_fires_on_user_message_string(self, mock_read):
         mock_read.return_value = [
             {"type": "user", "message": {"content": "hello from tmux"}},
@@ -457,7 +939,7 @@ class TestJsonlWatcher:
         assert result is True
         user_cb.assert_called_once_with("hello from tmux")
 
-    @patch("claude_wrapper.read_new_entries")
+    @patch("claude_wrapper.TranscriptTail.read_new")
     def test_poll_fires_on_user_message_text_item(self, mock_read):
         mock_read.return_value = [
             {"type": "user", "message": {"content": [{"type": "text", "text": "typed prompt"}]}},
@@ -470,7 +952,7 @@ class TestJsonlWatcher:
         assert result is True
         user_cb.assert_called_once_with("typed prompt")
 
-    @patch("claude_wrapper.read_new_entries")
+    @patch("claude_wrapper.TranscriptTail.read_new")
     def test_poll_does_not_fire_user_message_for_tool_results(self, mock_read):
         mock_read.return_value = [
             {"type": "user", "message": {"content": [{"type": "tool_result", "content": "ok"}]}},
@@ -482,7 +964,7 @@ class TestJsonlWatcher:
 
         user_cb.assert_not_called()
 
-    @patch("claude_wrapper.read_new_entries")
+    @patch("claude_wrapper.TranscriptTail.read_new")
     def test_poll_fires_on_turn_done(self, mock_read):
         mock_read.return_value = [
             {"type": "system", "subtype": "turn_duration", "durationMs": 1234},
@@ -496,7 +978,37 @@ class TestJsonlWatcher:
         # turn_duration itself is not "activity" (no text/tool), so had_activity is False
         assert result is False
 
-    @patch("claude_wrapper.read_new_entries")
+    @patch("claude_wrapper.TranscriptTail.read_new")
+    def test_poll_fires_on_turn_done_for_end_turn_after_text(self, mock_read):
+        mock_read.return_value = [
+            {
+                "type": "assistant",
+                "message": {"content": [{"type": "text", "text": "done"}], "stop_reason": "end_turn"},
+            },
+        ]
+
+        watcher = JsonlWatcher("/tmp", "sess", 0)
+        events = []
+        watcher.poll(on_text=lambda t, ts: events.append(("text", t)), on_turn_done=lambda: events.append("done"))
+
+        assert events == [("text", "done"), "done"]
+
+    @patch("claude_wrapper.TranscriptTail.read_new")
+    def test_poll_ignores_tool_use_stop_reason(self, mock_read):
+        mock_read.return_value = [
+            {
+                "type": "assistant",
+                "message": {"content": [{"type": "tool_use", "name": "Bash", "input": {}}], "stop_reason": "tool_use"},
+            },
+        ]
+
+        watcher = JsonlWatcher("/tmp", "sess", 0)
+        turn_done_cb = MagicMock()
+        watcher.poll(on_turn_done=turn_done_cb)
+
+        turn_done_cb.assert_not_called()
+
+    @patch("claude_wrapper.TranscriptTail.read_new")
     def test_poll_skips_non_turn_duration_system(self, mock_read):
         mock_read.return_value = [
             {"type": "system", "subtype": "other_system_event"},
@@ -508,7 +1020,7 @@ class TestJsonlWatcher:
 
         turn_done_cb.assert_not_called()
 
-    @patch("claude_wrapper.read_new_entries")
+    @patch("claude_wrapper.TranscriptTail.read_new")
     def test_poll_turn_done_not_fired_for_sidechain(self, mock_read):
         mock_read.return_value = [
             {"type": "system", "subtype": "turn_duration", "isSidechain": True},
@@ -588,6 +1100,80 @@ class TestClaudeTmuxSessionBackgroundWatcher:
         session._watcher_running = False
         keep_alive.set()
 
+    def test_wait_for_changes_polls_without_inotify(self):
+        session = ClaudeTmuxSession("/tmp")
+        session._poll_interval = 0.2
+        with patch.object(session._wakeup, "wait") as mock_wait:
+            assert session._wait_for_changes(None, 10.0) is False
+        mock_wait.assert_called_once_with(0.2)
+
+    def test_wait_for_changes_poll_capped_by_timeout(self):
+        session = ClaudeTmuxSession("/tmp")
+        with patch.object(session._wakeup, "wait") as mock_wait:
+            session._wait_for_changes(None, 0.01)
+        mock_wait.assert_called_once_with(0.01)
+
+    def test_wake_watcher_interrupts_poll_wait(self):
+        session = ClaudeTmuxSession("/tmp")
+        session._poll_interval = 5.0
+        threading.Timer(0.05, session._wake_watcher).start()
+
+        t0 = time.monotonic()
+        session._wait_for_changes(None, 10.0)
+
+        assert time.monotonic() - t0 < 1.0
+        assert not session._wakeup.is_set()
+
+    def test_wake_watcher_wakes_inotify_watch(self):
+        session = ClaudeTmuxSession("/tmp")
+        session._dir_watch = MagicMock()
+        session._wake_watcher()
+        session._dir_watch.wake.assert_called_once()
+
+    def test_wait_for_changes_reports_new_transcript(self):
+        dir_watch = MagicMock()
+        dir_watch.read.return_value = [(IN_CREATE, "new-session.jsonl")]
+        assert ClaudeTmuxSession("/tmp")._wait_for_changes(dir_watch, 1.0) is True
+        dir_watch.read.assert_called_once_with(1.0)
+
+    def test_wait_for_changes_ignores_appends(self):
+        dir_watch = MagicMock()
+        dir_watch.read.return_value = [(IN_MODIFY, "abc.jsonl"), (IN_CREATE, "notes.tmp")]
+        assert ClaudeTmuxSession("/tmp")._wait_for_changes(dir_watch, 1.0) is False
+
+    def test_terminal_turn_text_not_kept_for_run(self, tmp_path):
+        transcript = tmp_path / "sess.jsonl"
+        transcript.write_text(
+            '{"type":"assistant","message":{"content":[{"type":"text","text":"hi"}],"stop_reason":"end_turn"}}\n'
+        )
+
+        session = ClaudeTmuxSession("/tmp")
+        session.session_id = "sess"
+        texts = []
+        finished = threading.Event()
+        session._callbacks = {
+            "on_text": lambda text, ts: texts.append(text),
+            "on_turn_complete": lambda result, server: finished.set(),
+        }
+
+        with (
+            patch("claude_wrapper.get_projects_dir", return_value=tmp_path),
+            patch("claude_wrapper.get_transcript_path", return_value=transcript),
+        ):
+            session._watcher_running = True
+            thread = threading.Thread(target=session._background_watcher_loop)
+            thread.start()
+            try:
+                assert finished.wait(2.0)
+            finally:
+                session._watcher_running = False
+                session._wake_watcher()
+                thread.join(2.0)
+
+        assert texts == ["hi"]
+        # No server prompt was waiting, so nothing is buffered for run()
+        assert session._pending_text == []
+
 
 class TestClaudeTmuxSessionInitState:
     """Tests for new init state"""
@@ -618,6 +1204,45 @@ class TestPollLoops:
     def teardown_method(self):
         ClaudeTmuxSession._instance = None
 
+    @patch("claude_wrapper.DirectoryWatcher.create", return_value=None)
+    @patch("claude_wrapper.get_jsonl_line_count", side_effect=[1, 2])
+    @patch("claude_wrapper.list_sessions", return_value={})
+    def test_sending_prompt_resets_poll_backoff(self, mock_sessions, mock_count, mock_watch):
+        session = ClaudeTmuxSession("/tmp")
+        session.session_id = "sess-1"
+        session._poll_interval = 1.0
+        session._turn_complete.set()
+
+        with patch.object(session, "_send_prompt_via_tmux"):
+            assert session._send_and_wait("hi") is True
+
+        assert session._poll_interval == POLL_INTERVAL_MIN
+        assert session._wakeup.is_set()
+
+    @patch("claude_wrapper.list_sessions")
+    def test_new_session_after_prompt_found_via_inotify(self, mock_sessions, tmp_path):
+        (tmp_path / "sess-1.jsonl").write_text("{}\n")
+        session = ClaudeTmuxSession("/tmp")
+        session.session_id = "sess-1"
+        session._turn_complete.set()
+
+        def claude_replies(prompt):
+            threading.Timer(0.05, (tmp_path / "sess-2.jsonl").write_text, args=("{}\n",)).start()
+
+        with (
+            patch("claude_wrapper.get_projects_dir", return_value=tmp_path),
+            patch.object(session, "_send_prompt_via_tmux", side_effect=claude_replies),
+        ):
+            t0 = time.monotonic()
+            assert session._send_and_wait("hi") is True
+            elapsed = time.monotonic() - t0
+
+        assert session.session_id == "sess-2"
+        assert session._session_refresh_needed.is_set()
+        # No directory scans needed when inotify is available
+        mock_sessions.assert_not_called()
+        assert elapsed < 0.5
+
     @patch.object(ClaudeTmuxSession, "_send_prompt_via_tmux")
     @patch("claude_wrapper.session_file_exists", return_value=True)
     @patch("claude_wrapper.find_latest_session", return_value="sess-1")
@@ -674,6 +1299,23 @@ class TestPollLoops:
         # Should wait at least close to STARTUP_WAIT (3s) + 1s post-prompt
         assert elapsed >= STARTUP_WAIT * 0.9
 
+    def test_first_entry_wait_wakes_on_inotify(self, tmp_path):
+        transcript = tmp_path / "sess-1.jsonl"
+        transcript.write_text("")
+        session = ClaudeTmuxSession("/tmp")
+        session.session_id = "sess-1"
+        threading.Timer(0.05, transcript.write_text, args=('{"type":"init"}\n',)).start()
+
+        with (
+            patch("claude_wrapper.get_projects_dir", return_value=tmp_path),
+            patch("transcript_reader.get_projects_dir", return_value=tmp_path),
+        ):
+            t0 = time.monotonic()
+            session._wait_for_first_entry()
+            elapsed = time.monotonic() - t0
+
+        assert 0.04 < elapsed < STARTUP_WAIT / 2
+
     @patch.object(ClaudeTmuxSession, "_send_prompt_via_tmux")
     @patch("claude_wrapper.session_file_exists", return_value=True)
     @patch("claude_wrapper.get_jsonl_line_count", return_value=5)
@@ -704,7 +1346,7 @@ class TestPollLoops:
 
             mock_send.side_effect = send_and_create_file
 
-            with patch("claude_wrapper.get_projects_dir", return_value=projects_dir):
+            with patch("transcript_reader.get_projects_dir", return_value=projects_dir):
                 t0 = time.monotonic()
                 session.run("test")
                 elapsed = time.monotonic() - t0
@@ -0,0 +1,107 @@
+"""Unit tests for inotify_watch.py"""
+
+import sys
+import threading
+import time
+from unittest.mock import mock_open, patch
+
+import pytest
+
+from inotify_watch import IN_CREATE, IN_MODIFY, IN_MOVED_TO, DirectoryWatcher, filesystem_type
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")
+
+MASK = IN_MODIFY | IN_CREATE | IN_MOVED_TO
+
+
+MOUNTINFO = (
+    "22 1 0:21 / / rw,relatime - ext4 /dev/sda1 rw\n"
+    "30 22 0:40 / /mnt/shared\\040drive rw,relatime - nfs4 server:/export rw\n"
+)
+
+
+class TestFilesystemType:
+    """Tests for filesystem_type"""
+
+    def _fs_type(self, path):
+        with patch("builtins.open", mock_open(read_data=MOUNTINFO)):
+            return filesystem_type(path)
+
+    def test_picks_longest_matching_mount(self):
+        assert self._fs_type("/mnt/shared drive/projects") == "nfs4"
+
+    def test_falls_back_to_root(self):
+        assert self._fs_type("/home/user/.claude") == "ext4"
+
+    def test_prefix_must_be_a_path_component(self):
+        assert self._fs_type("/mnt/shared drive2") == "ext4"
+
+    def test_remote_filesystem_is_not_watched(self, tmp_path):
+        with patch("inotify_watch.filesystem_type", return_value="nfs"):
+            assert DirectoryWatcher.create(tmp_path, MASK) is None
+
+
+class TestDirectoryWatcher:
+    """Tests for DirectoryWatcher"""
+
+    def test_missing_directory_returns_none(self, tmp_path):
+        assert DirectoryWatcher.create(tmp_path / "missing", MASK) is None
+
+    def test_reports_created_file(self, tmp_path):
+        watch = DirectoryWatcher.create(tmp_path, MASK)
+        try:
+            (tmp_path / "abc.jsonl").write_text("")
+            events = watch.read(1.0)
+            assert any(mask & IN_CREATE and name == "abc.jsonl" for mask, name in events)
+        finally:
+            watch.close()
+
+    def test_reports_modified_file(self, tmp_path):
+        path = tmp_path / "abc.jsonl"
+        path.write_text("")
+        watch = DirectoryWatcher.create(tmp_path, MASK)
+        try:
+            with open(path, "a") as f:
+                f.write("{}\n")
+            events = watch.read(1.0)
+            assert any(mask & IN_MODIFY and name == "abc.jsonl" for mask, name in events)
+        finally:
+            watch.close()
+
+    def test_read_times_out_without_events(self, tmp_path):
+        watch = DirectoryWatcher.create(tmp_path, MASK)
+        try:
+            assert watch.read(0.05) == []
+        finally:
+            watch.close()
+
+    def test_removed_directory_invalidates_watch(self, tmp_path):
+        target = tmp_path / "projects"
+        target.mkdir()
+        watch = DirectoryWatcher.create(target, MASK)
+        try:
+            target.rmdir()
+            watch.read(1.0)
+            assert watch.valid is False
+        finally:
+            watch.close()
+
+    def test_read_after_close_returns_empty(self, tmp_path):
+        watch = DirectoryWatcher.create(tmp_path, MASK)
+        watch.close()
+        assert watch.read(0) == []
+
+    def test_wake_interrupts_read(self, tmp_path):
+        watch = DirectoryWatcher.create(tmp_path, MASK)
+        try:
+            threading.Timer(0.05, watch.wake).start()
+            t0 = time.monotonic()
+            assert watch.read(5.0) == []
+            assert time.monotonic() - t0 < 1.0
+        finally:
+            watch.close()
+
+    def test_wake_after_close_is_noop(self, tmp_path):
+        watch = DirectoryWatcher.create(tmp_path, MASK)
+        watch.close()
+        watch.wake()
@@ -2,8 +2,12 @@
 
 import json
 import os
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from io import StringIO
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 import pytest
 
@@ -190,6 +194,31 @@ class TestMainNonSensitiveTools:
         assert exc_info.value.code == 0
 
 
+class TestHookStartup:
+    """Tests for the hook's import cost"""
+
+    def test_hook_does_not_import_http_client(self):
+        """The hook should never load urllib/http.client"""
+        input_data = {"tool_name": "Bash", "tool_input": {"command": "ls -la"}}
+        code = (
+            "import sys, permission_hook\n"
+            "try:\n"
+            "    permission_hook.main()\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            "sys.stderr.write(str('http.client' in sys.modules))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            input=json.dumps(input_data),
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            env={**os.environ, "CLAUDE_WATCH_SESSION": "1"},
+        )
+        assert result.stderr == "False"
+
+
 class TestMainInvalidInput:
     """Tests for invalid input handling"""
 
@@ -213,55 +242,48 @@ class TestMainInvalidInput:
 class TestRequestPermission:
     """Tests for request_permission function"""
 
-    @patch("permission_hook.urllib.request.urlopen")
-    def test_request_sends_correct_data(self, mock_urlopen):
+    @patch("permission_hook._request_json")
+    def test_request_sends_correct_data(self, mock_request):
         """Should send tool info to server"""
-        # Mock initial request
-        mock_response1 = MagicMock()
-        mock_response1.read.return_value = b'{"request_id": "abc123"}'
-        mock_response1.__enter__ = MagicMock(return_value=mock_response1)
-        mock_response1.__exit__ = MagicMock(return_value=False)
+        mock_request.side_effect = [{"request_id": "abc123"}, {"status": "resolved", "decision": "allow"}]
+
+        result = permission_hook.request_permission("Bash", {"command": "rm test"}, "tool123")
 
-        # Mock poll response
-        mock_response2 = MagicMock()
-        mock_response2.read.return_value = b'{"status": "resolved", "decision": "allow"}'
-        mock_response2.__enter__ = MagicMock(return_value=mock_response2)
-        mock_response2.__exit__ = MagicMock(return_value=False)
+        assert result["decision"] == "allow"
+        method, path, sent = mock_request.call_args_list[0][0]
+        assert (method, path) == ("POST", "/api/permission/request")
+        assert sent["tool_name"] == "Bash"
+        assert sent["tool_use_id"] == "tool123"
+        # One long-poll instead of repeated status checks
+        assert mock_request.call_args_list[1][0][1].startswith("/api/permission/wait/abc123?timeout=")
 
-        mock_urlopen.side_effect = [mock_response1, mock_response2]
+    @patch("permission_hook._request_json")
+    def test_request_cached_decision_skips_wait(self, mock_request):
+        """A decision the server remembered should be returned without long-polling"""
+        mock_request.return_value = {"status": "resolved", "request_id": "abc123", "decision": "allow"}
 
-        result = permission_hook.request_permission("Bash", {"command": "rm test"}, "tool123")
+        result = permission_hook.request_permission("Bash", {"command": "npm test"}, "tool123")
 
         assert result["decision"] == "allow"
+        assert mock_request.call_count == 1
+        assert mock_request.call_args[0][2]["cwd"] == os.getcwd()
 
-    @patch("permission_hook.urllib.request.urlopen")
-    def test_request_server_unavailable_denies(self, mock_urlopen):
+    @patch("permission_hook._request_json")
+    def test_request_server_unavailable_denies(self, mock_request):
         """Should deny when server is unavailable"""
-        mock_urlopen.side_effect = Exception("Connection refused")
+        mock_request.side_effect = ConnectionRefusedError("Connection refused")
 
         result = permission_hook.request_permission("Bash", {"command": "rm test"}, "tool123")
 
         assert result["decision"] == "deny"
         assert "unavailable" in result["reason"].lower()
 
-    @patch("permission_hook.urllib.request.urlopen")
+    @patch("permission_hook._request_json")
     @patch("permission_hook.time.time")
     @patch("permission_hook.time.sleep")
-    def test_request_timeout_denies(self, mock_sleep, mock_time, mock_urlopen):
+    def test_request_timeout_denies(self, mock_sleep, mock_time, mock_request):
         """Should deny when request times out"""
-        # Mock initial request
-        mock_response1 = MagicMock()
-        mock_response1.read.return_value = b'{"request_id": "abc123"}'
-        mock_response1.__enter__ = MagicMock(return_value=mock_response1)
-        mock_response1.__exit__ = MagicMock(return_value=False)
-
-        # Mock poll responses (always pending)
-        mock_response2 = MagicMock()
-        mock_response2.read.return_value = b'{"status": "pending"}'
-        mock_response2.__enter__ = MagicMock(return_value=mock_response2)
-        mock_response2.__exit__ = MagicMock(return_value=False)
-
-        mock_urlopen.side_effect = [mock_response1] + [mock_response2] * 100
+        mock_request.side_effect = [{"request_id": "abc123"}] + [{"status": "pending"}] * 100
 
         # Simulate time passing beyond timeout
         mock_time.side_effect = [0, 0, 150]  # Start, first check, timeout exceeded
@@ -270,3 +292,46 @@ class TestRequestPermission:
 
         assert result["decision"] == "deny"
         assert "timed out" in result["reason"].lower()
+
+
+class TestRequestJson:
+    """Tests for the socket HTTP client against a real HTTP server"""
+
+    def _serve(self, status, body):
+        received = {}
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self):
+                received["path"] = self.path
+                length = int(self.headers.get("Content-Length", 0))
+                received["body"] = self.rfile.read(length) if length else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = _reply
+
+            def log_message(self, *args):
+                pass
+
+        httpd = HTTPServer(("localhost", 0), Handler)
+        threading.Thread(target=httpd.handle_request, daemon=True).start()
+        return httpd, received
+
+    def test_post_round_trip(self):
+        httpd, received = self._serve(200, b'{"status": "ok", "request_id": "abc123"}')
+        with patch.object(permission_hook, "SERVER_PORT", httpd.server_address[1]):
+            result = permission_hook._request_json("POST", "/api/permission/request", {"tool_name": "Bash"})
+        httpd.server_close()
+
+        assert result == {"status": "ok", "request_id": "abc123"}
+        assert received["path"] == "/api/permission/request"
+        assert json.loads(received["body"]) == {"tool_name": "Bash"}
+
+    def test_error_status_raises(self):
+        httpd, _ = self._serve(404, b'{"status": "not_found"}')
+        with patch.object(permission_hook, "SERVER_PORT", httpd.server_address[1]):
+            with pytest.raises(OSError):
+                permission_hook._request_json("GET", "/api/permission/wait/nope?timeout=1")
+        httpd.server_close()
@@ -1,61 +1,123 @@
 """Unit tests for server.py"""
 
+import asyncio
 import json
 import os
-import sys
+import socket
 import tempfile
+import threading
+import time
 from io import BytesIO
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-# Mock Deepgram before importing server
-sys.modules["deepgram"] = MagicMock()
+import server
 
-import server  # noqa: E402
 
+class DeepgramStub:
+    """Runs a local stand-in for the Deepgram REST API on an event loop used as ws_loop"""
 
-class TestTranscribeAudio:
+    listen_response: dict = {}
+
+    def setup_method(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.peers = []
+        self.requests = []
+
+        async def speak(request):
+            self.peers.append(request.transport.get_extra_info("peername"))
+            body = await request.json()
+            return server.web.Response(body=f"mp3:{body['text']}".encode())
+
+        async def listen(request):
+            self.requests.append((dict(request.query), request.headers, await request.read()))
+            return server.web.json_response(self.listen_response)
+
+        async def start():
+            app = server.web.Application()
+            app.router.add_post("/v1/speak", speak)
+            app.router.add_post("/v1/listen", listen)
+            self.runner = server.web.AppRunner(app)
+            await self.runner.setup()
+            site = server.web.TCPSite(self.runner, "127.0.0.1", 0)
+            await site.start()
+            return site._server.sockets[0].getsockname()[1]
+
+        port = asyncio.run_coroutine_threadsafe(start(), self.loop).result()
+        self.patches = [
+            patch("server.ws_loop", self.loop),
+            patch("server.DEEPGRAM_API_URL", f"http://127.0.0.1:{port}/v1"),
+            patch("server.AUDIO_CACHE_DIR", tempfile.mkdtemp()),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def teardown_method(self):
+        async def stop():
+            if server.deepgram_session is not None:
+                await server.deepgram_session.close()
+                server.deepgram_session = None
+            await self.runner.cleanup()
+
+        asyncio.run_coroutine_threadsafe(stop(), self.loop).result()
+        for p in self.patches:
+            p.stop()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=1)
+
+
+class TestTranscribeAudio(DeepgramStub):
     """Tests for transcribe_audio function"""
 
     def test_transcribe_returns_transcript(self):
         """Should return transcript from Deepgram response"""
-        mock_response = MagicMock()
-        mock_response.results.channels = [MagicMock(alternatives=[MagicMock(transcript="hello world")])]
-        server.client.listen.v1.media.transcribe_file.return_value = mock_response
+        self.listen_response = {"results": {"channels": [{"alternatives": [{"transcript": "hello world"}]}]}}
 
-        result = server.transcribe_audio(b"fake audio data")
+        result = server.transcribe_audio(b"fake audio data", "audio/mp4")
 
         assert result == "hello world"
+        query, headers, body = self.requests[0]
+        assert body == b"fake audio data"
+        assert headers["Content-Type"] == "audio/mp4"
+        assert headers["Authorization"] == f"Token {os.environ['DEEPGRAM_API_KEY']}"
+        assert query["model"] == server.transcription_config["model"]
+        assert query["smart_format"] == "true"
+        assert query["mip_opt_out"] == "true"
+
+    def test_transcribe_streams_file_object(self):
+        """Should stream exactly size bytes from a file object in chunks"""
+        self.listen_response = {"results": {"channels": [{"alternatives": [{"transcript": "streamed"}]}]}}
+        stream = BytesIO(b"0123456789trailing")
+
+        with patch.object(server, "STT_CHUNK_SIZE", 4):
+            result = server.transcribe_audio(stream, "audio/mp4", 10)
+
+        assert result == "streamed"
+        _, headers, body = self.requests[0]
+        assert body == b"0123456789"
+        assert headers["Content-Length"] == "10"
+        assert stream.read() == b"trailing"
 
     def test_transcribe_empty_channels(self):
         """Should return empty string when no channels"""
-        mock_response = MagicMock()
-        mock_response.results.channels = []
-        server.client.listen.v1.media.transcribe_file.return_value = mock_response
+        self.listen_response = {"results": {"channels": []}}
 
-        result = server.transcribe_audio(b"fake audio data")
-
-        assert result == ""
+        assert server.transcribe_audio(b"fake audio data") == ""
 
     def test_transcribe_empty_alternatives(self):
         """Should return empty string when no alternatives"""
-        mock_response = MagicMock()
-        mock_response.results.channels = [MagicMock(alternatives=[])]
-        server.client.listen.v1.media.transcribe_file.return_value = mock_response
+        self.listen_response = {"results": {"channels": [{"alternatives": []}]}}
 
-        result = server.transcribe_audio(b"fake audio data")
+        assert server.transcribe_audio(b"fake audio data") == ""
 
-        assert result == ""
-
-    def test_transcribe_no_results_attribute(self):
+    def test_transcribe_no_results(self):
         """Should return empty string when response has no results"""
-        mock_response = MagicMock(spec=[])  # No 'results' attribute
-        server.client.listen.v1.media.transcribe_file.return_value = mock_response
+        self.listen_response = {}
 
-        result = server.transcribe_audio(b"fake audio data")
-
-        assert result == ""
+        assert server.transcribe_audio(b"fake audio data") == ""
 
 
 class TestRunClaude:
@@ -65,6 +127,13 @@ class TestRunClaude:
         """Reset cooldown before each test"""
         server.last_claude_launch = 0
         server.claude_workdir = "/tmp"
+        server.claude_session = None
+        # Run the job inline so its calls can be asserted on
+        self.inline_jobs = patch("server.submit_claude_job", side_effect=lambda job: job())
+        self.inline_jobs.start()
+
+    def teardown_method(self):
+        self.inline_jobs.stop()
 
     @patch("server.ClaudeWrapper")
     def test_run_claude_uses_wrapper(self, mock_wrapper_class):
@@ -113,6 +182,56 @@ class TestRunClaude:
         # Cleanup
         server.transcription_config["claude_model"] = None
 
+    @patch("server.ClaudeWrapper")
+    def test_claude_session_cached_until_model_changes(self, mock_wrapper_class):
+        """Should only call get_instance again when the configured model changes"""
+        server.transcription_config["claude_model"] = None
+        first = server.get_claude_session()
+        assert server.get_claude_session() is first
+        assert mock_wrapper_class.get_instance.call_count == 1
+
+        server.transcription_config["claude_model"] = "opus"
+        server.get_claude_session()
+        mock_wrapper_class.get_instance.assert_called_with("/tmp", model="opus")
+        assert mock_wrapper_class.get_instance.call_count == 2
+
+        # Cleanup
+        server.transcription_config["claude_model"] = None
+
+
+class TestClaudeWorkers:
+    """Tests for the reusable Claude worker threads"""
+
+    def test_jobs_share_a_bounded_set_of_threads(self):
+        done = threading.Event()
+        names = []
+        count = 3 * server.CLAUDE_WORKERS
+
+        def job():
+            names.append(threading.current_thread().name)
+            if len(names) == count:
+                done.set()
+
+        for _ in range(count):
+            server.submit_claude_job(job)
+
+        assert done.wait(timeout=5)
+        assert len(names) == count
+        assert len(set(names)) <= server.CLAUDE_WORKERS
+        assert len(server.claude_worker_threads) == server.CLAUDE_WORKERS
+
+    def test_failing_job_keeps_worker_alive(self):
+        ran = threading.Event()
+
+        def bad_job():
+            raise RuntimeError("boom")
+
+        for _ in range(server.CLAUDE_WORKERS):
+            server.submit_claude_job(bad_job)
+        server.submit_claude_job(ran.set)
+
+        assert ran.wait(timeout=5)
+
 
 class TestDictationHandler:
     """Tests for HTTP request handling"""
@@ -239,10 +358,13 @@ class TestDictationHandler:
     @patch.object(server.DictationHandler, "__init__", lambda x, *args: None)
     def test_do_get_api_history(self):
         """Should return history JSON"""
-        server.request_history = [{"id": 1, "transcript": "test", "status": "completed"}]
+        server.request_history.clear()
+        server.request_history.append({"id": 1, "transcript": "test", "status": "completed"})
         server.claude_workdir = "/test/dir"
+        server.history_changed()
 
         handler = server.DictationHandler()
+        handler.headers = {}
         handler.path = "/api/history"
         handler.wfile = BytesIO()
         handler.send_response = MagicMock()
@@ -259,7 +381,7 @@ class TestDictationHandler:
         assert data["history"][0]["transcript"] == "test"
 
         # Cleanup
-        server.request_history = []
+        server.request_history.clear()
 
     @patch.object(server.DictationHandler, "__init__", lambda x, *args: None)
     def test_do_get_dashboard(self):
@@ -286,7 +408,7 @@ class TestMainArgumentParsing:
         """Should accept valid directory"""
         with tempfile.TemporaryDirectory() as tmpdir:
             with patch("sys.argv", ["server.py", tmpdir]):
-                with patch.object(server, "HTTPServer") as mock_server:
+                with patch.object(server, "ThreadingHTTPServer") as mock_server:
                     mock_server.return_value.serve_forever.side_effect = KeyboardInterrupt
 
                     try:
@@ -314,7 +436,7 @@ class TestMainArgumentParsing:
         """Should expand ~ in path"""
         home = os.path.expanduser("~")
         with patch("sys.argv", ["server.py", "~"]):
-            with patch.object(server, "HTTPServer") as mock_server:
+            with patch.object(server, "ThreadingHTTPServer") as mock_server:
                 mock_server.return_value.serve_forever.side_effect = KeyboardInterrupt
 
                 try:
@@ -331,6 +453,8 @@ class TestPermissionEndpoints:
     def setup_method(self):
         """Reset pending permissions before each test"""
         server.pending_permissions = {}
+        server.permission_events = {}
+        server.permission_decisions = {}
 
     @patch.object(server.DictationHandler, "__init__", lambda x, *args: None)
     @patch("server.broadcast_message")
@@ -390,12 +514,56 @@ class TestPermissionEndpoints:
         handler.send_header = MagicMock()
         handler.end_headers = MagicMock()
 
-        handler.handle_permission_status()
+        handler.do_GET()
 
         response = json.loads(handler.wfile.getvalue())
         assert response["status"] == "pending"
         assert response["decision"] is None
 
+    @patch.object(server.DictationHandler, "__init__", lambda x, *args: None)
+    def test_permission_wait_returns_when_resolved(self):
+        """Long-poll should answer as soon as the app responds"""
+        server.pending_permissions["wait1"] = {"status": "pending", "decision": None, "reason": None}
+        event = server.permission_events["wait1"] = threading.Event()
+
+        def resolve():
+            server.pending_permissions["wait1"].update(status="resolved", decision="allow", reason="")
+            event.set()
+
+        handler = server.DictationHandler()
+        handler.path = "/api/permission/wait/wait1?timeout=5"
+        handler.wfile = BytesIO()
+        handler.send_response = MagicMock()
+        handler.send_header = MagicMock()
+        handler.end_headers = MagicMock()
+
+        threading.Timer(0.05, resolve).start()
+        t0 = time.monotonic()
+        handler.do_GET()
+
+        assert time.monotonic() - t0 < 1.0
+        response = json.loads(handler.wfile.getvalue())
+        assert response["status"] == "resolved"
+        assert response["decision"] == "allow"
+
+    @patch.object(server.DictationHandler, "__init__", lambda x, *args: None)
+    def test_permission_wait_times_out_pending(self):
+        """Long-poll should report pending once its timeout passes"""
+        server.pending_permissions["wait2"] = {"status": "pending", "decision": None, "reason": None}
+        server.permission_events["wait2"] = threading.Event()
+
+        handler = server.DictationHandler()
+        handler.path = "/api/permission/wait/wait2?timeout=0.05"
+        handler.wfile = BytesIO()
+        handler.send_response = MagicMock()
+        handler.send_header = MagicMock()
+        handler.end_headers = MagicMock()
+
+        handler.do_GET()
+
+        response = json.loads(handler.wfile.getvalue())
+        assert response["status"] == "pending"
+
     @patch.object(server.DictationHandler, "__init__", lambda x, *args: None)
     def test_permission_status_resolved(self):
         """Should return resolved status with decision"""
@@ -413,7 +581,7 @@ class TestPermissionEndpoints:
         handler.send_header = MagicMock()
         handler.end_headers = MagicMock()
 
-        handler.handle_permission_status()
+        handler.do_GET()
 
         response = json.loads(handler.wfile.getvalue())
         assert response["status"] == "resolved"
@@ -430,7 +598,7 @@ class TestPermissionEndpoints:
         handler.send_header = MagicMock()
         handler.end_headers = MagicMock()
 
-        handler.handle_permission_status()
+        handler.do_GET()
 
         handler.send_response.assert_called_with(404)
 
@@ -468,6 +636,39 @@ class TestPermissionEndpoints:
         assert broadcast_data["type"] == "permission_resolved"
         assert broadcast_data["decision"] == "allow"
 
+    @patch.object(server.DictationHandler, "__init__", lambda x, *args: None)
+    @patch("server.broadcast_message")
+    def test_permission_respond_records_duration(self, mock_broadcast):
+        """Should time the decision on the linked request's permission step"""
+        server.add_history_entry(
+            {"request_id": "req-dur", "steps": [{"name": "permission", "permission_request_id": "permdur"}]}
+        )
+        server.pending_permissions["permdur"] = {
+            "tool_name": "Bash",
+            "status": "pending",
+            "decision": None,
+            "reason": None,
+            "timestamp": server.utc_now_iso(),
+            "requested_monotonic": time.monotonic() - 1.5,
+            "claude_request_id": "req-dur",
+        }
+
+        handler = server.DictationHandler()
+        handler.path = "/api/permission/respond"
+        handler.headers = {"Content-Length": "100"}
+        handler.rfile = BytesIO(json.dumps({"request_id": "permdur", "decision": "allow"}).encode())
+        handler.wfile = BytesIO()
+        handler.send_response = MagicMock()
+        handler.send_header = MagicMock()
+        handler.end_headers = MagicMock()
+
+        handler.handle_permission_respond(100)
+
+        handler.send_response.assert_called_with(200)
+        step = server.request_index["req-dur"]["steps"][0]
+        assert step["status"] == "completed"
+        assert 1500 <= step["duration_ms"] < 3000
+
     @patch.object(server.DictationHandler, "__init__", lambda x, *args: None)
     @patch("server.broadcast_message")
     def test_permission_respond_deny(self, mock_broadcast):
@@ -495,6 +696,69 @@ class TestPermissionEndpoints:
         assert server.pending_permissions["testdeny"]["decision"] == "deny"
         assert server.pending_permissions["testdeny"]["reason"] == "Too dangerous"
 
+    def _permission_handler(self, path, body=b""):
+        handler = server.DictationHandler()
+        handler.path = path
+        handler.headers = {"Content-Length": str(len(body))}
+        handler.rfile = BytesIO(body)
+        handler.wfile = BytesIO()
+        handler.send_response = MagicMock()
+        handler.send_header = MagicMock()
+        handler.end_headers = MagicMock()
+        return handler
+
+    def _request_permission(self, command, cwd="/proj"):
+        body = json.dumps({"tool_name": "Bash", "tool_input": {"command": command}, "cwd": cwd}).encode()
+        handler = self._permission_handler("/api/permission/request", body)
+        handler.handle_permission_request(len(body))
+        return json.loads(handler.wfile.getvalue())
+
+    def _respond_permission(self, request_id, decision):
+        body = json.dumps({"request_id": request_id, "decision": decision}).encode()
+        self._permission_handler("/api/permission/respond", body).handle_permission_respond(len(body))
+
+    @patch.object(server.DictationHandler, "__init__", lambda x, *args: None)
+    @patch("server.broadcast_message")
+    def test_permission_repeat_answered_from_cache(self, mock_broadcast):
+        """An identical call in the same directory should reuse the earlier decision"""
+        first = self._request_permission("npm test")
+        self._respond_permission(first["request_id"], "allow")
+        mock_broadcast.reset_mock()
+
+        repeat = self._request_permission("npm test")
+
+        assert repeat["status"] == "resolved"
+        assert repeat["decision"] == "allow"
+        assert repeat["request_id"] not in server.pending_permissions
+        mock_broadcast.assert_not_called()
+
+        # Different command or directory still asks the phone
+        assert self._request_permission("npm test", cwd="/other")["status"] == "ok"
+        assert self._request_permission("npm run build")["status"] == "ok"
+
+    @patch.object(server.DictationHandler, "__init__", lambda x, *args: None)
+    @patch("server.broadcast_message")
+    def test_permission_cached_allow_expires(self, mock_broadcast):
+        """Remembered allows should lapse after PERMISSION_ALLOW_TTL"""
+        first = self._request_permission("npm test")
+        self._respond_permission(first["request_id"], "allow")
+
+        with patch("server.time.monotonic", return_value=time.monotonic() + server.PERMISSION_ALLOW_TTL + 1):
+            assert self._request_permission("npm test")["status"] == "ok"
+
+    @patch.object(server.DictationHandler, "__init__", lambda x, *args: None)
+    @patch("server.broadcast_message")
+    def test_permission_clear_forgets_decisions(self, mock_broadcast):
+        """POST /api/permission/clear should drop remembered decisions"""
+        first = self._request_permission("rm -rf build")
+        self._respond_permission(first["request_id"], "deny")
+
+        handler = self._permission_handler("/api/permission/clear")
+        handler.handle_permission_clear()
+
+        assert json.loads(handler.wfile.getvalue())["cleared"] == 1
+        assert self._request_permission("rm -rf build")["status"] == "ok"
+
     @patch.object(server.DictationHandler, "__init__", lambda x, *args: None)
     def test_permission_respond_not_found(self):
         """Should return 404 for unknown request"""
@@ -512,6 +776,47 @@ class TestPermissionEndpoints:
         handler.send_response.assert_called_with(404)
 
 
+class TestPostBodyLimit:
+    """Tests for the size check on JSON POST bodies"""
+
+    @patch.object(server.DictationHandler, "__init__", lambda x, *args: None)
+    @patch.object(server.DictationHandler, "POST_ROUTES", {"/api/message": MagicMock()})
+    @pytest.mark.parametrize("length,status", [(str(server.MAX_JSON_BODY + 1), 413), ("-1", 400)])
+    def test_rejected_before_reading(self, length, status):
+        handler = server.DictationHandler()
+        handler.path = "/api/message"
+        handler.headers = {"Content-Length": length}
+        handler.rfile = MagicMock()
+        handler.wfile = BytesIO()
+        handler.send_response = MagicMock()
+        handler.send_header = MagicMock()
+        handler.end_headers = MagicMock()
+
+        handler.do_POST()
+
+        handler.send_response.assert_called_with(status)
+        handler.rfile.read.assert_not_called()
+        server.DictationHandler.POST_ROUTES["/api/message"].assert_not_called()
+
+
+class TestPermissionPrompts:
+    """Tests for the per-tool permission prompt formatters"""
+
+    def prompt(self, tool_name, tool_input):
+        return server.PERMISSION_PROMPTS.get(tool_name, server._generic_permission_prompt)(tool_name, tool_input)
+
+    def test_bash(self):
+        assert self.prompt("Bash", {"command": "ls", "description": "List"}) == ("Run command: ls", "List")
+
+    def test_edit_falls_back_to_new_string(self):
+        question, context = self.prompt("Edit", {"file_path": "/a.py", "new_string": "x" * 300})
+        assert question == "Edit file: /a.py"
+        assert context == "x" * 200
+
+    def test_other_tool(self):
+        assert self.prompt("WebFetch", {"url": "u"}) == ("Execute WebFetch", '{"url": "u"}')
+
+
 class TestConfigEndpoints:
     """Tests for config GET and POST endpoints"""
 
@@ -606,6 +911,28 @@ class TestConfigEndpoints:
         data = json.loads(handler.wfile.getvalue())
         assert data["status"] == "error"
 
+    @patch.object(server.DictationHandler, "__init__", lambda x, *args: None)
+    def test_post_config_mixed_fields(self):
+        """Should apply valid fields and report invalid or non-string choices"""
+        body = json.dumps({"response_mode": "text", "language": ["pl"], "punctuate": 0}).encode()
+
+        handler = server.DictationHandler()
+        handler.path = "/api/config"
+        handler.headers = {"Content-Length": str(len(body))}
+        handler.rfile = BytesIO(body)
+        handler.wfile = BytesIO()
+        handler.send_response = MagicMock()
+        handler.send_header = MagicMock()
+        handler.end_headers = MagicMock()
+
+        handler.handle_config_update(len(body))
+
+        handler.send_response.assert_called_with(400)
+        data = json.loads(handler.wfile.getvalue())
+        assert data["errors"] == ["Invalid language: ['pl']"]
+        assert server.response_config["mode"] == "text"
+        assert server.transcription_config["punctuate"] is False
+
 
 class TestChatEndpoint:
     """Tests for GET /api/chat"""
@@ -615,8 +942,10 @@ class TestChatEndpoint:
         """Should return chat messages, state, and prompt"""
         server.chat_history.clear()
         server.chat_history.append({"role": "user", "content": "hello"})
+        server.chat_changed()
 
         handler = server.DictationHandler()
+        handler.headers = {}
         handler.path = "/api/chat"
         handler.wfile = BytesIO()
         handler.send_response = MagicMock()
@@ -637,6 +966,64 @@ class TestChatEndpoint:
         server.chat_history.clear()
 
 
+class TestVersionedResponses:
+    """Tests for the ETag on /api/history and /api/chat"""
+
+    def get(self, path, etag=None):
+        with patch.object(server.DictationHandler, "__init__", lambda x, *args: None):
+            handler = server.DictationHandler()
+        handler.headers = {"If-None-Match": etag} if etag else {}
+        handler.path = path
+        handler.wfile = BytesIO()
+        handler.send_response = MagicMock()
+        handler.send_header = MagicMock()
+        handler.end_headers = MagicMock()
+        handler.do_GET()
+        headers = dict(c.args for c in handler.send_header.call_args_list)
+        return handler.send_response.call_args.args[0], headers.get("ETag"), handler.wfile.getvalue()
+
+    def test_unchanged_history_is_304(self):
+        status, etag, body = self.get("/api/history")
+        assert status == 200 and etag and body
+
+        status, _, body = self.get("/api/history", etag)
+        assert status == 304
+        assert body == b""
+
+    def test_history_change_invalidates_etag(self):
+        _, etag, _ = self.get("/api/history")
+        server.add_history_entry({"request_id": "etag-test", "steps": []})
+
+        status, new_etag, body = self.get("/api/history", etag)
+        assert status == 200
+        assert new_etag != etag
+        assert b"etag-test" in body
+
+        server.add_response_step("etag-test", {"name": "x"})
+        assert self.get("/api/history", new_etag)[0] == 200
+
+    def test_body_serialized_once_per_version(self):
+        server.history_changed()
+        with patch("server._dumpb", wraps=server._dumpb) as dumpb:
+            first = self.get("/api/history")
+            second = self.get("/api/history")
+        assert first == second
+        assert dumpb.call_count == 1
+
+    @patch("server.broadcast_message")
+    def test_chat_change_invalidates_etag(self, mock_broadcast):
+        _, etag, _ = self.get("/api/chat")
+        assert self.get("/api/chat", etag)[0] == 304
+
+        server.add_chat_message("user", "hi")
+        assert self.get("/api/chat", etag)[0] == 200
+
+        _, etag, _ = self.get("/api/chat")
+        server.set_claude_state("thinking")
+        assert self.get("/api/chat", etag)[0] == 200
+        server.chat_history.clear()
+
+
 class TestTextMessageEndpoint:
     """Tests for POST /api/message"""
 
@@ -703,7 +1090,7 @@ class TestResponseCheckEndpoint:
         handler.send_header = MagicMock()
         handler.end_headers = MagicMock()
 
-        handler.handle_response_check()
+        handler.do_GET()
 
         handler.send_response.assert_called_with(404)
         data = json.loads(handler.wfile.getvalue())
@@ -721,7 +1108,7 @@ class TestResponseCheckEndpoint:
         handler.send_header = MagicMock()
         handler.end_headers = MagicMock()
 
-        handler.handle_response_check()
+        handler.do_GET()
 
         handler.send_response.assert_called_with(200)
         data = json.loads(handler.wfile.getvalue())
@@ -741,7 +1128,7 @@ class TestResponseCheckEndpoint:
         handler.send_header = MagicMock()
         handler.end_headers = MagicMock()
 
-        handler.handle_response_check()
+        handler.do_GET()
 
         handler.send_response.assert_called_with(200)
         data = json.loads(handler.wfile.getvalue())
@@ -751,6 +1138,103 @@ class TestResponseCheckEndpoint:
 
         del server.claude_responses["test-done"]
 
+    @patch.object(server.DictationHandler, "__init__", lambda x, *args: None)
+    def test_response_ack_marks_delivered(self):
+        """POST /api/response/<id>/ack should route to the ack handler with the ID"""
+        server.claude_responses["test-ack"] = {"status": "completed", "response": "hi"}
+
+        handler = server.DictationHandler()
+        handler.headers = {"Content-Length": "0"}
+        handler.path = "/api/response/test-ack/ack"
+        handler.wfile = BytesIO()
+        handler.send_response = MagicMock()
+        handler.send_header = MagicMock()
+        handler.end_headers = MagicMock()
+
+        handler.do_POST()
+
+        handler.send_response.assert_called_with(200)
+        assert server.claude_responses["test-ack"]["delivered"] is True
+
+        del server.claude_responses["test-ack"]
+
+
+class TestAudioFileEndpoint:
+    """Tests for GET /api/audio/<id>"""
+
+    def teardown_method(self):
+        server.claude_responses.pop("test-audio", None)
+
+    @patch.object(server.DictationHandler, "__init__", lambda x, *args: None)
+    def test_streams_file_to_socket(self, tmp_path):
+        audio = tmp_path / "reply.mp3"
+        audio.write_bytes(b"ID3" + bytes(range(256)) * 100)
+        server.claude_responses["test-audio"] = {"status": "completed", "audio_path": str(audio)}
+
+        server_sock, client_sock = socket.socketpair()
+        with server_sock, client_sock:
+            handler = server.DictationHandler()
+            handler.path = "/api/audio/test-audio"
+            handler.request_version = "HTTP/1.0"
+            handler.requestline = "GET /api/audio/test-audio HTTP/1.0"
+            handler.connection = server_sock
+            handler.wfile = server_sock.makefile("wb", buffering=0)
+            handler.do_GET()
+            server_sock.shutdown(socket.SHUT_WR)
+
+            response = b"".join(iter(lambda: client_sock.recv(65536), b""))
+
+        headers, _, body = response.partition(b"\r\n\r\n")
+        assert headers.startswith(b"HTTP/1.0 200")
+        assert f"Content-Length: {len(body)}".encode() in headers
+        assert body == audio.read_bytes()
+
+    @patch.object(server.DictationHandler, "__init__", lambda x, *args: None)
+    def test_missing_file_is_404(self, tmp_path):
+        server.claude_responses["test-audio"] = {"status": "completed", "audio_path": str(tmp_path / "gone.mp3")}
+
+        handler = server.DictationHandler()
+        handler.path = "/api/audio/test-audio"
+        handler.send_response = MagicMock()
+        handler.end_headers = MagicMock()
+        handler.do_GET()
+
+        handler.send_response.assert_called_with(404)
+
+
+class TestStaticPages:
+    """Tests for the in-memory cache behind the dashboard and viewer"""
+
+    def test_rereads_only_when_file_changes(self, tmp_path):
+        page = tmp_path / "page.html"
+        page.write_bytes(b"<p>one</p>")
+        assert server.read_static(str(page)) == b"<p>one</p>"
+
+        with patch("builtins.open", side_effect=AssertionError("should be cached")):
+            assert server.read_static(str(page)) == b"<p>one</p>"
+
+        page.write_bytes(b"<p>two</p>")
+        os.utime(page, ns=(0, 1))
+        assert server.read_static(str(page)) == b"<p>two</p>"
+
+    def test_missing_file(self, tmp_path):
+        assert server.read_static(str(tmp_path / "nope.html")) is None
+
+    @patch.object(server.DictationHandler, "__init__", lambda x, *args: None)
+    def test_dashboard_sends_content_length(self):
+        handler = server.DictationHandler()
+        handler.path = "/dashboard"
+        handler.wfile = BytesIO()
+        handler.send_response = MagicMock()
+        handler.send_header = MagicMock()
+        handler.end_headers = MagicMock()
+
+        handler.do_GET()
+
+        body = handler.wfile.getvalue()
+        handler.send_response.assert_called_with(200)
+        handler.send_header.assert_any_call("Content-Length", str(len(body)))
+
 
 class TestClaudeRestartEndpoint:
     """Tests for POST /api/claude/restart"""
@@ -853,6 +1337,185 @@ class TestConnectedClients:
         server.websocket_clients.clear()
 
 
+class TestBroadcast:
+    """Tests for fanning WebSocket messages out to clients"""
+
+    class FakeWs:
+        def __init__(self, delay=0.0, error=None):
+            self.delay = delay
+            self.error = error
+            self.sent = []
+            self.closed = False
+
+        async def send_frame(self, data, opcode):
+            await asyncio.sleep(self.delay)
+            if self.error:
+                raise self.error
+            assert opcode == server.WSMsgType.TEXT
+            self.sent.append(data)
+
+        async def close(self):
+            self.closed = True
+
+    def add_client(self, ws, *initial):
+        server.websocket_clients[ws] = {"ip": "127.0.0.1"}
+        server._attach_sender(ws, *initial)
+
+    def teardown_method(self):
+        for _, task in server.client_senders.values():
+            task.cancel()
+        server.client_senders.clear()
+        server.websocket_clients.clear()
+
+    def test_stalled_and_failed_clients_are_dropped(self):
+        async def scenario():
+            fast, slow, broken = self.FakeWs(), self.FakeWs(delay=10), self.FakeWs(error=ConnectionResetError())
+            for ws in (slow, broken, fast):
+                self.add_client(ws)
+
+            server._enqueue(b'{"type": "state"}')
+            await asyncio.sleep(0.3)
+
+            # The stalled client doesn't hold up the others
+            assert fast.sent == [b'{"type": "state"}']
+            assert list(server.websocket_clients) == [fast]
+            assert slow.closed and broken.closed
+
+        with patch("server.WS_SEND_TIMEOUT", 0.1):
+            asyncio.run(scenario())
+
+    def test_messages_arrive_in_order_after_initial_ones(self):
+        async def scenario():
+            ws = self.FakeWs(delay=0.001)
+            self.add_client(ws, b"state", b"history")
+            for i in range(20):
+                server._enqueue(str(i).encode())
+            await asyncio.sleep(0.2)
+
+            assert ws.sent == [b"state", b"history"] + [str(i).encode() for i in range(20)]
+
+        asyncio.run(scenario())
+
+    def test_client_too_far_behind_is_dropped(self):
+        async def scenario():
+            slow, fast = self.FakeWs(delay=10), self.FakeWs()
+            self.add_client(slow)
+            self.add_client(fast)
+            for i in range(5):
+                server._enqueue(str(i).encode())
+                await asyncio.sleep(0.001)
+
+            assert slow not in server.websocket_clients
+            assert len(fast.sent) == 5
+
+        with patch("server.WS_QUEUE_SIZE", 2):
+            asyncio.run(scenario())
+
+    def test_broadcast_message_does_not_wait_for_clients(self):
+        async def scenario():
+            server.ws_loop = asyncio.get_running_loop()
+            ws = self.FakeWs(delay=10)
+            self.add_client(ws)
+
+            t0 = time.monotonic()
+            server.broadcast_message({"type": "state"})
+            assert time.monotonic() - t0 < 0.1
+
+            # The sender picked the message up and is still stuck sending it
+            await asyncio.sleep(0.05)
+            assert server.client_senders[ws][0].qsize() == 0
+            assert ws.sent == []
+
+        try:
+            asyncio.run(scenario())
+        finally:
+            server.ws_loop = None
+
+
+class TestBroadcastBatching:
+    """Tests for handing broadcasts to the event loop in batches"""
+
+    def setup_method(self):
+        server.websocket_clients[object()] = {}
+        server.pending_broadcasts.clear()
+
+    def teardown_method(self):
+        server.websocket_clients.clear()
+        server.pending_broadcasts.clear()
+        server.ws_loop = None
+
+    @patch("server._enqueue")
+    def test_one_wakeup_per_batch(self, mock_enqueue):
+        server.ws_loop = MagicMock()
+        for i in range(3):
+            server.broadcast_message({"n": i})
+
+        server.ws_loop.call_soon_threadsafe.assert_called_once_with(server._flush_broadcasts)
+
+        server._flush_broadcasts()
+        assert [c.args[0] for c in mock_enqueue.call_args_list] == [b'{"n":0}', b'{"n":1}', b'{"n":2}']
+
+        # The next broadcast starts a new batch
+        server.broadcast_message({"n": 3})
+        assert server.ws_loop.call_soon_threadsafe.call_count == 2
+
+
+class TestIdleTimer:
+    """Tests for returning to idle after a spoken response"""
+
+    def teardown_method(self):
+        server.ws_loop = None
+        server.idle_timer = None
+        server.claude_state["status"] = "idle"
+
+    @patch("server.broadcast_message")
+    @patch("server.SPEAKING_IDLE_DELAY", 0.1)
+    def test_new_response_restarts_timer(self, mock_broadcast):
+        async def scenario():
+            server.ws_loop = asyncio.get_running_loop()
+            server.claude_state["status"] = "speaking"
+            server.schedule_return_to_idle()
+            await asyncio.sleep(0.06)
+            server.schedule_return_to_idle()
+            await asyncio.sleep(0.06)
+            # The first timer was cancelled, so still speaking
+            assert server.claude_state["status"] == "speaking"
+            await asyncio.sleep(0.1)
+            assert server.claude_state["status"] == "idle"
+
+        asyncio.run(scenario())
+
+    def test_no_loop_is_a_noop(self):
+        server.schedule_return_to_idle()
+        assert server.idle_timer is None
+
+
+class TestUtcNowIso:
+    """Tests for the millisecond-cached utc_now_iso"""
+
+    def test_format_matches_claude_jsonl(self):
+        with patch("server.time.time_ns", return_value=1_700_000_000_123_456_789):
+            assert server.utc_now_iso() == "2023-11-14T22:13:20.123Z"
+
+    def test_reuses_string_within_a_millisecond(self):
+        with patch("server.time.time_ns", return_value=1_700_000_000_500_000_000):
+            first = server.utc_now_iso()
+        with patch("server.time.time_ns", return_value=1_700_000_000_500_999_999):
+            assert server.utc_now_iso() is first
+        with patch("server.time.time_ns", return_value=1_700_000_000_501_000_000):
+            assert server.utc_now_iso() == "2023-11-14T22:13:20.501Z"
+
+
+class TestUtf8Len:
+    """Tests for _utf8_len helper"""
+
+    def test_ascii(self):
+        assert server._utf8_len("hello") == 5
+
+    def test_multibyte(self):
+        assert server._utf8_len("zażółć") == len("zażółć".encode())
+
+
 class TestSummarizeToolInput:
     """Tests for _summarize_tool_input helper"""
 
@@ -866,6 +1529,14 @@ class TestSummarizeToolInput:
         assert len(result) <= 83  # 80 + "..."
         assert result.endswith("...")
 
+    def test_unknown_tool_truncates_long_value(self):
+        result = server._summarize_tool_input("Unknown", {"arg": "y" * 81})
+        assert result == "y" * 80 + "..."
+
+    def test_bash_keeps_command_at_limit(self):
+        cmd = "z" * 80
+        assert server._summarize_tool_input("Bash", {"command": cmd}) == cmd
+
     def test_read_returns_file_path(self):
         result = server._summarize_tool_input("Read", {"file_path": "/tmp/test.py"})
         assert result == "/tmp/test.py"
@@ -907,12 +1578,68 @@ class TestSummarizeToolInput:
         assert result == ""
 
 
+class TestTextToSpeech(DeepgramStub):
+    """Tests for Deepgram TTS over the shared aiohttp session"""
+
+    def test_writes_audio_and_reuses_connection(self):
+        first = server.text_to_speech("hello", "req1")
+        second = server.text_to_speech("again", "req2")
+
+        with open(first, "rb") as f:
+            assert f.read() == b"mp3:hello"
+        with open(second, "rb") as f:
+            assert f.read() == b"mp3:again"
+        # Both requests went over the same kept-alive connection
+        assert len(self.peers) == 2
+        assert self.peers[0] == self.peers[1]
+
+
+class TestRequestHistoryIndex:
+    """Tests for request_history and its request_id index"""
+
+    def setup_method(self):
+        server.request_history.clear()
+        server.request_index.clear()
+
+    teardown_method = setup_method
+
+    def test_steps_added_through_index(self):
+        server.add_history_entry({"request_id": "a1", "steps": [{"name": "claude", "status": "in_progress"}]})
+
+        server.add_response_step("a1", {"name": "tool", "status": "completed"})
+        server.update_response_step("a1", "claude", {"status": "completed"})
+        server.add_response_step("missing", {"name": "tool"})
+
+        steps = server.request_history[0]["steps"]
+        assert [step["name"] for step in steps] == ["claude", "tool"]
+        assert steps[0]["status"] == "completed"
+
+    def test_chat_history_keeps_latest_messages(self):
+        with patch("server.broadcast_message"):
+            for i in range(server.MAX_CHAT_HISTORY + 3):
+                server.add_chat_message("user", f"m{i}")
+
+        assert len(server.chat_history) == server.MAX_CHAT_HISTORY
+        assert server.chat_history[0]["content"] == "m3"
+        server.chat_history.clear()
+
+    def test_evicted_entries_leave_index(self):
+        for i in range(server.MAX_HISTORY + 5):
+            server.add_history_entry({"request_id": f"r{i}", "steps": []})
+
+        assert len(server.request_history) == server.MAX_HISTORY
+        assert len(server.request_index) == server.MAX_HISTORY
+        assert "r0" not in server.request_index
+        assert server.request_index[f"r{server.MAX_HISTORY + 4}"] is server.request_history[0]
+
+
 class TestTerminalRequestTimeline:
     """Tests for terminal request timeline tracking"""
 
     def setup_method(self):
         """Reset state before each test"""
         server.request_history.clear()
+        server.request_index.clear()
         server.terminal_request_id = None
         server.claude_state["current_request_id"] = None
         server.websocket_clients.clear()
@@ -920,6 +1647,7 @@ class TestTerminalRequestTimeline:
     def teardown_method(self):
         """Clean up state after each test"""
         server.request_history.clear()
+        server.request_index.clear()
         server.terminal_request_id = None
         server.claude_state["current_request_id"] = None
 
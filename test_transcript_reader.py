@@ -6,10 +6,12 @@ from pathlib import Path
 from unittest.mock import patch
 
 from transcript_reader import (
+    TranscriptTail,
     find_latest_session,
     get_jsonl_line_count,
     get_projects_dir,
     get_transcript_path,
+    list_sessions,
     read_context_usage,
     read_new_entries,
     session_file_exists,
@@ -67,6 +69,31 @@ class TestReadContextUsage:
             }
         )
 
+    def test_reads_backwards_across_blocks(self, tmp_path):
+        """Lines split across read blocks are reassembled"""
+        older = {"input_tokens": 1, "output_tokens": 1}
+        latest = {"input_tokens": 7, "output_tokens": 3}
+        transcript = tmp_path / "sess.jsonl"
+        transcript.write_text(
+            "\n".join(
+                [
+                    self._make_assistant_entry(older),
+                    self._make_assistant_entry(latest),
+                    self._make_user_entry(),
+                    self._make_assistant_entry({"input_tokens": 9}, is_sidechain=True),
+                ]
+            )
+        )
+
+        with (
+            patch("transcript_reader.get_transcript_path", return_value=transcript),
+            patch("transcript_reader.LINE_COUNT_BLOCK", 7),
+        ):
+            result = read_context_usage("/fake/dir", "sess")
+
+        assert result["input_tokens"] == 7
+        assert result["output_tokens"] == 3
+
     def test_returns_usage_from_last_assistant(self, tmp_path):
         """Should return usage from the last assistant entry"""
         usage = {
@@ -381,6 +408,15 @@ class TestGetJsonlLineCount:
 
         assert result == 3
 
+    def test_counts_unterminated_last_line(self, tmp_path):
+        transcript = tmp_path / "sess.jsonl"
+        transcript.write_text("line1\nline2")
+
+        with patch("transcript_reader.get_transcript_path", return_value=transcript):
+            result = get_jsonl_line_count("/fake", "sess")
+
+        assert result == 2
+
     def test_empty_file(self, tmp_path):
         transcript = tmp_path / "sess.jsonl"
         transcript.write_text("")
@@ -391,6 +427,23 @@ class TestGetJsonlLineCount:
         assert result == 0
 
 
+class TestListSessions:
+    """Tests for list_sessions"""
+
+    def test_returns_empty_for_missing_dir(self):
+        with patch("transcript_reader.get_projects_dir", return_value=Path("/nonexistent/dir")):
+            assert list_sessions("/fake") == {}
+
+    def test_maps_session_ids_to_mtime(self, tmp_path):
+        (tmp_path / "sess-1.jsonl").write_text("{}\n")
+        (tmp_path / "notes.txt").write_text("ignored")
+
+        with patch("transcript_reader.get_projects_dir", return_value=tmp_path):
+            result = list_sessions("/fake")
+
+        assert result == {"sess-1": (tmp_path / "sess-1.jsonl").stat().st_mtime}
+
+
 class TestReadNewEntries:
     """Tests for read_new_entries"""
 
@@ -449,3 +502,146 @@ class TestReadNewEntries:
         with patch("transcript_reader.get_transcript_path", return_value=fake_path):
             result = read_new_entries("/fake", "sess", 0)
         assert result == []
+
+    def test_drops_skipped_types_without_parsing(self, tmp_path):
+        transcript = tmp_path / "sess.jsonl"
+        transcript.write_text('{"type":"file-history-snapshot","snapshot":{"a":1}}\n{"type":"user"}\n')
+
+        with patch("transcript_reader.get_transcript_path", return_value=transcript):
+            result = read_new_entries("/fake", "sess", 0, frozenset({"file-history-snapshot"}))
+
+        assert result == [{"type": "user"}]
+
+
+class TestTranscriptTail:
+    """Tests for TranscriptTail"""
+
+    def test_reads_only_appended_entries(self, tmp_path):
+        transcript = tmp_path / "sess.jsonl"
+        transcript.write_text(json.dumps({"n": 1}) + "\n")
+        tail = TranscriptTail(transcript)
+
+        assert tail.read_new() == [{"n": 1}]
+        assert tail.read_new() == []
+
+        with open(transcript, "a") as f:
+            f.write(json.dumps({"n": 2}) + "\n")
+        assert tail.read_new() == [{"n": 2}]
+        assert tail.line == 2
+        tail.close()
+
+    def test_skips_from_line(self, tmp_path):
+        transcript = tmp_path / "sess.jsonl"
+        transcript.write_text("".join(json.dumps({"n": i}) + "\n" for i in range(3)))
+        tail = TranscriptTail(transcript, from_line=2)
+
+        assert tail.read_new() == [{"n": 2}]
+        assert tail.line == 3
+        tail.close()
+
+    def test_leaves_partial_line_for_next_read(self, tmp_path):
+        transcript = tmp_path / "sess.jsonl"
+        transcript.write_text('{"n": 1}\n{"n":')
+        tail = TranscriptTail(transcript)
+
+        assert tail.read_new() == [{"n": 1}]
+        with open(transcript, "a") as f:
+            f.write(" 2}\n")
+        assert tail.read_new() == [{"n": 2}]
+        tail.close()
+
+    def test_counts_blank_and_invalid_lines(self, tmp_path):
+        transcript = tmp_path / "sess.jsonl"
+        transcript.write_text('{"n": 1}\n\ninvalid json\n{"n": 2}\n')
+        tail = TranscriptTail(transcript)
+
+        assert tail.read_new() == [{"n": 1}, {"n": 2}]
+        assert tail.line == 4
+        tail.close()
+
+    def test_skips_types_without_parsing(self, tmp_path):
+        transcript = tmp_path / "sess.jsonl"
+        transcript.write_text('{"type":"file-history-snapshot","snapshot":{}}\n{"type":"user","n":1}\n')
+        tail = TranscriptTail(transcript, skip_types=frozenset({"file-history-snapshot"}))
+
+        with patch("transcript_reader._loads", wraps=json.loads) as mock_loads:
+            assert tail.read_new() == [{"type": "user", "n": 1}]
+
+        assert mock_loads.call_count == 1
+        assert tail.line == 2
+        tail.close()
+
+    def test_from_line_spanning_read_blocks(self, tmp_path):
+        transcript = tmp_path / "sess.jsonl"
+        transcript.write_text("".join(json.dumps({"n": i}) + "\n" for i in range(10)) + '{"n": 10')
+
+        with patch("transcript_reader.LINE_COUNT_BLOCK", 16):
+            tail = TranscriptTail(transcript, from_line=7)
+            assert tail.read_new() == [{"n": 7}, {"n": 8}, {"n": 9}]
+            # Asking to skip past the end stops after the last complete line
+            short = TranscriptTail(transcript, from_line=50)
+            assert short.read_new() == []
+            assert short.line == 10
+
+        tail.close()
+        short.close()
+
+    def test_skips_sidechain_entries_without_parsing(self, tmp_path):
+        transcript = tmp_path / "sess.jsonl"
+        transcript.write_text(
+            '{"parentUuid":null,"isSidechain":true,"type":"assistant"}\n'
+            '{"parentUuid":null,"isSidechain":false,"type":"assistant"}\n'
+        )
+        tail = TranscriptTail(transcript, skip_sidechain=True)
+
+        with patch("transcript_reader._loads", wraps=json.loads) as mock_loads:
+            assert tail.read_new() == [{"parentUuid": None, "isSidechain": False, "type": "assistant"}]
+
+        assert mock_loads.call_count == 1
+        assert tail.line == 2
+        tail.close()
+
+    def test_skip_new_counts_lines_without_parsing(self, tmp_path):
+        transcript = tmp_path / "sess.jsonl"
+        transcript.write_text('{"n": 1}\n{"n": 2}\n{"n":')
+        tail = TranscriptTail(transcript)
+
+        with patch("transcript_reader._loads") as mock_loads:
+            assert tail.skip_new() == 2
+        mock_loads.assert_not_called()
+
+        with open(transcript, "a") as f:
+            f.write(' 3}\n{"n": 4}\n')
+        assert tail.read_new() == [{"n": 3}, {"n": 4}]
+        assert tail.line == 4
+        tail.close()
+
+    def test_missing_file_keeps_start_line(self, tmp_path):
+        tail = TranscriptTail(tmp_path / "missing.jsonl", from_line=3)
+        assert tail.read_new() == []
+        assert tail.line == 3
+
+    def test_unchanged_file_is_not_read(self, tmp_path):
+        transcript = tmp_path / "sess.jsonl"
+        transcript.write_text('{"n": 1}\n')
+        tail = TranscriptTail(transcript)
+        tail.read_new()
+
+        with patch.object(tail._fh, "read", wraps=tail._fh.read) as mock_read:
+            assert tail.read_new() == []
+        mock_read.assert_not_called()
+        tail.close()
+
+    def test_rereads_replaced_file(self, tmp_path):
+        transcript = tmp_path / "sess.jsonl"
+        transcript.write_text('{"n": 1}\n{"n": 2}\n')
+        tail = TranscriptTail(transcript)
+        tail.read_new()
+
+        replacement = tmp_path / "new.jsonl"
+        replacement.write_text('{"n": 3}\n')
+        replacement.replace(transcript)
+
+        assert tail.read_new() == [{"n": 3}]
+        assert tail.line == 1
+        tail.close()
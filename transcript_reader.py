@@ -8,11 +8,29 @@ Each assistant entry has message.usage with per-turn token counts reflecting the
 context window fill level, unlike the cumulative counts in the result message.
 """
 
+import functools
 import json
+import os
 from pathlib import Path
 
 from logger import logger
 
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:  # optional speedup; stdlib json accepts bytes too
+    _loads = json.loads
+
+# Read size used when counting transcript lines
+LINE_COUNT_BLOCK = 1 << 20
+
+# Raw form of a subagent entry's flag in Claude Code's compact JSON
+SIDECHAIN_MARKER = b'"isSidechain":true'
+
+# How far into a raw line the readers look for a skipped "type" before parsing it
+SKIP_SCAN_BYTES = 128
+
 
 def _encode_workdir(workdir: str) -> str:
     """Encode a working directory path for Claude Code's projects directory."""
@@ -22,8 +40,13 @@ def _encode_workdir(workdir: str) -> str:
     return encoded
 
 
+@functools.lru_cache(maxsize=32)
 def get_projects_dir(workdir: str) -> Path:
-    """Get the Claude Code projects directory for a given working directory."""
+    """Get the Claude Code projects directory for a given working directory.
+
+    Cached: the watcher, session discovery and every transcript helper resolve
+    the same few workdirs over and over, and Path objects are immutable.
+    """
     return Path.home() / ".claude" / "projects" / _encode_workdir(workdir)
 
 
@@ -49,6 +72,32 @@ def session_file_exists(workdir: str, session_id: str) -> bool:
         return False
 
 
+def list_sessions(workdir: str) -> dict[str, float]:
+    """Map each session ID in the projects directory to its transcript mtime.
+
+    Uses a single os.scandir pass, so each file is stat'ed at most once.
+
+    Args:
+        workdir: The working directory Claude was started in
+
+    Returns:
+        Dict of session ID (filename without .jsonl) -> mtime, empty if the directory is missing
+    """
+    sessions = {}
+    try:
+        with os.scandir(get_projects_dir(workdir)) as it:
+            for entry in it:
+                if not entry.name.endswith(".jsonl"):
+                    continue
+                try:
+                    sessions[entry.name[: -len(".jsonl")]] = entry.stat().st_mtime
+                except OSError:
+                    continue  # Removed between listing and stat
+    except OSError:
+        pass
+    return sessions
+
+
 def find_latest_session(workdir: str) -> str | None:
     """Find the most recently modified JSONL session file.
 
@@ -58,15 +107,11 @@ def find_latest_session(workdir: str) -> str | None:
     Returns:
         Session ID (filename without .jsonl) or None if no sessions exist
     """
-    projects_dir = get_projects_dir(workdir)
-    if not projects_dir.is_dir():
-        return None
-
-    jsonl_files = sorted(projects_dir.glob("*.jsonl"), key=lambda p: p.stat().st_mtime, reverse=True)
-    if not jsonl_files:
+    sessions = list_sessions(workdir)
+    if not sessions:
         return None
 
-    return jsonl_files[0].stem
+    return max(sessions, key=sessions.get)
 
 
 def get_jsonl_line_count(workdir: str, session_id: str) -> int:
@@ -80,43 +125,192 @@ def get_jsonl_line_count(workdir: str, session_id: str) -> int:
         Number of lines, or 0 if the file doesn't exist
     """
     path = get_transcript_path(workdir, session_id)
+    count = 0
+    last = b"\n"
     try:
-        with open(path, "r") as f:
-            return sum(1 for _ in f)
+        with open(path, "rb") as f:
+            # Count newlines in large binary blocks rather than decoding line by line
+            while block := f.read(LINE_COUNT_BLOCK):
+                count += block.count(b"\n")
+                last = block[-1:]
     except (FileNotFoundError, PermissionError, OSError):
         return 0
+    # A final line without a trailing newline still counts
+    return count if last == b"\n" else count + 1
+
+
+def _type_markers(skip_types) -> tuple[bytes, ...]:
+    # Claude Code writes compact JSON, so the type appears as "type":"<name>"
+    return tuple(f'"type":"{t}"'.encode() for t in skip_types)
 
 
-def read_new_entries(workdir: str, session_id: str, from_line: int) -> list[dict]:
+def _has_marker(line: bytes, markers: tuple[bytes, ...]) -> bool:
+    head = line[:SKIP_SCAN_BYTES]
+    return any(marker in head for marker in markers)
+
+
+def read_new_entries(
+    workdir: str, session_id: str, from_line: int, skip_types: frozenset[str] = frozenset()
+) -> list[dict]:
     """Read JSONL entries starting from a given line offset.
 
     Args:
         workdir: The working directory Claude was started in
         session_id: The session ID
         from_line: 0-based line index to start reading from
+        skip_types: Entry types to drop without parsing
 
     Returns:
         List of parsed JSON entries (skips blank lines and invalid JSON)
     """
     path = get_transcript_path(workdir, session_id)
+    markers = _type_markers(skip_types)
     entries = []
     try:
-        with open(path, "r") as f:
+        with open(path, "rb") as f:
             for i, line in enumerate(f):
                 if i < from_line:
                     continue
                 line = line.strip()
-                if not line:
+                if not line or (markers and _has_marker(line, markers)):
                     continue
                 try:
-                    entries.append(json.loads(line))
-                except json.JSONDecodeError:
+                    entries.append(_loads(line))
+                except ValueError:
                     continue
     except (FileNotFoundError, PermissionError, OSError) as e:
         logger.debug(f"[TRANSCRIPT] Cannot read {path}: {e}")
     return entries
 
 
+class TranscriptTail:
+    """Incrementally read new entries from a transcript, keeping the file open.
+
+    The first read skips from_line lines; after that only bytes appended since
+    the previous read are consumed, so each poll costs O(new data) instead of
+    re-reading the whole transcript. A trailing line without a newline is left
+    for the next read (Claude may be mid-write). If the file is replaced or
+    truncated it is reopened and read from the start.
+
+    Lines whose leading bytes show a "type" in skip_types are dropped without
+    being parsed (snapshot entries in particular can be many KB), as are
+    subagent entries when skip_sidechain is set.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        from_line: int = 0,
+        skip_types: frozenset[str] = frozenset(),
+        skip_sidechain: bool = False,
+    ):
+        self.path = path
+        self.line = from_line  # Number of complete lines consumed so far
+        self._fh = None
+        self._offset = 0
+        self._skip_markers = _type_markers(skip_types)
+        if skip_sidechain:
+            # isSidechain is the second key Claude Code writes, well inside SKIP_SCAN_BYTES
+            self._skip_markers += (SIDECHAIN_MARKER,)
+
+    def _open(self) -> bool:
+        try:
+            self._fh = open(self.path, "rb")
+        except OSError as e:
+            logger.debug(f"[TRANSCRIPT] Cannot read {self.path}: {e}")
+            return False
+        self._offset = 0
+        # Skip lines already processed by an earlier reader of this session.
+        # Newlines are found in large blocks rather than with a readline() per line
+        skip = self.line
+        self.line = 0
+        block_start = 0
+        while self.line < skip:
+            block = self._fh.read(LINE_COUNT_BLOCK)
+            if not block:
+                break
+            newlines = block.count(b"\n")
+            if self.line + newlines < skip:
+                self.line += newlines
+                if newlines:
+                    self._offset = block_start + block.rfind(b"\n") + 1
+            else:
+                end = -1
+                for _ in range(skip - self.line):
+                    end = block.index(b"\n", end + 1)
+                self._offset = block_start + end + 1
+                self.line = skip
+            block_start += len(block)
+        return True
+
+    def _read_complete(self) -> bytes:
+        """Consume and return the complete lines appended since the last read."""
+        if self._fh is not None:
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                st = None  # Unlinked — drain what the open handle still has
+            if st is not None:
+                if st.st_ino != os.fstat(self._fh.fileno()).st_ino or st.st_size < self._offset:
+                    logger.info(f"[TRANSCRIPT] {self.path.name} was replaced or truncated, rereading")
+                    self.close()
+                    self.line = 0
+                elif st.st_size == self._offset:
+                    return b""  # Nothing appended since the last read
+        if self._fh is None and not self._open():
+            return b""
+
+        self._fh.seek(self._offset)
+        data = self._fh.read()
+        end = data.rfind(b"\n") + 1
+        self._offset += end
+        return data[:end]
+
+    def read_new(self) -> list[dict]:
+        """Return entries appended since the last call (skips blank lines and invalid JSON)."""
+        data = self._read_complete()
+        if not data:
+            return []
+
+        entries = []
+        skip_markers = self._skip_markers
+        for line in data.split(b"\n")[:-1]:
+            self.line += 1
+            if not line.strip():
+                continue
+            if skip_markers and _has_marker(line, skip_markers):
+                continue
+            try:
+                entries.append(_loads(line))
+            except ValueError:
+                continue
+        return entries
+
+    def skip_new(self) -> int:
+        """Consume complete lines appended since the last call without parsing them.
+
+        Returns the number of lines skipped.
+        """
+        skipped = self._read_complete().count(b"\n")
+        self.line += skipped
+        return skipped
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+def normalize_usage(usage: dict) -> dict:
+    """Pick the token counts we track out of an assistant message's usage dict."""
+    return {
+        "input_tokens": usage.get("input_tokens", 0),
+        "cache_read_input_tokens": usage.get("cache_read_input_tokens", 0),
+        "cache_creation_input_tokens": usage.get("cache_creation_input_tokens", 0),
+        "output_tokens": usage.get("output_tokens", 0),
+    }
+
+
 def read_context_usage(workdir: str, session_id: str) -> dict | None:
     """Read the last assistant message's usage from a Claude Code transcript.
 
@@ -134,21 +328,55 @@ def read_context_usage(workdir: str, session_id: str) -> dict | None:
     path = get_transcript_path(workdir, session_id)
 
     try:
-        with open(path, "r") as f:
-            lines = f.readlines()
+        f = open(path, "rb")
     except (FileNotFoundError, PermissionError, OSError) as e:
         logger.debug(f"[TRANSCRIPT] Cannot read {path}: {e}")
         return None
 
-    # Iterate in reverse to find the last valid assistant entry
-    for line in reversed(lines):
-        line = line.strip()
-        if not line:
+    with f:
+        result = _last_usage(f)
+
+    if result is None:
+        logger.debug(f"[TRANSCRIPT] No valid assistant usage found in {path}")
+        return None
+
+    logger.debug(
+        f"[TRANSCRIPT] Read usage from {path.name}: "
+        f"input={result['input_tokens']}, "
+        f"cache_read={result['cache_read_input_tokens']}, "
+        f"cache_create={result['cache_creation_input_tokens']}, "
+        f"output={result['output_tokens']}"
+    )
+    return result
+
+
+def _reversed_lines(f):
+    """Yield the lines of a binary file from last to first, reading backwards in blocks."""
+    pos = f.seek(0, os.SEEK_END)
+    head = b""
+    while pos > 0:
+        size = min(LINE_COUNT_BLOCK, pos)
+        pos -= size
+        f.seek(pos)
+        lines = (f.read(size) + head).split(b"\n")
+        # The first piece may continue in the previous block
+        head = lines[0]
+        yield from reversed(lines[1:])
+    yield head
+
+
+def _last_usage(f) -> dict | None:
+    """Return the normalized usage of the last main-thread assistant entry in f."""
+    # Iterate in reverse to find the last valid assistant entry; only the end
+    # of a long transcript is read, never the whole file
+    for line in _reversed_lines(f):
+        # Cheap reject before parsing: entries without usage can't match
+        if b'"usage"' not in line:
             continue
 
         try:
-            entry = json.loads(line)
-        except json.JSONDecodeError:
+            entry = _loads(line)
+        except ValueError:
             continue
 
         # Skip non-assistant entries
@@ -160,26 +388,8 @@ def read_context_usage(workdir: str, session_id: str) -> dict | None:
             continue
 
         # Get usage from the message
-        message = entry.get("message", {})
-        usage = message.get("usage")
-        if not usage:
-            continue
+        usage = entry.get("message", {}).get("usage")
+        if usage:
+            return normalize_usage(usage)
 
-        result = {
-            "input_tokens": usage.get("input_tokens", 0),
-            "cache_read_input_tokens": usage.get("cache_read_input_tokens", 0),
-            "cache_creation_input_tokens": usage.get("cache_creation_input_tokens", 0),
-            "output_tokens": usage.get("output_tokens", 0),
-        }
-
-        logger.debug(
-            f"[TRANSCRIPT] Read usage from {path.name}: "
-            f"input={result['input_tokens']}, "
-            f"cache_read={result['cache_read_input_tokens']}, "
-            f"cache_create={result['cache_creation_input_tokens']}, "
-            f"output={result['output_tokens']}"
-        )
-        return result
-
-    logger.debug(f"[TRANSCRIPT] No valid assistant usage found in {path}")
     return None